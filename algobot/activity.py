@@ -0,0 +1,115 @@
+"""
+Backtest activity. Backtests report their values every percent, and reports are kept as rows of numbers in a compact
+array instead of dictionaries of strings; strings are only formatted for the rows the GUI shows. Updates sent to the
+GUI are throttled, so reports in between updates are coalesced into the next one.
+"""
+
+import time
+
+from datetime import datetime, timezone
+from typing import Callable, Dict
+
+import numpy as np
+
+ACTIVITY_FIELDS = ('utc', 'net', 'balance', 'commissionsPaid', 'tradesMade', 'percentage')
+DEFAULT_MAX_RATE = 20  # Maximum amount of activity updates sent to the GUI per second.
+
+
+class ActivityLog:
+    def __init__(self, capacity: int = 128):
+        """
+        Growable array of activity samples. Every sample is a row of ACTIVITY_FIELDS values.
+        :param capacity: Amount of samples space is reserved for initially.
+        """
+        self.samples = np.zeros((capacity, len(ACTIVITY_FIELDS)), dtype=np.float64)
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def add(self, utc: float, net: float, balance: float, commissionsPaid: float, tradesMade: int,
+            percentage: int) -> int:
+        """
+        Adds a sample and returns its index.
+        :param utc: Epoch timestamp in seconds of period sample was taken at.
+        :param net: Net of backtest.
+        :param balance: Balance of backtest.
+        :param commissionsPaid: Commissions paid so far.
+        :param tradesMade: Amount of trades made so far.
+        :param percentage: Percentage of backtest conducted.
+        :return: Index of sample.
+        """
+        if self.length == len(self.samples):
+            samples = np.zeros((max(1, 2 * len(self.samples)), len(ACTIVITY_FIELDS)), dtype=np.float64)
+            samples[:self.length] = self.samples[:self.length]
+            self.samples = samples  # Readers holding the old array still see every sample they could before.
+
+        self.samples[self.length] = (utc, net, balance, commissionsPaid, tradesMade, percentage)
+        self.length += 1
+        return self.length - 1
+
+    def get_sample(self, index: int) -> Dict[str, float]:
+        """
+        Returns values of sample at index provided.
+        """
+        if not -self.length <= index < self.length:
+            raise IndexError(f"Activity index {index} is out of range.")
+        return dict(zip(ACTIVITY_FIELDS, self.samples[index % self.length].tolist()))
+
+    def get_column(self, field: str) -> np.ndarray:
+        """
+        Returns view of values of field provided for every sample.
+        """
+        return self.samples[:self.length, ACTIVITY_FIELDS.index(field)]
+
+    def get_activity_dictionary(self, index: int, startingBalance: float, precision: int) -> dict:
+        """
+        Returns sample at index provided with values formatted to show in the GUI.
+        :param index: Index of sample.
+        :param startingBalance: Balance backtest started with.
+        :param precision: Precision to round values to.
+        :return: Dictionary containing period activity.
+        """
+        sample = self.get_sample(index)
+        net = sample['net']
+        profit = net - startingBalance
+        if profit < 0:
+            profitPercentage = round(100 - net / startingBalance * 100, 2)
+        else:
+            profitPercentage = round(net / startingBalance * 100 - 100, 2)
+
+        currentPeriod = datetime.fromtimestamp(sample['utc'], tz=timezone.utc)
+        return {
+            'net': round(net, precision),
+            'netString': f'${round(net, precision)}',
+            'balance': f'${round(sample["balance"], precision)}',
+            'commissionsPaid': f'${round(sample["commissionsPaid"], precision)}',
+            'tradesMade': str(int(sample['tradesMade'])),
+            'profit': f'${abs(round(profit, precision))}',
+            'profitPercentage': f'{profitPercentage}%',
+            'currentPeriod': currentPeriod.strftime("%m/%d/%Y, %H:%M:%S"),
+            'utc': sample['utc'],
+            'percentage': int(sample['percentage'])
+        }
+
+
+class ActivityThrottle:
+    def __init__(self, maxRate: float = DEFAULT_MAX_RATE, clock: Callable[[], float] = time.monotonic):
+        """
+        Limits how often activity updates are sent.
+        :param maxRate: Maximum amount of updates per second. If none, every update is sent.
+        :param clock: Function returning seconds used to measure time between updates.
+        """
+        self.interval = 1 / maxRate if maxRate else 0
+        self.clock = clock
+        self.lastUpdate = None
+
+    def is_due(self) -> bool:
+        """
+        Returns whether an update can be sent now. If so, the next one is due an interval later.
+        """
+        now = self.clock()
+        if self.lastUpdate is not None and now - self.lastUpdate < self.interval:
+            return False
+        self.lastUpdate = now
+        return True
@@ -8,6 +8,8 @@ from typing import List, Dict, Union
 from helpers import ROOT_DIR, open_file_or_folder, get_logger, create_folder_if_needed
 from threads import workerThread, backtestThread, botThread, listThread
 from data import Data
+from candles import datetime_to_timestamp
+from symbols import get_symbol_registry
 from datetime import datetime
 from interface.palettes import *
 from traders.backtester import Backtester
@@ -141,8 +143,7 @@ class Interface(QMainWindow):
         Returns all available tickers from Binance API.
         :return: List of all available tickers.
         """
-        tickers = [ticker['symbol'] for ticker in Data(loadData=False, log=False).binanceClient.get_all_tickers()
-                   if 'USDT' in ticker['symbol']]
+        tickers = [symbol for symbol in get_symbol_registry().get_symbols() if 'USDT' in symbol]
 
         tickers.sort()
         # tickers.remove("BTCUSDT")
@@ -238,14 +239,29 @@ class Interface(QMainWindow):
 
         self.backtestProgressBar.setValue(100)
 
-    def update_backtest_gui(self, updatedDict: dict):
+    def update_backtest_gui(self, sampleIndex: int):
         """
-        Updates activity backtest details to GUI.
-        :param updatedDict: Dictionary containing backtest data.
+        Updates activity backtest details to GUI. Every sample of past activity up to the index provided that isn't
+        on the graph yet is added to it, so throttled updates don't leave gaps in the graph.
+        :param sampleIndex: Index of newest sample in backtester's past activity.
         """
+        graph = self.interfaceDictionary[BACKTEST]['mainInterface']['graph']
+        plot = self.get_graph_dictionary(graph)['plots'][0]
+        pastActivity = self.backtester.pastActivity
+        nets, timestamps = pastActivity.get_column('net'), pastActivity.get_column('utc')
+        for index in range(len(plot['x']) - 1, sampleIndex + 1):  # The first point of the plot is the starting balance.
+            self.add_data_to_plot(graph, 0, y=float(nets[index]), timestamp=float(timestamps[index]))
+        self.update_backtest_activity(sampleIndex)
+
+    def update_backtest_activity(self, sampleIndex: int):
+        """
+        Updates backtest details in GUI with a sample of past activity. Values are only formatted here, so samples
+        that aren't shown are never formatted.
+        :param sampleIndex: Index of sample in backtester's past activity.
+        """
+        updatedDict = self.backtester.get_activity_dictionary(sampleIndex)
         self.backtestProgressBar.setValue(updatedDict['percentage'])
         net = updatedDict['net']
-        utc = updatedDict['utc']
 
         if net < self.backtester.startingBalance:
             self.backtestProfitLabel.setText("Loss")
@@ -261,7 +277,6 @@ class Interface(QMainWindow):
         self.backtestProfitPercentage.setText(updatedDict['profitPercentage'])
         self.backtestTradesMade.setText(updatedDict['tradesMade'])
         self.backtestCurrentPeriod.setText(updatedDict['currentPeriod'])
-        self.add_data_to_plot(self.interfaceDictionary[BACKTEST]['mainInterface']['graph'], 0, y=net, timestamp=utc)
 
     def update_backtest_configuration_gui(self, statDict: dict):
         """
@@ -305,7 +320,7 @@ class Interface(QMainWindow):
         """
         Resets backtest graph and sets x-axis limits.
         """
-        initialTimeStamp = self.backtester.data[0]['date_utc'].timestamp()
+        initialTimeStamp = datetime_to_timestamp(self.backtester.data[0]['date_utc']) / 1000  # Samples are in UTC.
         graphDict = self.get_graph_dictionary(self.backtestGraph)
         graphDict['graph'].setLimits(xMin=0, xMax=limit)
         plot = graphDict['plots'][0]
@@ -1090,7 +1105,7 @@ class Interface(QMainWindow):
         if self.backtester is not None:
             if 1 <= position <= len(self.backtester.pastActivity):
                 try:
-                    self.update_backtest_gui(self.backtester.pastActivity[position - 1])
+                    self.update_backtest_activity(position - 1)
                 except IndexError as e:
                     self.logger.exception(str(e))
 
@@ -1,8 +1,13 @@
-from typing import List, Tuple
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from candles import CandleStore
 from helpers import get_data_from_parameter
+from indicators import get_ema_series, get_rsi_series, get_values
 
 
-def get_wma(data: List[dict], prices: int, parameter: str, desc: bool = True) -> float:
+def get_wma(data: Union[List[dict], CandleStore], prices: int, parameter: str, desc: bool = True) -> float:
     """
     Calculates the weighted moving average from data provided.
     The data is assumed to be in descending order - meaning newer dates are in the front of the list.
@@ -12,35 +17,25 @@ def get_wma(data: List[dict], prices: int, parameter: str, desc: bool = True) ->
     :param parameter: Parameter from data dictionary with which to get the weighted moving average.
     :return: Weighted moving average.
     """
-    if desc:
-        total = get_data_from_parameter(data=data[0], parameter=parameter) * prices
-        data = data[1:]
-
-        index = 0
-        for x in range(prices - 1, 0, -1):
-            total += x * get_data_from_parameter(data=data[index], parameter=parameter)
-            index += 1
-    else:
-        total = get_data_from_parameter(data=data[-1], parameter=parameter) * prices
-        data = data[:-1]
+    if len(data) == 0 or desc and len(data) < prices:
+        raise ValueError(f"Not enough data to calculate weighted moving average of {prices} prices.")
 
-        for index, data in enumerate(data, start=1):
-            total += index * get_data_from_parameter(data, parameter)
+    values = get_values(data[:prices] if desc else data, parameter, desc=desc)
+    weights = np.arange(1, len(values) + 1, dtype=np.float64)
+    weights[-1] = prices  # The newest value is always weighted with prices and older ones with their position.
+    return float(np.dot(weights, values) / (prices * (prices + 1) / 2))
 
-    divisor = prices * (prices + 1) / 2
-    wma = total / divisor
-    return wma
 
-
-def get_sma(data: List[dict], prices: int, parameter: str) -> float:
+def get_sma(data: Union[List[dict], CandleStore], prices: int, parameter: str) -> float:
     """
-    Calculates the simple moving average from data provided.
+    Calculates the simple moving average from data provided. Every period of data is summed, so data should hold
+    prices periods.
     :param data: Data to calculate simple moving average.
     :param prices: Periods of data to get simple moving average.
     :param parameter: Parameter from data dictionary with which to get the simple moving average.
     :return: Simple moving average.
     """
-    return sum([get_data_from_parameter(data=period, parameter=parameter) for period in data]) / prices
+    return float(get_values(data, parameter).sum() / prices)
 
 
 def get_ema(data: List[dict], prices: int, parameter: str, sma_prices: int, memo: dict = None, desc: bool = True) -> \
@@ -72,23 +67,13 @@ def get_ema(data: List[dict], prices: int, parameter: str, sma_prices: int, memo
         else:
             raise ValueError("Something went wrong in the calculation of the EMA.")
     else:
+        values = get_values(data, parameter, desc=desc)
+        emas = get_ema_series(values, prices, sma_prices)[sma_prices - 1:].tolist()
+        dates = [period['date_utc'] for period in data]
         if desc:
-            sma_data = data[len(data) - sma_prices:]
-        else:
-            sma_data = data[:sma_prices]
-
-        ema = get_sma(sma_data, sma_prices, parameter)
-        if desc:
-            values = [[ema, data[len(data) - sma_prices]['date_utc']]]
-            data = data[:len(data) - sma_prices][::-1]  # Reverse the data to start from back to front.
-        else:
-            values = [[ema, data[sma_prices - 1]['date_utc']]]
-            data = data[sma_prices:]
-
-        for period in data:
-            current_price = get_data_from_parameter(period, parameter=parameter)
-            ema = current_price * multiplier + ema * (1 - multiplier)
-            values.append([ema, period['date_utc']])
+            dates.reverse()
+        values = [[ema, date] for ema, date in zip(emas, dates[sma_prices - 1:])]
+        ema = emas[-1]
 
         if not memo:
             memo = {prices: {parameter: values}}
@@ -100,5 +85,13 @@ def get_ema(data: List[dict], prices: int, parameter: str, sma_prices: int, memo
     return ema, memo
 
 
-def get_rsi():
-    pass
+def get_rsi(data: Union[List[dict], CandleStore], prices: int, parameter: str, desc: bool = True) -> float:
+    """
+    Calculates the relative strength index from data provided. Averages are smoothed from the oldest period provided.
+    :param desc: Order data is in. If descending, this will be true, else false.
+    :param data: Data to calculate relative strength index.
+    :param prices: Periods of relative strength index.
+    :param parameter: Parameter from data dictionary with which to get the relative strength index.
+    :return: Relative strength index.
+    """
+    return float(get_rsi_series(get_values(data, parameter, desc=desc), prices)[-1])
@@ -0,0 +1,283 @@
+"""
+Headless backtests. Configurations are read from JSON or YAML files and backtested on CSV files or SQLite databases
+without the GUI, and results are written as JSON, JSON lines, or CSV. Run it from the algobot folder, for example:
+
+    python backtestRunner.py configs/*.json --data Databases/BTCUSDT.db --interval 1h --output results.json
+
+Every dataset is loaded once, and configurations run in parallel on the process pool of a backtest scheduler. Nothing
+here imports PyQt5, so it runs on machines without a display.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sqlite3
+import sys
+
+from contextlib import closing
+from typing import Any, Dict, List, Tuple
+
+from dateutil import parser
+
+from backtestScheduler import BacktestScheduler
+from candles import CandleStore
+from enums import STOP, TRAILING
+from helpers import convert_all_dates_to_datetime, load_from_csv
+from optimizer import DEFAULT_SETTINGS, run_settings
+
+LOSS_TYPES = {'trailing': TRAILING, 'stop': STOP, 'none': None}
+BACKTESTER_OPTIONS = {'startingBalance': 1000, 'symbol': None, 'startDate': None, 'endDate': None, 'precision': 4}
+DATA_OPTIONS = ('name', 'data', 'interval')
+RESULT_FIELDS = ('name', 'config', 'data', 'net', 'profit', 'profitPercentage', 'drawdown', 'trades', 'commissions',
+                 'error', 'settings')
+DATABASE_COLUMNS = ('open_price', 'high_price', 'low_price', 'close_price', 'volume', 'quote_asset_volume',
+                    'number_of_trades', 'taker_buy_base_asset', 'taker_buy_quote_asset')  # Ordered like FIELDS.
+OUTPUT_FORMATS = ('json', 'jsonl', 'csv')
+
+
+def load_config_file(path: str) -> List[Dict[str, Any]]:
+    """
+    Returns configurations from a JSON or YAML file. A file holds either one configuration or a list of them. YAML
+    files need PyYAML installed.
+    :param path: Path to configuration file.
+    :return: List of configuration dictionaries. Every configuration gets a config key with the file path.
+    """
+    with open(path) as f:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("PyYAML is required to load YAML configurations. Install it with pip install pyyaml.")
+            configs = yaml.safe_load(f)
+        else:
+            configs = json.load(f)
+
+    if isinstance(configs, dict):
+        configs = [configs]
+    elif not isinstance(configs, list) or not all(isinstance(config, dict) for config in configs):
+        raise ValueError(f"{path} must hold a configuration or a list of configurations.")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    loaded = []
+    for config in configs:
+        config = {**config, 'config': path}
+        if config.get('data') and not os.path.isabs(config['data']):
+            config['data'] = os.path.join(directory, config['data'])  # Data paths are relative to the file.
+        loaded.append(config)
+    return loaded
+
+
+def get_loss_type(value):
+    """
+    Returns loss or take profit type of a configuration value. Values can be names (trailing, stop, or none) or the
+    constants of enums.
+    """
+    if value is None or value in (TRAILING, STOP):
+        return value
+    elif isinstance(value, str) and value.lower() in LOSS_TYPES:
+        return LOSS_TYPES[value.lower()]
+    raise ValueError(f"Invalid loss type: {value}. Expected one of {', '.join(LOSS_TYPES)}.")
+
+
+def get_date(value):
+    """
+    Returns date of a configuration value. Strings are parsed, so any format dateutil understands works.
+    """
+    if value is None or not isinstance(value, str):
+        return value
+    return parser.parse(value).date()
+
+
+def parse_config(config: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Returns settings and backtester options of a configuration. Settings are written the same way as optimizer
+    settings (see optimizer.DEFAULT_SETTINGS), except loss and take profit types can be names.
+    :param config: Configuration dictionary.
+    :return: Tuple of settings dictionary and backtester options dictionary.
+    """
+    unknownKeys = set(config) - set(DEFAULT_SETTINGS) - set(BACKTESTER_OPTIONS) - set(DATA_OPTIONS) - {'config'}
+    if unknownKeys:
+        raise ValueError(f"Unknown configuration keys: {', '.join(sorted(unknownKeys))}.")
+
+    settings = {**DEFAULT_SETTINGS, **{key: config[key] for key in DEFAULT_SETTINGS if key in config}}
+    settings['lossType'] = get_loss_type(settings['lossType'])
+    settings['takeProfitType'] = get_loss_type(settings['takeProfitType'])
+    settings['movingAverage'] = [list(option) for option in settings['movingAverage']]
+
+    options = {**BACKTESTER_OPTIONS, **{key: config[key] for key in BACKTESTER_OPTIONS if key in config}}
+    options['startDate'] = get_date(options['startDate'])
+    options['endDate'] = get_date(options['endDate'])
+    return settings, options
+
+
+def load_database(path: str, interval: str = None) -> CandleStore:
+    """
+    Returns candle data from a database Data writes, in ascending order. Tables with the old text schema have to be
+    migrated by Data first.
+    :param path: Path to database file.
+    :param interval: Interval of table to load. If none, the database must have exactly one interval table.
+    :return: Candle store.
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Database {path} does not exist.")
+
+    with closing(sqlite3.connect(f'file:{path}?mode=ro', uri=True)) as connection:
+        tables = [row[0] for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'data\\_%' ESCAPE '\\'")]
+        if interval is not None:
+            table = f'data_{interval}'
+            if table not in tables:
+                raise ValueError(f"Database {path} has no {interval} data.")
+        elif len(tables) == 1:
+            table = tables[0]
+        else:
+            raise ValueError(f"Database {path} has data of several intervals; an interval must be provided.")
+
+        columns = connection.execute(f'PRAGMA table_info({table})').fetchall()
+        if columns[0][2].upper() == 'TEXT':  # Data migrates old tables when it opens them, but this is read-only.
+            raise ValueError(f"Database {path} stores {table} with the old text schema. Open it with Data once to "
+                             "migrate it.")
+
+        rows = connection.execute(f'SELECT date_utc, {", ".join(DATABASE_COLUMNS)} FROM {table} '
+                                  f'ORDER BY date_utc').fetchall()
+    if not rows:
+        raise ValueError(f"Database {path} has no data in {table}.")
+    return CandleStore.from_value_rows([row[0] for row in rows], [row[1:] for row in rows])
+
+
+def load_dataset(path: str, interval: str = None) -> CandleStore:
+    """
+    Returns candle data of a CSV file Data.create_csv_file writes or a SQLite database, in ascending order.
+    :param path: Path to CSV or database file.
+    :param interval: Interval of database table to load. Ignored for CSV files.
+    :return: Candle store.
+    """
+    if os.path.splitext(path)[1].lower() == '.csv':
+        data = load_from_csv(path, descending=False)
+        convert_all_dates_to_datetime(data)
+        return CandleStore.from_dicts(data)
+    return load_database(path, interval)
+
+
+def get_error_result(error: Exception) -> Dict[str, Any]:
+    """
+    Returns result of a configuration that couldn't be run.
+    """
+    return {'settings': None, 'net': None, 'profit': None, 'profitPercentage': None, 'drawdown': None,
+            'trades': None, 'commissions': None, 'error': f'{type(error).__name__}: {error}'}
+
+
+def label_result(result: Dict[str, Any], config: Dict[str, Any], number: int, data: str) -> Dict[str, Any]:
+    """
+    Returns result with the name and file of the configuration it came from and the dataset it was run with.
+    """
+    name = config.get('name') or f"{os.path.splitext(os.path.basename(config.get('config') or 'config'))[0]}-{number}"
+    return {'name': name, 'config': config.get('config'), 'data': data, **result}
+
+
+def run_configs(configs: List[Dict[str, Any]], processes: int = None, vectorized: bool = True,
+                data: str = None, interval: str = None) -> List[Dict[str, Any]]:
+    """
+    Runs backtests of configurations provided and returns their results in the same order. Configurations that can't
+    be parsed or whose data can't be loaded get error results instead of stopping the rest.
+    :param configs: Configuration dictionaries (see load_config_file).
+    :param processes: Amount of worker processes. If none, every CPU is used. With 1, backtests run in-process.
+    :param vectorized: Boolean whether to use the vectorized engine when a configuration supports it.
+    :param data: Path to dataset used by every configuration instead of its own.
+    :param interval: Interval of database table used by every configuration instead of its own.
+    :return: List of result dictionaries.
+    """
+    results = [None] * len(configs)
+    datasetKeys = [(data or config.get('data'), interval or config.get('interval')) for config in configs]
+    stores = {}
+    jobs = []
+    for number, (config, datasetKey) in enumerate(zip(configs, datasetKeys)):
+        try:
+            settings, options = parse_config(config)
+            if datasetKey[0] is None:
+                raise ValueError("Configuration has no data.")
+            if datasetKey not in stores:
+                stores[datasetKey] = load_dataset(*datasetKey)
+        except Exception as e:
+            results[number] = get_error_result(e)
+            continue
+        jobs.append((number, datasetKey, settings, options))
+
+    processes = min(processes or os.cpu_count() or 1, len(jobs))
+    if processes <= 1:
+        for number, datasetKey, settings, options in jobs:
+            results[number] = run_settings(stores[datasetKey], settings, vectorized=vectorized, **options)
+    else:
+        with BacktestScheduler(processes=processes, vectorized=vectorized) as scheduler:
+            scheduledJobs = [(number, scheduler.submit(settings, stores[datasetKey], **options))
+                             for number, datasetKey, settings, options in jobs]
+            scheduler.wait()
+        for number, job in scheduledJobs:
+            results[number] = job.result
+
+    return [label_result(result, config, number, datasetKey[0])
+            for number, (result, config, datasetKey) in enumerate(zip(results, configs, datasetKeys))]
+
+
+def format_results(results: List[Dict[str, Any]], outputFormat: str = 'json') -> str:
+    """
+    Returns results formatted as JSON, JSON lines, or CSV. In CSV, settings are a JSON string.
+    :param results: Result dictionaries (see run_configs).
+    :param outputFormat: One of OUTPUT_FORMATS.
+    :return: Formatted string.
+    """
+    rows = [{field: result.get(field) for field in RESULT_FIELDS} for result in results]
+    if outputFormat == 'json':
+        return json.dumps(rows, indent=4, default=str) + '\n'
+    elif outputFormat == 'jsonl':
+        return ''.join(json.dumps(row, default=str) + '\n' for row in rows)
+    elif outputFormat == 'csv':
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=RESULT_FIELDS, lineterminator='\n')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row, 'settings': json.dumps(row['settings'], default=str)})
+        return output.getvalue()
+    raise ValueError(f"Invalid output format: {outputFormat}. Expected one of {', '.join(OUTPUT_FORMATS)}.")
+
+
+def get_argument_parser() -> argparse.ArgumentParser:
+    """
+    Returns parser of command line arguments.
+    """
+    argumentParser = argparse.ArgumentParser(description="Run backtests headlessly from configuration files.")
+    argumentParser.add_argument('configs', nargs='+', help="JSON or YAML configuration files.")
+    argumentParser.add_argument('--data', help="CSV or SQLite dataset used by every configuration instead of its own.")
+    argumentParser.add_argument('--interval', help="Interval of database table to backtest, like 1h.")
+    argumentParser.add_argument('--processes', type=int, help="Amount of worker processes. Defaults to every CPU.")
+    argumentParser.add_argument('--format', choices=OUTPUT_FORMATS, default='json', help="Format of results.")
+    argumentParser.add_argument('--output', help="File results are written to. Defaults to standard output.")
+    argumentParser.add_argument('--no-vectorized', dest='vectorized', action='store_false',
+                                help="Always use the regular backtest engine.")
+    return argumentParser
+
+
+def main(arguments: List[str] = None) -> int:
+    """
+    Runs configuration files given on the command line and writes their results.
+    :param arguments: Command line arguments. If none, sys.argv is used.
+    :return: Exit code; 1 if any configuration failed, else 0.
+    """
+    arguments = get_argument_parser().parse_args(arguments)
+    configs = [config for path in arguments.configs for config in load_config_file(path)]
+    results = run_configs(configs, processes=arguments.processes, vectorized=arguments.vectorized,
+                          data=arguments.data, interval=arguments.interval)
+
+    output = format_results(results, arguments.format)
+    if arguments.output:
+        with open(arguments.output, 'w', newline='') as f:
+            f.write(output)
+    else:
+        sys.stdout.write(output)
+    return int(any(result['error'] is not None for result in results))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
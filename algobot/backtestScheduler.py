@@ -0,0 +1,463 @@
+"""
+Batch backtests. Jobs are queued in a scheduler and run on a bounded process pool, and their progress and results are
+streamed to a callback as they arrive. Every job can be canceled on its own, whether it's still queued or already
+running, and results of every job are collected into one table.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import traceback
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Union
+
+from activity import DEFAULT_MAX_RATE, ActivityThrottle
+from candles import CandleStore, datetime_to_timestamp
+from helpers import convert_all_dates_to_datetime
+from optimizer import DEFAULT_SETTINGS, get_settings_label, run_settings
+from sharedCandles import SharedCandleDataset
+
+PENDING = 'pending'
+RUNNING = 'running'
+FINISHED = 'finished'
+FAILED = 'failed'
+CANCELED = 'canceled'
+PROGRESS = 'progress'  # Event of a running job with its activity dictionary.
+MESSAGE = 'message'  # Event of a running job with a message its backtester emitted.
+DONE_STATUSES = (FINISHED, FAILED, CANCELED)
+POLL_INTERVAL = 0.05  # Seconds dispatcher waits for worker events before checking jobs again.
+
+workerEvents = None  # Queue worker process sends job events to.
+workerCanceled = None  # Shared dictionary with IDs of canceled jobs as keys.
+workerDatasets = {}  # Shared datasets worker process is attached to keyed by name.
+
+
+class JobSignal:
+    def __init__(self, emit: Callable):
+        """
+        Signal with the emit method backtests call on Qt signals.
+        """
+        self.emit = emit
+
+
+class JobSignals:
+    def __init__(self, thread):
+        """
+        Signals backtests emit in worker processes. Messages are sent to the scheduler, and graph limits are ignored.
+        """
+        self.message = JobSignal(thread.report_message)
+        self.updateGraphLimits = JobSignal(lambda limit: None)
+
+
+class JobThread:
+    def __init__(self, jobId: int, events, canceled, maxActivityRate: float = DEFAULT_MAX_RATE):
+        """
+        Stand-in for BacktestThread in worker processes. Backtests report activity through it and stop once it's no
+        longer running. Cancellation is checked whenever activity is reported, so a running job stops within a
+        percent of its backtest.
+        :param jobId: ID of job being run.
+        :param events: Queue job events are sent to.
+        :param canceled: Shared dictionary with IDs of canceled jobs as keys.
+        :param maxActivityRate: Maximum amount of progress events sent per second.
+        """
+        self.jobId = jobId
+        self.events = events
+        self.canceled = canceled
+        self.running = jobId not in canceled
+        self.activityThrottle = ActivityThrottle(maxActivityRate)
+        self.signals = JobSignals(self)
+
+    def add_activity(self, period: Dict[str, datetime], index: int, length: int):
+        """
+        Sends percentage of backtest conducted and the current period to the scheduler if an update is due, and
+        checks whether job was canceled.
+        """
+        if self.activityThrottle.is_due():
+            self.events.put((self.jobId, PROGRESS, {'percentage': min(100, int(index / length * 100)),
+                                                    'utc': datetime_to_timestamp(period['date_utc']) / 1000}))
+        self.running = self.jobId not in self.canceled
+
+    def report_message(self, message: str):
+        """
+        Sends message to the scheduler.
+        """
+        self.events.put((self.jobId, MESSAGE, message))
+
+
+def initialize_worker(events, canceled):
+    """
+    Stores queue of job events and shared dictionary of canceled jobs. Called once per worker when the pool starts.
+    """
+    global workerEvents, workerCanceled
+    workerEvents = events
+    workerCanceled = canceled
+
+
+def run_worker_job(jobId: int, dataset: SharedCandleDataset, settings: Dict[str, Any], vectorized: bool,
+                   backtesterOptions: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs a job in a worker process. Datasets are attached to the first time a job of theirs runs in the process.
+    """
+    if dataset.name not in workerDatasets:
+        workerDatasets[dataset.name] = dataset
+    workerEvents.put((jobId, RUNNING, None))
+    thread = JobThread(jobId, workerEvents, workerCanceled)
+    return run_settings(workerDatasets[dataset.name].get_store(), settings, vectorized=vectorized, thread=thread,
+                        **backtesterOptions)
+
+
+def get_error_result(settings: Dict[str, Any], error: str) -> Dict[str, Any]:
+    """
+    Returns result of a job that failed outside of its backtest.
+    """
+    return {'settings': settings, 'net': None, 'profit': None, 'profitPercentage': None, 'drawdown': None,
+            'trades': None, 'commissions': None, 'error': error}
+
+
+class BacktestJob:
+    def __init__(self, jobId: int, name: str, settings: Dict[str, Any], dataset: SharedCandleDataset,
+                 backtesterOptions: Dict[str, Any]):
+        """
+        Backtest queued in a scheduler.
+        :param jobId: ID of job in scheduler.
+        :param name: Name of job shown in results.
+        :param settings: Settings dictionary (see optimizer.DEFAULT_SETTINGS).
+        :param dataset: Shared dataset to backtest with.
+        :param backtesterOptions: Starting balance, symbol, start date, end date, and precision.
+        """
+        self.id = jobId
+        self.name = name
+        self.settings = settings
+        self.dataset = dataset
+        self.backtesterOptions = backtesterOptions
+        self.status = PENDING
+        self.progress = 0  # Percentage of backtest conducted.
+        self.canceled = False  # Boolean whether job was asked to cancel.
+        self.future = None  # Future of job while it's on the process pool.
+        self.result = None  # Result dictionary like the ones optimizer.run_settings returns.
+
+    def is_done(self) -> bool:
+        """
+        Returns whether job has finished, failed, or been canceled.
+        """
+        return self.status in DONE_STATUSES
+
+    def get_row(self) -> Dict[str, Any]:
+        """
+        Returns job details and result values in a dictionary.
+        """
+        result = self.result or {}
+        return {
+            'id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'symbol': self.backtesterOptions.get('symbol'),
+            'startDate': self.backtesterOptions.get('startDate'),
+            'endDate': self.backtesterOptions.get('endDate'),
+            **{key: result.get(key) for key in ('net', 'profit', 'profitPercentage', 'drawdown', 'trades',
+                                                 'commissions', 'error')},
+            'settings': self.settings,
+        }
+
+    def __repr__(self) -> str:
+        return f'BacktestJob(id={self.id}, name={self.name!r}, status={self.status!r})'
+
+
+class BacktestScheduler:
+    def __init__(self, processes: int = None, vectorized: bool = True,
+                 callback: Callable[[BacktestJob, str, Any], None] = None):
+        """
+        Runs queued backtest jobs on a process pool. Jobs run in the order they're submitted, with at most one per
+        process at a time, so queued jobs can be canceled before they reach the pool.
+        :param processes: Maximum amount of jobs run at the same time. If none, one per CPU.
+        :param vectorized: Boolean whether to use the vectorized engine when a job supports it.
+        :param callback: Function called with a job, an event (RUNNING, PROGRESS, MESSAGE, or the status the job
+            ended with), and its value (an activity dictionary, a message, or the result). It's called with the
+            scheduler locked, mostly from the dispatcher thread, so it must not block. If it raises an exception, the
+            job it was called with fails.
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.vectorized = vectorized
+        self.callback = callback
+        self.jobs: Dict[int, BacktestJob] = {}
+        self.queue = deque()  # Jobs waiting for the pool.
+        self.active: Dict[int, BacktestJob] = {}  # Jobs on the pool.
+        self.datasets = {}  # Shared datasets keyed by ID of data they were created from.
+        self.ownedDatasets = []  # Shared datasets created by scheduler, unlinked when it closes.
+        self.lock = threading.Condition()
+        self.closing = False
+        self.executor = None
+        self.manager = None
+        self.events = None
+        self.canceled = None
+        self.dispatcher = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_dataset(self, data: Union[list, CandleStore, SharedCandleDataset]) -> SharedCandleDataset:
+        """
+        Returns shared dataset of data provided. Data is copied to shared memory once, however many jobs use it.
+        :param data: Candle data in ascending or descending order, or a shared dataset.
+        :return: Shared candle dataset.
+        """
+        if isinstance(data, SharedCandleDataset):
+            return data
+
+        key = id(data)
+        if key not in self.datasets:
+            store = data
+            if not isinstance(store, CandleStore):
+                convert_all_dates_to_datetime(store)
+                store = CandleStore.from_dicts(store)
+            dataset = SharedCandleDataset.from_store(store)
+            self.datasets[key] = (data, dataset)  # Data is kept, so its ID isn't reused by other data.
+            self.ownedDatasets.append(dataset)
+        return self.datasets[key][1]
+
+    def submit(self, settings: Dict[str, Any], data: Union[list, CandleStore, SharedCandleDataset], name: str = None,
+               startingBalance: float = 1000, symbol: str = None, startDate=None, endDate=None,
+               precision: int = 4) -> BacktestJob:
+        """
+        Queues a backtest job and starts the scheduler if needed.
+        :param settings: Settings dictionary (see optimizer.DEFAULT_SETTINGS). Missing settings use their defaults.
+        :param data: Candle data to backtest with. Jobs with the same data object share one copy of it.
+        :param name: Name of job shown in results. If none, a label of its settings is used.
+        :param startingBalance: Balance backtest starts with.
+        :param symbol: Symbol of data.
+        :param startDate: Date backtest starts at.
+        :param endDate: Date backtest ends at.
+        :param precision: Precision of backtest values.
+        :return: Job queued.
+        """
+        settings = {**DEFAULT_SETTINGS, **settings}
+        backtesterOptions = {'startingBalance': startingBalance, 'symbol': symbol, 'startDate': startDate,
+                             'endDate': endDate, 'precision': precision}
+        with self.lock:
+            if self.closing:
+                raise RuntimeError("Scheduler is closed.")
+            job = BacktestJob(len(self.jobs), name or get_settings_label(settings), settings, self.get_dataset(data),
+                              backtesterOptions)
+            self.jobs[job.id] = job
+            self.queue.append(job)
+            self.start()
+            self.lock.notify_all()
+        return job
+
+    def cancel(self, jobId: int) -> bool:
+        """
+        Cancels a job. Queued jobs are removed from the queue, and running jobs stop the next time they report
+        activity.
+        :param jobId: ID of job to cancel.
+        :return: Boolean whether job was canceled; false if it had already ended.
+        """
+        with self.lock:
+            job = self.jobs[jobId]
+            if job.is_done():
+                return False
+
+            job.canceled = True
+            if job.id not in self.active:
+                self.queue.remove(job)
+                self.end_job(job, CANCELED)
+            else:
+                self.canceled[jobId] = True
+            return True
+
+    def start(self):
+        """
+        Starts process pool and dispatcher thread if they aren't running.
+        """
+        if self.dispatcher is not None:
+            return
+
+        self.manager = multiprocessing.Manager()
+        self.events = multiprocessing.Queue()
+        self.canceled = self.manager.dict()
+        self.executor = ProcessPoolExecutor(max_workers=self.processes, initializer=initialize_worker,
+                                            initargs=(self.events, self.canceled))
+        self.dispatcher = threading.Thread(target=self.dispatch, daemon=True)
+        self.dispatcher.start()
+
+    def notify(self, job: BacktestJob, event: str, value: Any = None):
+        """
+        Calls callback with event of job provided if there is one. If the callback raises an exception, the job fails
+        instead of the dispatcher thread.
+        """
+        if self.callback is None:
+            return
+
+        try:
+            self.callback(job, event, value)
+        except Exception as e:
+            traceback.print_exc()
+            self.fail_job(job, f'Callback raised {type(e).__name__}: {e}')
+
+    def fail_job(self, job: BacktestJob, error: str):
+        """
+        Ends job with a failed result. Queued jobs are removed from the queue, and running jobs are told to stop.
+        :param job: Job to fail. Nothing happens if it has already ended.
+        :param error: Error of result.
+        """
+        if job.is_done():
+            return
+
+        if job in self.queue:
+            self.queue.remove(job)
+        elif job.id in self.active:
+            try:
+                self.canceled[job.id] = True
+            except Exception:
+                pass  # Manager is gone, so the worker can't be stopped; its result is ignored either way.
+        job.result = get_error_result(job.settings, error)
+        self.end_job(job, FAILED)
+
+    def end_job(self, job: BacktestJob, status: str):
+        """
+        Sets final status of job and notifies callback and anyone waiting for jobs.
+        """
+        job.status = CANCELED if job.canceled else status
+        if job.status == FINISHED:
+            job.progress = 100
+        self.notify(job, job.status, job.result)
+        self.lock.notify_all()
+
+    def handle_event(self, jobId: int, event: str, value: Any):
+        """
+        Updates job with an event sent from a worker process.
+        """
+        job = self.jobs[jobId]
+        if job.is_done():
+            return
+        if event == RUNNING:
+            job.status = RUNNING
+        elif event == PROGRESS:
+            job.progress = value['percentage']
+        self.notify(job, event, value)
+
+    def dispatch(self):
+        """
+        Runs dispatcher until the scheduler is closed. If dispatching fails, for example because the process pool
+        broke, the scheduler closes and every job that hasn't ended fails, so nobody waits for them forever. Runs in the
+        dispatcher thread.
+        """
+        try:
+            self.dispatch_jobs()
+        except Exception as e:
+            traceback.print_exc()
+            with self.lock:
+                self.closing = True
+                for job in self.jobs.values():
+                    self.fail_job(job, f'Scheduler failed with {type(e).__name__}: {e}')
+                self.queue.clear()
+                self.active.clear()
+                self.lock.notify_all()
+
+    def dispatch_jobs(self):
+        """
+        Moves queued jobs to the pool as it frees up, streams worker events, and collects results until the scheduler
+        is closed.
+        """
+        while True:
+            with self.lock:
+                while self.queue and len(self.active) < self.processes:
+                    job = self.queue.popleft()
+                    job.future = self.executor.submit(run_worker_job, job.id, job.dataset, job.settings,
+                                                      self.vectorized, job.backtesterOptions)
+                    self.active[job.id] = job
+                if self.closing and not self.queue and not self.active:
+                    return
+
+            try:
+                jobId, event, value = self.events.get(timeout=POLL_INTERVAL)
+                with self.lock:
+                    self.handle_event(jobId, event, value)
+                    while True:
+                        jobId, event, value = self.events.get_nowait()
+                        self.handle_event(jobId, event, value)
+            except queue.Empty:
+                pass
+
+            with self.lock:
+                for job in [job for job in self.active.values() if job.future.done()]:
+                    del self.active[job.id]
+                    if job.is_done():  # Job failed while it was running, so its result is ignored.
+                        continue
+                    try:
+                        job.result = job.future.result()
+                    except Exception as e:
+                        job.result = get_error_result(job.settings, f'{type(e).__name__}: {e}')
+                    self.end_job(job, FAILED if job.result['error'] is not None else FINISHED)
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Waits until every job submitted has ended.
+        :param timeout: Maximum amount of seconds to wait. If none, waits as long as it takes.
+        :return: Boolean whether every job has ended.
+        """
+        with self.lock:
+            return self.lock.wait_for(lambda: all(job.is_done() for job in self.jobs.values()), timeout)
+
+    def close(self, cancel: bool = False):
+        """
+        Waits for jobs to end, then shuts down the process pool and destroys shared datasets created by the
+        scheduler. No jobs can be submitted afterwards.
+        :param cancel: Boolean whether to cancel jobs that haven't ended instead of waiting for them.
+        """
+        if cancel:
+            for job in list(self.jobs.values()):
+                self.cancel(job.id)
+
+        with self.lock:
+            self.closing = True
+            self.lock.notify_all()
+
+        if self.dispatcher is not None:
+            self.dispatcher.join()
+            self.executor.shutdown()
+            self.manager.shutdown()
+            self.events.close()
+
+        for dataset in self.ownedDatasets:
+            dataset.close()
+            dataset.unlink()
+        self.ownedDatasets = []
+
+    def get_results(self) -> List[Dict[str, Any]]:
+        """
+        Returns rows of every job (see BacktestJob.get_row) ranked by net. Jobs without a net go last in the order
+        they were submitted.
+        """
+        rows = sorted((job.get_row() for job in self.jobs.values()),
+                      key=lambda row: (row['net'] is None, -(row['net'] or 0), row['id']))
+        for rank, row in enumerate(rows, start=1):
+            row['rank'] = rank
+        return rows
+
+    def get_results_table(self, precision: int = 2) -> str:
+        """
+        Returns results of every job as a plain text table.
+        :param precision: Decimal places of values.
+        :return: Table string.
+        """
+        rows = [('Rank', 'Job', 'Status', 'Symbol', 'Start', 'End', 'Net', 'Profit %', 'Drawdown %', 'Trades',
+                 'Commissions', 'Name')]
+        for row in self.get_results():
+            values = ('-',) * 5
+            if row['net'] is not None:
+                values = (f"{row['net']:.{precision}f}", f"{row['profitPercentage']:.2f}", f"{row['drawdown']:.2f}",
+                          str(row['trades']), f"{row['commissions']:.{precision}f}")
+            name = row['name'] if row['error'] is None else f"{row['name']} ({row['error']})"
+            rows.append((str(row['rank']), str(row['id']), row['status'], str(row['symbol'] or '-'),
+                         str(row['startDate'] or '-'), str(row['endDate'] or '-'), *values, name))
+
+        widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]) - 1)]
+        return '\n'.join('  '.join(value.rjust(width) for value, width in zip(row, widths)) + '  ' + row[-1]
+                         for row in rows)
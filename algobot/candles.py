@@ -0,0 +1,626 @@
+"""
+Columnar candle storage. Every field is kept in its own contiguous NumPy array instead of one dictionary per period.
+"""
+
+from collections.abc import Mapping
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Union
+
+import numpy as np
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume', 'quote_asset_volume', 'number_of_trades',
+          'taker_buy_base_asset', 'taker_buy_quote_asset')
+AWARE_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+NAIVE_EPOCH = datetime(1970, 1, 1)
+MILLISECOND = timedelta(milliseconds=1)
+DAY_MILLISECONDS = 24 * 60 * 60 * 1000
+
+
+def datetime_to_timestamp(date: datetime) -> int:
+    """
+    Converts datetime object provided to an epoch timestamp in milliseconds. Naive datetime objects are assumed to be
+    in UTC.
+    :param date: Datetime object to convert.
+    :return: Epoch timestamp in milliseconds.
+    """
+    epoch = NAIVE_EPOCH if date.tzinfo is None else AWARE_EPOCH
+    return (date - epoch) // MILLISECOND
+
+
+def timestamp_to_datetime(timestamp: int, timezoneAware: bool = True) -> datetime:
+    """
+    Converts epoch timestamp in milliseconds to a UTC datetime object.
+    :param timestamp: Epoch timestamp in milliseconds.
+    :param timezoneAware: Boolean that determines whether returned datetime object has a UTC timezone or not.
+    :return: Datetime object.
+    """
+    epoch = AWARE_EPOCH if timezoneAware else NAIVE_EPOCH
+    return epoch + timedelta(milliseconds=int(timestamp))
+
+
+def date_to_timestamp(day: Union[date, datetime]) -> int:
+    """
+    Converts date provided to an epoch timestamp in milliseconds of the start of its day in UTC.
+    :param day: Date or datetime object. Only the date of datetime objects is used.
+    :return: Epoch timestamp in milliseconds.
+    """
+    if isinstance(day, datetime):
+        day = day.date()
+    return datetime_to_timestamp(datetime(day.year, day.month, day.day))
+
+
+class CandleRow(Mapping):
+    """
+    Read-only dictionary view of a single period inside a candle store. Rows keep references to the arrays they were
+    created from, so they stay valid even if the store they came from grows or gets reversed. Candle buffers reuse
+    slots of their arrays for newer periods, so their rows are snapshots instead.
+    """
+    __slots__ = ('_timestamps', '_columns', '_index', '_timezoneAware')
+
+    def __init__(self, timestamps: np.ndarray, columns: Dict[str, np.ndarray], index: int, timezoneAware: bool):
+        self._timestamps = timestamps
+        self._columns = columns
+        self._index = index
+        self._timezoneAware = timezoneAware
+
+    def __getitem__(self, key: str) -> Union[datetime, float]:
+        if key == 'date_utc':
+            return timestamp_to_datetime(self._timestamps[self._index], self._timezoneAware)
+        return float(self._columns[key][self._index])
+
+    def __iter__(self):
+        yield 'date_utc'
+        yield from FIELDS
+
+    def __len__(self) -> int:
+        return len(FIELDS) + 1
+
+    def get_timestamp(self) -> int:
+        """
+        Returns epoch timestamp in milliseconds of row.
+        """
+        return int(self._timestamps[self._index])
+
+    def __repr__(self) -> str:
+        return f'CandleRow({dict(self)})'
+
+
+class CandleStore:
+    def __init__(self, capacity: int = 0, timezoneAware: bool = True):
+        """
+        Columnar container of candles. Supports the list operations the rest of the program relies on (indexing,
+        slicing, iteration, appending, popping, reversing, and concatenation) while storing timestamps as int64
+        milliseconds and every other field as float64.
+        :param capacity: Initial amount of periods to reserve space for.
+        :param timezoneAware: Boolean that determines whether dates returned from rows have a UTC timezone or not.
+        """
+        self.timezoneAware = timezoneAware
+        self._length = 0
+        self._timestamps = np.zeros(capacity, dtype=np.int64)
+        self._columns = {field: np.zeros(capacity, dtype=np.float64) for field in FIELDS}
+
+    @classmethod
+    def from_arrays(cls, timestamps: np.ndarray, columns: Dict[str, np.ndarray], timezoneAware: bool = True):
+        """
+        Creates a candle store from arrays provided without copying them. Missing columns are filled with NaN values.
+        :param timestamps: Array of epoch timestamps in milliseconds.
+        :param columns: Dictionary of field names to arrays of values.
+        :param timezoneAware: Boolean that determines whether dates returned from rows have a UTC timezone or not.
+        :return: Candle store.
+        """
+        store = cls.__new__(cls)
+        store.timezoneAware = timezoneAware
+        length = len(timestamps)
+        store._timestamps = np.asarray(timestamps, dtype=np.int64)
+        store._columns = {}
+        for field in FIELDS:
+            if field in columns:
+                store._columns[field] = np.asarray(columns[field], dtype=np.float64)
+            else:
+                store._columns[field] = np.full(length, np.nan)
+        store._length = length
+        return store
+
+    @classmethod
+    def from_value_rows(cls, timestamps: List[int], rows: List[list], timezoneAware: bool = True):
+        """
+        Creates a candle store from timestamps and rows of values ordered the same way as FIELDS. Values can be
+        numbers or numeric strings.
+        :param timestamps: List of epoch timestamps in milliseconds.
+        :param rows: List of rows of values.
+        :param timezoneAware: Boolean that determines whether dates returned from rows have a UTC timezone or not.
+        :return: Candle store.
+        """
+        if len(rows) == 0:
+            return cls(timezoneAware=timezoneAware)
+
+        values = np.array(rows, dtype=np.float64).T.copy()
+        return cls.from_arrays(np.array(timestamps, dtype=np.int64), dict(zip(FIELDS, values)), timezoneAware)
+
+    @classmethod
+    def from_klines(cls, klines: List[list]):
+        """
+        Creates a candle store from klines returned by the Binance API.
+        :param klines: List of klines.
+        :return: Candle store.
+        """
+        return cls.from_value_rows([kline[0] for kline in klines], [kline[1:10] for kline in klines])
+
+    @classmethod
+    def from_dicts(cls, data: Iterable[Mapping], timezoneAware: bool = None):
+        """
+        Creates a candle store from a list of dictionaries. Dates must already be datetime objects.
+        :param data: List of dictionaries with date_utc and price keys.
+        :param timezoneAware: Boolean that determines whether dates returned from rows have a UTC timezone or not. If
+        not provided, it is inferred from the first date.
+        :return: Candle store.
+        """
+        if isinstance(data, CandleStore):
+            return data if data.is_read_only() else data.copy()  # Read-only stores can be shared safely.
+        elif isinstance(data, CandleBuffer):
+            return data.to_store()
+
+        data = list(data)
+        if timezoneAware is None:
+            timezoneAware = len(data) == 0 or data[0]['date_utc'].tzinfo is not None
+
+        length = len(data)
+        timestamps = np.fromiter((datetime_to_timestamp(row['date_utc']) for row in data), np.int64, length)
+        columns = {}
+        for field in FIELDS:
+            if length > 0 and field in data[0]:
+                columns[field] = np.fromiter((row.get(field, np.nan) for row in data), np.float64, length)
+        return cls.from_arrays(timestamps, columns, timezoneAware)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        timestamps = self._timestamps
+        columns = self._columns
+        for index in range(self._length):
+            yield CandleRow(timestamps, columns, index, self.timezoneAware)
+
+    def __getitem__(self, item: Union[int, slice]):
+        if isinstance(item, slice):
+            length = self._length
+            store = CandleStore.__new__(CandleStore)
+            store.timezoneAware = self.timezoneAware
+            store._timestamps = self._timestamps[:length][item]
+            store._columns = {field: values[:length][item] for field, values in self._columns.items()}
+            store._length = len(store._timestamps)
+            return store
+
+        if item < 0:
+            item += self._length
+        if not 0 <= item < self._length:
+            raise IndexError('Candle store index out of range.')
+        return CandleRow(self._timestamps, self._columns, item, self.timezoneAware)
+
+    def __add__(self, other):
+        if not isinstance(other, CandleStore):
+            other = CandleStore.from_dicts(other, timezoneAware=self.timezoneAware)
+        return self.concatenate(self, other)
+
+    def __radd__(self, other):
+        return CandleStore.from_dicts(other, timezoneAware=self.timezoneAware) + self
+
+    def __repr__(self) -> str:
+        return f'CandleStore(length={self._length})'
+
+    @staticmethod
+    def concatenate(first, second):
+        """
+        Returns a new candle store with the periods of the first store followed by the periods of the second one.
+        :param first: First candle store.
+        :param second: Second candle store.
+        :return: Concatenated candle store.
+        """
+        timestamps = np.concatenate((first.get_timestamps(), second.get_timestamps()))
+        columns = {field: np.concatenate((first.get_column(field), second.get_column(field))) for field in FIELDS}
+        return CandleStore.from_arrays(timestamps, columns, first.timezoneAware)
+
+    def _reserve(self, capacity: int):
+        """
+        Reallocates internal arrays, so they can hold at least capacity periods.
+        :param capacity: Amount of periods to reserve space for.
+        """
+        timestamps = np.zeros(capacity, dtype=np.int64)
+        timestamps[:self._length] = self._timestamps[:self._length]
+        self._timestamps = timestamps
+
+        for field, values in self._columns.items():
+            newValues = np.zeros(capacity, dtype=np.float64)
+            newValues[:self._length] = values[:self._length]
+            self._columns[field] = newValues
+
+    def append(self, row: Mapping):
+        """
+        Appends a period to the end of the store. Space is reserved geometrically, so appending is amortized O(1).
+        :param row: Dictionary (or candle row) with date_utc and price keys.
+        """
+        if self._length == len(self._timestamps) or not self._timestamps.flags.writeable:
+            self._reserve(max(16, self._length * 2))
+
+        index = self._length
+        if isinstance(row, CandleRow):
+            self._timestamps[index] = row._timestamps[row._index]
+            for field, values in self._columns.items():
+                values[index] = row._columns[field][row._index]
+        else:
+            self._timestamps[index] = datetime_to_timestamp(row['date_utc'])
+            for field, values in self._columns.items():
+                values[index] = row.get(field, np.nan)
+        self._length += 1
+
+    def extend(self, rows: Iterable[Mapping]):
+        """
+        Appends all periods provided to the end of the store.
+        :param rows: Iterable of dictionaries (or candle rows).
+        """
+        for row in rows:
+            self.append(row)
+
+    def pop(self) -> dict:
+        """
+        Removes the last period from the store and returns it.
+        :return: Dictionary of removed period.
+        """
+        if self._length == 0:
+            raise IndexError('Pop from empty candle store.')
+
+        row = dict(self[self._length - 1])
+        self._length -= 1
+        return row
+
+    def reverse(self):
+        """
+        Reverses the order of periods. New arrays are created, so views and rows taken earlier are left untouched.
+        """
+        self._timestamps = self._timestamps[:self._length][::-1].copy()
+        self._columns = {field: values[:self._length][::-1].copy() for field, values in self._columns.items()}
+
+    def copy(self):
+        """
+        Returns a copy of the candle store that does not share memory with it.
+        :return: Copied candle store.
+        """
+        columns = {field: values.copy() for field, values in self.get_columns().items()}
+        return CandleStore.from_arrays(self.get_timestamps().copy(), columns, self.timezoneAware)
+
+    def is_read_only(self) -> bool:
+        """
+        Returns whether arrays of the store are read-only (e.g. when they live in shared memory). Appending to a
+        read-only store moves it to new arrays first.
+        """
+        return not self._timestamps.flags.writeable
+
+    def get_timestamps(self) -> np.ndarray:
+        """
+        Returns array of epoch timestamps in milliseconds.
+        """
+        return self._timestamps[:self._length]
+
+    def get_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Returns dictionary of field names to arrays of values.
+        """
+        return {field: values[:self._length] for field, values in self._columns.items()}
+
+    def get_column(self, parameter: str) -> np.ndarray:
+        """
+        Returns array of values of parameter provided. Besides regular fields, high/low and open/close return the
+        average of both values for each period.
+        :param parameter: Parameter to get values of.
+        :return: Array of values.
+        """
+        if parameter == 'high/low':
+            return (self._columns['high'][:self._length] + self._columns['low'][:self._length]) / 2
+        elif parameter == 'open/close':
+            return (self._columns['open'][:self._length] + self._columns['close'][:self._length]) / 2
+        else:
+            return self._columns[parameter][:self._length]
+
+    def get_nbytes(self) -> int:
+        """
+        Returns amount of bytes used by the arrays of the store.
+        """
+        return self._timestamps.nbytes + sum(values.nbytes for values in self._columns.values())
+
+    def to_value_rows(self) -> List[tuple]:
+        """
+        Returns periods as a list of tuples with the timestamp followed by values ordered the same way as FIELDS.
+        """
+        columns = [self.get_column(field).tolist() for field in FIELDS]
+        return list(zip(self.get_timestamps().tolist(), *columns))
+
+    def to_dicts(self) -> List[dict]:
+        """
+        Returns periods as a list of dictionaries.
+        """
+        return [dict(row) for row in self]
+
+
+class CandleBuffer:
+    def __init__(self, maxLength: int = None, onEvict: Callable[[CandleStore], None] = None,
+                 timezoneAware: bool = True):
+        """
+        Ring buffer of candles ordered from newest to oldest, so index 0 is the latest period and index n is the period
+        n periods ago. Adding newer periods and indexing are O(1). Once maxLength periods are held, adding a newer
+        period evicts the oldest one and passes it to onEvict. Without a maxLength, the buffer grows geometrically.
+        :param maxLength: Maximum amount of periods to hold. If none, the buffer is unbounded.
+        :param onEvict: Function called with a candle store (newest first) of periods evicted from the buffer.
+        :param timezoneAware: Boolean that determines whether dates returned from rows have a UTC timezone or not.
+        """
+        self.maxLength = maxLength
+        self.onEvict = onEvict
+        self.timezoneAware = timezoneAware
+        self._head = -1  # Physical index of newest period.
+        self._length = 0
+        self._capacity = 0
+        self._timestamps = np.zeros(0, dtype=np.int64)
+        self._columns = {field: np.zeros(0, dtype=np.float64) for field in FIELDS}
+        if maxLength is not None:
+            self._resize(maxLength)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield self[index]
+
+    def __getitem__(self, item: Union[int, slice]):
+        if isinstance(item, slice):
+            positions = self._get_positions(np.arange(self._length)[item])
+            columns = {field: values[positions] for field, values in self._columns.items()}
+            return CandleStore.from_arrays(self._timestamps[positions], columns, self.timezoneAware)
+
+        if item < 0:
+            item += self._length
+        if not 0 <= item < self._length:
+            raise IndexError('Candle buffer index out of range.')
+
+        # Copy the period, so rows kept across inserts don't read newer periods written over evicted ones.
+        position = (self._head - item) % self._capacity
+        columns = {field: values[position:position + 1].copy() for field, values in self._columns.items()}
+        return CandleRow(self._timestamps[position:position + 1].copy(), columns, 0, self.timezoneAware)
+
+    def __add__(self, other):
+        return self.to_store() + other
+
+    def __radd__(self, other):
+        return other + self.to_store()
+
+    def __repr__(self) -> str:
+        return f'CandleBuffer(length={self._length}, maxLength={self.maxLength})'
+
+    def _get_positions(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Returns physical positions of logical indices provided.
+        :param indices: Array of logical indices where 0 is the newest period.
+        :return: Array of physical positions.
+        """
+        if self._capacity == 0:
+            return indices
+        return (self._head - indices) % self._capacity
+
+    def _resize(self, capacity: int):
+        """
+        Reallocates internal arrays to capacity provided and lays periods out from oldest to newest.
+        :param capacity: New capacity of buffer.
+        """
+        positions = self._get_positions(np.arange(self._length)[::-1])
+        timestamps = np.zeros(capacity, dtype=np.int64)
+        timestamps[:self._length] = self._timestamps[positions]
+        self._timestamps = timestamps
+
+        for field, values in self._columns.items():
+            newValues = np.zeros(capacity, dtype=np.float64)
+            newValues[:self._length] = values[positions]
+            self._columns[field] = newValues
+
+        self._capacity = capacity
+        self._head = self._length - 1
+
+    def _reserve(self, count: int):
+        """
+        Grows buffer, so count more periods can be added without evictions if maxLength allows it.
+        :param count: Amount of periods that'll be added.
+        """
+        needed = self._length + count
+        if needed <= self._capacity:
+            return
+
+        capacity = max(16, self._capacity * 2, needed)
+        if self.maxLength is not None:
+            capacity = min(capacity, self.maxLength)
+        if capacity > self._capacity:
+            self._resize(capacity)
+
+    def set_max_length(self, maxLength: int):
+        """
+        Sets maximum amount of periods buffer can hold. Lowering it evicts the oldest periods.
+        :param maxLength: New maximum length. If none, the buffer becomes unbounded.
+        """
+        if maxLength is not None and maxLength < self._length:
+            self.truncate(maxLength)
+        self.maxLength = maxLength
+        if maxLength is not None and maxLength != self._capacity:
+            self._resize(maxLength)
+
+    def truncate(self, length: int):
+        """
+        Evicts the oldest periods, so only length periods are left.
+        :param length: Amount of newest periods to keep.
+        """
+        if length < self._length:
+            self._evict(self[length:])
+            self._length = length
+
+    def _evict(self, store: CandleStore):
+        """
+        Passes evicted periods to eviction callback if there is one.
+        :param store: Candle store of evicted periods.
+        """
+        if self.onEvict is not None and len(store) > 0:
+            self.onEvict(store)
+
+    def append(self, row: Mapping):
+        """
+        Adds a period newer than every other period in the buffer.
+        :param row: Dictionary (or candle row) with date_utc and price keys.
+        """
+        self.extend_newer(CandleStore.from_dicts([row], timezoneAware=self.timezoneAware))
+
+    def extend_newer(self, store: CandleStore):
+        """
+        Adds periods newer than every other period in the buffer. If the buffer overflows, the oldest periods are
+        evicted.
+        :param store: Candle store of periods ordered from newest to oldest.
+        """
+        count = len(store)
+        if count == 0:
+            return
+
+        self._reserve(count)
+        capacity = self._capacity
+        overflow = self._length + count - capacity
+        if overflow > 0:
+            evictedFromBuffer = min(overflow, self._length)
+            evicted = self[self._length - evictedFromBuffer:]
+            if overflow > self._length:
+                evicted = store[capacity:] + evicted
+            self._evict(evicted)
+
+        written = min(count, capacity)
+        self._head = (self._head + written) % capacity
+        positions = (self._head - np.arange(written)) % capacity
+        self._timestamps[positions] = store.get_timestamps()[:written]
+        for field, values in self._columns.items():
+            values[positions] = store.get_column(field)[:written]
+        self._length = min(capacity, self._length + count)
+
+    def extend_older(self, store: CandleStore) -> int:
+        """
+        Adds periods older than every other period in the buffer. Periods that don't fit in the buffer are dropped.
+        :param store: Candle store of periods ordered from newest to oldest.
+        :return: Amount of periods added.
+        """
+        self._reserve(len(store))
+        written = min(len(store), self._capacity - self._length)
+        if written <= 0:
+            return 0
+
+        positions = (self._head - self._length - np.arange(written)) % self._capacity
+        self._timestamps[positions] = store.get_timestamps()[:written]
+        for field, values in self._columns.items():
+            values[positions] = store.get_column(field)[:written]
+        self._length += written
+        return written
+
+    def get_timestamps(self) -> np.ndarray:
+        """
+        Returns array of epoch timestamps in milliseconds ordered from newest to oldest.
+        """
+        return self._timestamps[self._get_positions(np.arange(self._length))]
+
+    def get_column(self, parameter: str) -> np.ndarray:
+        """
+        Returns array of values of parameter provided ordered from newest to oldest.
+        :param parameter: Parameter to get values of.
+        :return: Array of values.
+        """
+        return self[:].get_column(parameter)
+
+    def to_store(self) -> CandleStore:
+        """
+        Returns a candle store with all periods ordered from newest to oldest.
+        """
+        return self[:]
+
+    def to_value_rows(self) -> List[tuple]:
+        """
+        Returns periods as a list of tuples with the timestamp followed by values ordered the same way as FIELDS.
+        """
+        return self.to_store().to_value_rows()
+
+
+class TimestampIndex:
+    def __init__(self, data: Union[CandleStore, CandleBuffer]):
+        """
+        Binary search index of candle data sorted by date in either order, like candle stores in backtests (oldest
+        first) and candle buffers of run-time data (newest first). Timestamps are read from data in place, so lookups
+        are O(log n), nothing is copied, and the index stays valid as periods are added.
+        :param data: Candle store or buffer sorted by date.
+        """
+        self.data = data
+
+    def get_timestamp(self, index: int) -> int:
+        """
+        Returns epoch timestamp in milliseconds of period at index provided.
+        """
+        return self.data[index].get_timestamp()
+
+    def is_descending(self) -> bool:
+        """
+        Returns whether data is ordered from newest to oldest.
+        """
+        return len(self.data) > 1 and self.get_timestamp(0) > self.get_timestamp(-1)
+
+    def bisect(self, timestamp: int, descending: bool = None) -> int:
+        """
+        Returns index that splits data into periods before and after timestamp provided. In ascending data, periods
+        before index are older than timestamp; in descending data, they're at or after timestamp.
+        :param timestamp: Epoch timestamp in milliseconds.
+        :param descending: Boolean whether data is ordered from newest to oldest. If none, it's checked.
+        :return: Index of split.
+        """
+        if descending is None:
+            descending = self.is_descending()
+
+        low, high = 0, len(self.data)
+        while low < high:
+            middle = (low + high) // 2
+            if (self.get_timestamp(middle) >= timestamp) == descending:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def get_slice(self, startTimestamp: int = None, endTimestamp: int = None) -> slice:
+        """
+        Returns slice of data with periods from start timestamp up to (but not including) end timestamp.
+        :param startTimestamp: Epoch timestamp in milliseconds of the oldest period to include. If none, periods
+            start at the oldest one.
+        :param endTimestamp: Epoch timestamp in milliseconds periods have to be older than. If none, periods end at
+            the newest one.
+        :return: Slice of data in its own order.
+        """
+        descending = self.is_descending()
+        oldest, newest = (len(self.data), 0) if descending else (0, len(self.data))
+        start = oldest if startTimestamp is None else self.bisect(startTimestamp, descending)
+        end = newest if endTimestamp is None else self.bisect(endTimestamp, descending)
+        return slice(end, start) if descending else slice(start, end)
+
+    def find_timestamp(self, timestamp: int) -> int:
+        """
+        Returns index of period at timestamp provided.
+        :param timestamp: Epoch timestamp in milliseconds.
+        :return: Index of period if found, else -1.
+        """
+        periods = self.get_slice(timestamp, timestamp + 1)
+        return periods.start if periods.stop > periods.start else -1
+
+    def find_date(self, day: Union[date, datetime], first: bool = True) -> int:
+        """
+        Returns index of the first or last period on date provided.
+        :param day: Date or datetime object. Only the date of datetime objects is used.
+        :param first: Boolean whether to find the first (oldest) period of date or the last (newest) one.
+        :return: Index of period if found, else -1.
+        """
+        startTimestamp = date_to_timestamp(day)
+        periods = self.get_slice(startTimestamp, startTimestamp + DAY_MILLISECONDS)
+        if periods.stop <= periods.start:
+            return -1
+        return periods.start if first != self.is_descending() else periods.stop - 1
@@ -0,0 +1,60 @@
+"""
+Pooled Binance clients. Every client created here mounts the same pooled HTTP adapter, so Data objects and traders in
+one process reuse keep-alive connections instead of opening their own sessions and TLS handshakes. Clients themselves
+are kept per thread, because python-binance stores the last response on the client, so a client shared between threads
+can return another thread's response.
+"""
+
+import threading
+
+from typing import Dict, Tuple
+
+from binance.client import Client
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = 10  # Maximum amount of open connections to each Binance host.
+
+threadClients = threading.local()  # Clients of the current thread keyed by credentials and tld.
+adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, pool_block=True)
+
+
+class PooledClient(Client):
+    def _init_session(self):
+        """
+        Creates Binance session with the shared pooled adapter mounted instead of a private connection pool.
+        """
+        session = super()._init_session()
+        session.mount('https://', adapter)
+        return session
+
+
+def get_thread_clients() -> Dict[Tuple[str, str, str], Client]:
+    """
+    Returns clients of the current thread keyed by credentials and tld.
+    """
+    if not hasattr(threadClients, 'clients'):
+        threadClients.clients = {}
+    return threadClients.clients
+
+
+def get_client(apiKey: str = None, apiSecret: str = None, tld: str = 'com') -> Client:
+    """
+    Returns Binance client with credentials provided. Clients are created once per thread and reused by every caller
+    on that thread afterwards.
+    :param apiKey: API key of client. If none, a public client is returned.
+    :param apiSecret: API secret of client.
+    :param tld: Top level domain. If based in the us, it'll be us; else it'll be com.
+    :return: Binance client.
+    """
+    clients = get_thread_clients()
+    key = (apiKey, apiSecret, tld)
+    if key not in clients:
+        clients[key] = PooledClient(apiKey, apiSecret, tld=tld)
+    return clients[key]
+
+
+def clear_clients():
+    """
+    Removes clients of the current thread. Connections stay in the shared pool for other clients to reuse.
+    """
+    get_thread_clients().clear()
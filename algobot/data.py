@@ -3,18 +3,33 @@ import time
 import os
 
 from datetime import timedelta, timezone, datetime
-from helpers import get_logger, ROOT_DIR, get_ups_and_downs
+from helpers import get_logger, ROOT_DIR, get_data_from_parameter
+from candles import CandleBuffer, CandleStore, TimestampIndex, date_to_timestamp, timestamp_to_datetime
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import closing
-from binance.client import Client
-from binance.helpers import interval_to_milliseconds
-from algorithms import get_sma, get_wma, get_ema
-from typing import List
+from typing import Tuple, Union
+from clients import PooledClient, get_client
+from algorithms import get_ema
+from downloader import DEFAULT_MAX_WORKERS, DEFAULT_WEIGHT_PER_MINUTE, KlineDownloader
+from rolling import RSI_WARM_UP, RollingExtremum, RollingRSI, RollingWindow, get_rsi_averages, get_rsi_from_averages
+from streams import BinanceKlineStream, KlineFeed
+from symbols import get_symbol_registry
+
+DATABASE_PRAGMAS = {
+    'journal_mode': 'WAL',  # Readers don't block writers and commits don't rewrite the whole journal.
+    'synchronous': 'NORMAL',  # Safe with WAL and avoids a sync on every commit.
+    'cache_size': -64000,  # Negative values are in KiB, so this is roughly 64MB of page cache.
+    'mmap_size': 268435456,  # Memory-map up to 256MB of the database file for reads.
+}
+LIVE_LOOKBACK_PERIODS = 2000  # Periods of history live and simulation bots load from the database on startup.
+CHECKPOINT_TABLE = 'download_checkpoints'  # Table with last committed period of unfinished downloads.
 
 
 class Data:
     def __init__(self, interval: str = '1h', symbol: str = 'BTCUSDT', loadData: bool = True,
                  updateData: bool = True, log: bool = False, logFile: str = 'data', logObject=None,
-                 precision: int = 2, callback=None, caller=None):
+                 precision: int = 2, callback=None, caller=None, lookbackPeriods: int = None,
+                 lookbackTimestamp: int = None):
         """
         Data object that will retrieve current and historical prices from the Binance API and calculate moving averages.
         :param: interval: Interval for which the data object will track prices.
@@ -24,16 +39,24 @@ class Data:
         :param: precision: Precision to round data to.
         :param: callback: Signal for GUI to emit back to (if passed).
         :param: caller: Caller of callback (if passed).
+        :param: lookbackPeriods: Maximum amount of most recent periods to load from the database. Older periods are
+        paged in later only if an indicator needs them. If none, all periods are loaded.
+        :param: lookbackTimestamp: Epoch timestamp in milliseconds from which periods are loaded from the database.
         """
         self.callback = callback  # Used to emit signals to GUI if provided.
         self.caller = caller  # Used to specify which caller emitted signals.
-        self.binanceClient = Client()  # Initialize Binance client.
+        self.binanceClient = get_client()  # Binance client of this thread with pooled connections.
         self.logger = self.get_logging_object(log=log, logFile=logFile, logObject=logObject)
         self.validate_interval(interval)  # Validate the interval provided.
         self.interval = interval  # Interval to trade in.
         self.intervalUnit, self.intervalMeasurement = self.get_interval_unit_and_measurement()
         self.precision = precision  # Decimal precision with which to show data.
-        self.dataLimit = 2000  # Max amount of data to contain.
+        self.dataLimit = max(2000, lookbackPeriods or 0)  # Max amount of data to contain.
+        self.lookbackPeriods = lookbackPeriods  # Amount of periods to load from database.
+        self.lookbackTimestamp = lookbackTimestamp  # Timestamp from which to load from database.
+        # Boolean for whether database may have periods older than the ones loaded.
+        self.olderDataAvailable = lookbackPeriods is not None or lookbackTimestamp is not None
+        self.committedTimestamp = None  # Timestamp of newest period known to be in the database.
 
         self.downloadCompleted = False  # Boolean to determine whether data download is completed or not.
         self.downloadLoop = True  # Boolean to determine whether data is being downloaded or not.
@@ -41,9 +64,20 @@ class Data:
         symbol = symbol.upper()
         self.validate_symbol(symbol)  # Validate symbol.
         self.symbol = symbol  # Symbol of data being used.
-        self.data = []  # Total bot data.
+        self.flushExecutor = None  # Single worker thread that flushes evicted periods to the database.
+        self.flushFutures = []  # Pending flushes of evicted periods.
+        # Total bot data. Newest periods are at the front. With a lookback window, the oldest periods are evicted to
+        # the database once data limit is reached.
+        self.data = CandleBuffer(maxLength=self.dataLimit if lookbackPeriods is not None else None,
+                                 onEvict=self.queue_evicted_data)
         self.ema_dict = {}  # Cached past EMA data for memoization.
         self.rsi_data = {}  # Cached past RSI data for memoization.
+        self.rollingWindows = {}  # Rolling SMA and WMA sums keyed by window length, parameter, and offset.
+        self.rsiStates = {}  # Smoothed RSI averages keyed by RSI period and parameter.
+        self.rollingExtremes = {}  # Rolling lowest and highest values keyed by window length, parameter, and maximum.
+        self.feed = None  # Kline feed updated by a stream. If none, the REST API is polled for current data.
+        self.stream = None  # Stream pushing kline messages to feed.
+        self.feedVersion = 0  # Last feed version seen by wait_for_update.
         self.current_values = {  # This dictionary will hold current data values.
             'date_utc': datetime.now(tz=timezone.utc),
             'open': 0,
@@ -146,85 +180,215 @@ class Data:
         os.chdir(currentPath)
         return filePath
 
+    def get_database_connection(self) -> sqlite3.Connection:
+        """
+        Returns a connection to the database file with write-ahead logging and tuned pragmas applied.
+        :return: SQLite connection.
+        """
+        connection = sqlite3.connect(self.databaseFile)
+        for pragma, value in DATABASE_PRAGMAS.items():
+            connection.execute(f'PRAGMA {pragma} = {value}')
+        return connection
+
+    def get_create_table_query(self, table: str = None) -> str:
+        """
+        Returns query that creates a table with the current schema. Dates are stored as UTC epoch milliseconds and
+        prices are stored as real numbers, so rows can be loaded without any string parsing.
+        :param table: Table to create. If none is provided, the interval table is used.
+        :return: Query string.
+        """
+        if table is None:
+            table = self.databaseTable
+
+        return f'''
+                CREATE TABLE IF NOT EXISTS {table}(
+                date_utc INTEGER PRIMARY KEY,
+                open_price REAL NOT NULL,
+                high_price REAL NOT NULL,
+                low_price REAL NOT NULL,
+                close_price REAL NOT NULL,
+                volume REAL NOT NULL,
+                quote_asset_volume REAL NOT NULL,
+                number_of_trades REAL NOT NULL,
+                taker_buy_base_asset REAL NOT NULL,
+                taker_buy_quote_asset REAL NOT NULL
+                ) WITHOUT ROWID;'''
+
     def create_table(self):
         """
-        Creates a new table with interval if it does not exist
+        Creates a new table with interval if it does not exist. If the table exists with the old text schema, it is
+        migrated in place.
         """
-        with closing(sqlite3.connect(self.databaseFile)) as connection:
+        with closing(self.get_database_connection()) as connection:
             with closing(connection.cursor()) as cursor:
+                columns = cursor.execute(f'PRAGMA table_info({self.databaseTable})').fetchall()
+                if columns and columns[0][2].upper() == 'TEXT':
+                    self.migrate_table(connection)
+                else:
+                    cursor.execute(self.get_create_table_query())
                 cursor.execute(f'''
-                                CREATE TABLE IF NOT EXISTS {self.databaseTable}(
-                                date_utc TEXT PRIMARY KEY,
-                                open_price TEXT NOT NULL,
-                                high_price TEXT NOT NULL,
-                                low_price TEXT NOT NULL,
-                                close_price TEXT NOT NULL,
-                                volume TEXT NOT NULL,
-                                quote_asset_volume TEXT NOT NULL,
-                                number_of_trades TEXT NOT NULL,
-                                taker_buy_base_asset TEXT NOT NULL,
-                                taker_buy_quote_asset TEXT NOT NULL
-                                );''')
+                CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE}(
+                table_name TEXT PRIMARY KEY,
+                date_utc INTEGER NOT NULL
+                ) WITHOUT ROWID;''')
                 connection.commit()
 
+    def migrate_table(self, connection: sqlite3.Connection):
+        """
+        Migrates interval table from the old schema (text dates and prices) to the numeric schema. Everything is done
+        in a single transaction, so an interrupted migration leaves the old table untouched.
+        :param connection: Connection to database with table to migrate.
+        """
+        self.output_message(f"Migrating {self.databaseTable} in {self.databaseFile} to numeric schema...")
+        oldTable = f'{self.databaseTable}_old'
+        with connection:
+            connection.execute('BEGIN')
+            connection.execute(f'DROP TABLE IF EXISTS {oldTable}')
+            connection.execute(f'ALTER TABLE {self.databaseTable} RENAME TO {oldTable}')
+            connection.execute(self.get_create_table_query())
+            connection.execute(f'''
+                INSERT OR IGNORE INTO {self.databaseTable}
+                SELECT CAST(strftime('%s', date_utc) AS INTEGER) * 1000, CAST(open_price AS REAL),
+                CAST(high_price AS REAL), CAST(low_price AS REAL), CAST(close_price AS REAL), CAST(volume AS REAL),
+                CAST(quote_asset_volume AS REAL), CAST(number_of_trades AS REAL), CAST(taker_buy_base_asset AS REAL),
+                CAST(taker_buy_quote_asset AS REAL)
+                FROM {oldTable} WHERE strftime('%s', date_utc) IS NOT NULL''')
+            connection.execute(f'DROP TABLE {oldTable}')
+        connection.execute('VACUUM')
+        self.output_message("Migration completed successfully.")
+
+    def get_insert_query(self) -> str:
+        """
+        Returns query that inserts a period to the interval table. Periods that already exist are ignored.
+        :return: Query string.
+        """
+        return f'''INSERT OR IGNORE INTO {self.databaseTable} (date_utc, open_price, high_price, low_price,
+                    close_price, volume, quote_asset_volume, number_of_trades, taker_buy_base_asset,
+                    taker_buy_quote_asset) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);'''
+
     def dump_to_table(self, totalData: list = None) -> bool:
         """
-        Dumps date and price information to database.
+        Dumps date and price information to database. All rows are inserted in a single transaction with executemany,
+        and rows that already exist in the database are ignored.
         :return: A boolean whether data entry was successful or not.
         """
         if totalData is None:
             totalData = self.data
+        if isinstance(totalData, CandleBuffer):
+            totalData = totalData.to_store()
+        elif not isinstance(totalData, CandleStore):
+            totalData = CandleStore.from_dicts(totalData)
+
+        query = self.get_insert_query()
+        startingTime = time.time()
+        with closing(self.get_database_connection()) as connection:
+            try:
+                with connection:
+                    connection.executemany(query, totalData.to_value_rows())
+            except sqlite3.OperationalError:
+                self.output_message("Insertion to database failed. Will retry next run.", 4)
+                return False
 
-        query = f'''INSERT INTO {self.databaseTable} (date_utc, open_price, high_price, low_price, close_price,
-                            volume, quote_asset_volume, number_of_trades, taker_buy_base_asset, taker_buy_quote_asset) 
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);'''
-        with closing(sqlite3.connect(self.databaseFile)) as connection:
-            with closing(connection.cursor()) as cursor:
-                for data in totalData:
-                    try:
-                        cursor.execute(query,
-                                       (data['date_utc'].strftime('%Y-%m-%d %H:%M:%S'),
-                                        data['open'],
-                                        data['high'],
-                                        data['low'],
-                                        data['close'],
-                                        data['volume'],
-                                        data['quote_asset_volume'],
-                                        data['number_of_trades'],
-                                        data['taker_buy_base_asset'],
-                                        data['taker_buy_quote_asset'],
-                                        ))
-                    except sqlite3.IntegrityError:
-                        pass  # This just means the data already exists in the database, so ignore.
-                    except sqlite3.OperationalError:
-                        connection.commit()
-                        self.output_message("Insertion to database failed. Will retry next run.", 4)
-                        return False
-            connection.commit()
-        self.output_message("Successfully stored all new data to database.")
+        if len(totalData) > 0:
+            self.set_committed_timestamp(int(totalData.get_timestamps().max()))
+
+        elapsed = max(time.time() - startingTime, 1e-6)
+        rowsPerSecond = int(len(totalData) / elapsed)
+        self.output_message(f"Successfully stored all new data to database ({len(totalData)} rows, "
+                            f"{rowsPerSecond} rows per second).")
         return True
 
+    def dump_page_to_table(self, klines: list):
+        """
+        Dumps a downloaded page of klines to database and moves the download checkpoint to its last period in the
+        same transaction, so an interrupted download can resume from the last committed page.
+        :param klines: List of klines in ascending order.
+        """
+        if len(klines) == 0:
+            return
+
+        with closing(self.get_database_connection()) as connection:
+            with connection:
+                connection.executemany(self.get_insert_query(), CandleStore.from_klines(klines).to_value_rows())
+                connection.execute(f'INSERT OR REPLACE INTO {CHECKPOINT_TABLE} (table_name, date_utc) VALUES (?, ?)',
+                                   (self.databaseTable, klines[-1][0]))
+        self.set_committed_timestamp(klines[-1][0])
+
+    def set_committed_timestamp(self, timestamp: int):
+        """
+        Records that periods up to timestamp provided are in the database. Periods are committed in chronological
+        order, so periods evicted from run-time data that aren't newer than this timestamp don't have to be dumped.
+        :param timestamp: Epoch timestamp in milliseconds of newest period committed.
+        """
+        if self.committedTimestamp is None or timestamp > self.committedTimestamp:
+            self.committedTimestamp = timestamp
+
+    def get_download_checkpoint(self) -> Union[int, None]:
+        """
+        Returns epoch timestamp in milliseconds of the last period committed by an unfinished download.
+        :return: Timestamp or None if there is no unfinished download.
+        """
+        with closing(self.get_database_connection()) as connection:
+            with closing(connection.cursor()) as cursor:
+                cursor.execute(f'SELECT date_utc FROM {CHECKPOINT_TABLE} WHERE table_name = ?', (self.databaseTable,))
+                result = cursor.fetchone()
+                return None if result is None else result[0]
+
+    def clear_download_checkpoint(self):
+        """
+        Removes download checkpoint once a download finishes.
+        """
+        with closing(self.get_database_connection()) as connection:
+            with connection:
+                connection.execute(f'DELETE FROM {CHECKPOINT_TABLE} WHERE table_name = ?', (self.databaseTable,))
+
     def get_latest_database_row(self) -> list:
         """
         Returns the latest row from database table.
         :return: Row data or None depending on if value exists.
         """
-        with closing(sqlite3.connect(self.databaseFile)) as connection:
+        with closing(self.get_database_connection()) as connection:
             with closing(connection.cursor()) as cursor:
                 cursor.execute(f'SELECT date_utc FROM {self.databaseTable} ORDER BY date_utc DESC LIMIT 1')
                 return cursor.fetchone()
 
+    def get_database_rows(self, before: int = None, after: int = None, limit: int = None) -> list:
+        """
+        Returns rows from database in descending order with an indexed range query on the date primary key.
+        :param before: Only rows with epoch timestamps in milliseconds strictly before this value are returned.
+        :param after: Only rows with epoch timestamps in milliseconds on or after this value are returned.
+        :param limit: Maximum amount of rows to return.
+        :return: List of rows.
+        """
+        conditions = []
+        parameters = []
+        if before is not None:
+            conditions.append('date_utc < ?')
+            parameters.append(before)
+        if after is not None:
+            conditions.append('date_utc >= ?')
+            parameters.append(after)
+
+        query = f'''SELECT "date_utc", "open_price", "high_price", "low_price", "close_price", "volume",
+                    "quote_asset_volume", "number_of_trades", "taker_buy_base_asset", "taker_buy_quote_asset"
+                    FROM {self.databaseTable}'''
+        if conditions:
+            query += f' WHERE {" AND ".join(conditions)}'
+        query += ' ORDER BY date_utc DESC'
+        if limit is not None:
+            query += ' LIMIT ?'
+            parameters.append(limit)
+
+        with closing(self.get_database_connection()) as connection:
+            with closing(connection.cursor()) as cursor:
+                return cursor.execute(query, parameters).fetchall()
+
     def get_data_from_database(self):
         """
-        Loads data from database and appends it to run-time data.
+        Loads data from database and appends it to run-time data. If a lookback window is set, only periods inside of
+        it are loaded.
         """
-        with closing(sqlite3.connect(self.databaseFile)) as connection:
-            with closing(connection.cursor()) as cursor:
-                rows = cursor.execute(f'''
-                        SELECT "date_utc", "open_price", "high_price", "low_price", "close_price", "volume", 
-                        "quote_asset_volume", "number_of_trades", "taker_buy_base_asset", "taker_buy_quote_asset"
-                        FROM {self.databaseTable} ORDER BY date_utc DESC
-                        ''').fetchall()
+        rows = self.get_database_rows(after=self.lookbackTimestamp, limit=self.lookbackPeriods)
 
         if len(rows) > 0:
             self.output_message("Retrieving data from database...")
@@ -232,19 +396,67 @@ class Data:
             self.output_message("No data found in database.")
             return
 
-        for row in rows:
-            date_utc = datetime.strptime(row[0], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
-            self.data.append({'date_utc': date_utc,
-                              'open': float(row[1]),
-                              'high': float(row[2]),
-                              'low': float(row[3]),
-                              'close': float(row[4]),
-                              'volume': float(row[5]),
-                              'quote_asset_volume': float(row[6]),
-                              'number_of_trades': float(row[7]),
-                              'taker_buy_base_asset': float(row[8]),
-                              'taker_buy_quote_asset': float(row[9]),
-                              })
+        self.set_committed_timestamp(rows[0][0])
+        self.data.extend_older(CandleStore.from_value_rows([row[0] for row in rows], [row[1:] for row in rows]))
+
+    def load_older_data(self, periods: int) -> int:
+        """
+        Pages in periods older than the oldest period loaded from the database and appends them to run-time data.
+        :param periods: Amount of older periods to load.
+        :return: Amount of periods loaded.
+        """
+        if self.data.maxLength is not None:
+            periods = min(periods, self.data.maxLength - len(self.data))  # Only page in what fits in run-time data.
+        if not self.olderDataAvailable or periods <= 0:
+            return 0
+
+        self.flush_evicted_data()  # Evicted periods have to be in the database before paging them back in.
+        before = self.data[-1].get_timestamp() if len(self.data) > 0 else None
+        rows = self.get_database_rows(before=before, limit=periods)
+        if len(rows) < periods:
+            self.olderDataAvailable = False
+
+        if len(rows) > 0:
+            self.output_message(f"Loaded {len(rows)} older periods from database.", 3)
+            self.data.extend_older(CandleStore.from_value_rows([row[0] for row in rows], [row[1:] for row in rows]))
+        return len(rows)
+
+    def ensure_data_length(self, length: int):
+        """
+        Makes sure run-time data has at least length periods if the database has them, so indicators that need a
+        longer history than the lookback window can still be calculated.
+        :param length: Amount of periods needed.
+        """
+        if len(self.data) < length:
+            self.dataLimit = max(self.dataLimit, length * 2)  # Don't trim away data that's needed again.
+            if self.data.maxLength is not None and self.data.maxLength < self.dataLimit:
+                self.data.set_max_length(self.dataLimit)
+            self.load_older_data(length - len(self.data))
+
+    def queue_evicted_data(self, evictedData: CandleStore):
+        """
+        Queues periods evicted from run-time data to be dumped to the database on a background thread. Periods that are
+        already in the database, like the ones a download just committed, are skipped.
+        :param evictedData: Candle store of evicted periods ordered from newest to oldest.
+        """
+        self.olderDataAvailable = True
+        if self.committedTimestamp is not None:
+            evictedData = evictedData[:int((evictedData.get_timestamps() > self.committedTimestamp).sum())]
+            if len(evictedData) == 0:
+                return
+
+        if self.flushExecutor is None:
+            self.flushExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='DataFlush')
+        self.flushFutures = [future for future in self.flushFutures if not future.done()]
+        self.flushFutures.append(self.flushExecutor.submit(self.dump_to_table, evictedData))
+
+    def flush_evicted_data(self):
+        """
+        Blocks until all evicted periods queued are dumped to the database.
+        """
+        for future in self.flushFutures:
+            future.result()
+        self.flushFutures = []
 
     def database_is_updated(self) -> bool:
         """
@@ -254,21 +466,26 @@ class Data:
         result = self.get_latest_database_row()
         if result is None:
             return False
-        latestDate = datetime.strptime(result[0], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+        latestDate = timestamp_to_datetime(result[0])
         return self.is_latest_date(latestDate)
 
     # noinspection PyProtectedMember
     def get_latest_timestamp(self) -> int:
         """
-        Returns latest timestamp available based on database.
+        Returns latest timestamp available based on database. If a previous download was interrupted, the timestamp
+        right after its last committed page is returned, so the download resumes from there.
         :return: Latest timestamp.
         """
+        checkpoint = self.get_download_checkpoint()
+        if checkpoint is not None:
+            self.output_message(f"Resuming download from UTC {timestamp_to_datetime(checkpoint)}.")
+            return checkpoint + 1
+
         result = self.get_latest_database_row()
         if result is None:
             return self.binanceClient._get_earliest_valid_timestamp(self.symbol, self.interval)
         else:
-            latestDate = datetime.strptime(result[0], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
-            return int(latestDate.timestamp()) * 1000 + 1  # Converting timestamp to milliseconds
+            return result[0] + 1  # Timestamps are stored in milliseconds.
 
     # noinspection PyProtectedMember
     def update_database_and_data(self):
@@ -280,75 +497,58 @@ class Data:
             timestamp = self.binanceClient._get_earliest_valid_timestamp(self.symbol, self.interval)
             self.output_message(f'Downloading all available historical data for {self.interval} intervals.')
         else:
-            latestDate = datetime.strptime(result[0], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
-            timestamp = int(latestDate.timestamp()) * 1000  # Converting timestamp to milliseconds
+            latestDate = timestamp_to_datetime(result[0])
+            timestamp = result[0]  # Timestamps are stored in milliseconds.
             dateWithIntervalAdded = latestDate + timedelta(minutes=self.get_interval_minutes())
             self.output_message(f"Previous data up to UTC {dateWithIntervalAdded} found.")
 
         if not self.database_is_updated():
             newData = self.get_new_data(timestamp)
             self.output_message("Successfully downloaded all new data.")
-            self.output_message("Inserting data to live program...")
-            self.insert_data(newData)
             self.output_message("Storing updated data to database...")
-            self.dump_to_table(self.data[-len(newData):])
+            self.dump_to_table(CandleStore.from_klines(newData))
+            self.output_message("Inserting data to live program...")
+            self.insert_data(newData)  # New data is committed already, so periods it evicts aren't dumped again.
         else:
             self.output_message("Database is up-to-date.")
 
     # noinspection PyProtectedMember
     def custom_get_new_data(self, limit: int = 500, progress_callback=None, locked=None, removeFirst=False,
-                            caller=-1) -> List[dict]:
+                            caller=-1, maxWorkers: int = DEFAULT_MAX_WORKERS,
+                            weightPerMinute: int = DEFAULT_WEIGHT_PER_MINUTE) -> CandleStore:
         """
-        Returns new data from Binance API from timestamp specified, however this one is custom-made.
+        Returns new data from Binance API from timestamp specified, however this one is custom-made. Pages are
+        downloaded concurrently while staying within the request weight budget provided. Every page is committed to
+        the database as soon as it arrives, so a canceled or interrupted download resumes where it left off.
         :param caller: Caller that called this function. Only used for botThread.
         :param removeFirst: Boolean whether newest data is removed or not.
         :param locked: Signal to emit back to GUI when storing data. Cannot be canceled once here. Used for databases.
         :param progress_callback: Signal to emit back to GUI to show progress.
         :param limit: Limit per pull.
-        :return: A list of dictionaries.
+        :param maxWorkers: Amount of pages to download at the same time.
+        :param weightPerMinute: Binance request weight budget per minute.
+        :return: Candle store with all data.
         """
-        # This code below is taken from binance client and slightly refactored.
-        self.downloadLoop = True
-        output_data = []  # Initialize our list
-        timeframe = interval_to_milliseconds(self.interval)
-        start_ts = total_beginning_timestamp = self.get_latest_timestamp()
-        end_progress = time.time() * 1000 - total_beginning_timestamp
-        idx = 0
-
-        while True and self.downloadLoop:
-            tempData = self.binanceClient.get_klines(
-                symbol=self.symbol,
-                interval=self.interval,
-                limit=limit,
-                startTime=start_ts,
-                endTime=None
-            )
-
-            if not len(tempData):
-                break
-
-            output_data += tempData
-            start_ts = tempData[-1][0]
+        def emit_progress(pageNumber: int, totalPages: int):
             if progress_callback:
-                progress = (start_ts - total_beginning_timestamp) / end_progress * 94
-                progress_callback.emit(int(progress), "Downloading data...", caller)
+                progress_callback.emit(int(pageNumber / totalPages * 94), "Downloading data...", caller)
 
-            idx += 1
-            # check if we received less than the required limit and exit the loop
-            if len(tempData) < limit:
-                # exit the while loop
-                break
+        def commit_page(page: list):
+            # The current period is still open, so it is left out of the database.
+            self.dump_page_to_table([kline for kline in page if kline[6] < startingTimestamp])
 
-            # increment next call by our timeframe
-            start_ts += timeframe
-
-            # sleep after every 5th call to be kind to the API
-            if idx % 5 == 0:
-                time.sleep(1)
+        self.downloadLoop = True
+        startingTimestamp = int(time.time() * 1000)
+        downloader = KlineDownloader(PooledClient, symbol=self.symbol, interval=self.interval, limit=limit,
+                                     maxWorkers=maxWorkers, weightPerMinute=weightPerMinute)
+        output_data = downloader.download(self.get_latest_timestamp(), isRunning=lambda: self.downloadLoop,
+                                          progressCallback=emit_progress, pageCallback=commit_page)
 
         if not self.downloadLoop:
-            progress_callback.emit(-1, "Download canceled.", caller)
-            return []
+            progress_callback.emit(-1, "Download canceled. Downloaded data is saved and will be resumed.", caller)
+            return CandleStore()
+
+        self.clear_download_checkpoint()
 
         if locked:
             locked.emit()
@@ -358,17 +558,10 @@ class Data:
 
         progress_callback.emit(95, "Saving data...", caller)
         self.insert_data(output_data)
-        progress_callback.emit(97, "This may take a while. Dumping data to database...", caller)
-
-        if removeFirst:  # We don't want current data as it's not the latest data.
-            self.dump_to_table(self.data[:len(output_data)])
-        else:
-            self.dump_to_table(self.data[1:len(output_data)])
-
         progress_callback.emit(100, "Downloaded all new data successfully.", caller)
         self.downloadLoop = False
         self.downloadCompleted = True
-        return self.data
+        return self.data.to_store()
 
     def get_new_data(self, timestamp, limit: int = 1000) -> list:
         """
@@ -404,24 +597,7 @@ class Data:
         Inserts data from newData to run-time data.
         :param newData: List with new data values.
         """
-        temp_data = []
-
-        for data in newData[::-1]:
-            parsedDate = datetime.fromtimestamp(int(data[0]) / 1000, tz=timezone.utc)
-            current_dict = {'date_utc': parsedDate,
-                            'open': float(data[1]),
-                            'high': float(data[2]),
-                            'low': float(data[3]),
-                            'close': float(data[4]),
-                            'volume': float(data[5]),
-                            'quote_asset_volume': float(data[6]),
-                            'number_of_trades': float(data[7]),
-                            'taker_buy_base_asset': float(data[8]),
-                            'taker_buy_quote_asset': float(data[9]),
-                            }
-            temp_data.append(current_dict)
-
-        self.data = temp_data + self.data
+        self.data.extend_newer(CandleStore.from_klines(newData[::-1]))
 
     def update_data(self, verbose=False):
         """
@@ -447,20 +623,113 @@ class Data:
 
     def remove_past_data_if_needed(self):
         """
-        Remove past data past data limit.
+        Remove past data past data limit. Bounded run-time data evicts past data on its own, so this only trims
+        unbounded data. Removed periods are dumped to the database in the background.
         """
         if len(self.data) > self.dataLimit:  # Remove past data.
-            self.dump_to_table()
-            self.data = self.data[:self.dataLimit // 2]
+            self.data.truncate(self.dataLimit // 2)
+
+    def get_kline_dictionary(self, kline: list) -> dict:
+        """
+        Converts kline list from Binance to a dictionary with open, high, low, and close prices.
+        :param kline: Kline list.
+        :return: Dictionary with kline values.
+        """
+        return {'date_utc': timestamp_to_datetime(kline[0]),
+                'open': float(kline[1]),
+                'high': float(kline[2]),
+                'low': float(kline[3]),
+                'close': float(kline[4]),
+                'volume': float(kline[5]),
+                'quote_asset_volume': float(kline[6]),
+                'number_of_trades': float(kline[7]),
+                'taker_buy_base_asset': float(kline[8]),
+                'taker_buy_quote_asset': float(kline[9]), }
+
+    def start_stream(self, streamFactory=None):
+        """
+        Starts streaming klines. While streaming, current data is updated from pushed messages instead of REST calls.
+        :param streamFactory: Function that takes a kline feed and returns a stream (with start and stop methods)
+            pushing to it. If none, Binance's kline websocket is used.
+        """
+        self.stop_stream()
+        if streamFactory is None:
+            def streamFactory(feed: KlineFeed):
+                return BinanceKlineStream(feed, self.binanceClient, symbol=self.symbol, interval=self.interval)
+
+        self.feed = KlineFeed()
+        self.feedVersion = 0
+        self.stream = streamFactory(self.feed)
+        try:
+            self.stream.start()
+        except Exception:
+            self.feed = self.stream = None
+            raise
+        self.output_message(f"Streaming {self.symbol} klines for {self.interval} intervals.")
+
+    def stop_stream(self):
+        """
+        Stops streaming klines and goes back to polling the REST API.
+        """
+        if self.stream is not None:
+            self.stream.stop()
+        self.feed = self.stream = None
+
+    def apply_stream_updates(self) -> bool:
+        """
+        Inserts periods closed since the last call to run-time data and sets current values from the feed.
+        :return: Boolean whether current values are up-to-date with the stream or not. If not (no update for the open
+            period arrived yet or periods were missed), the REST API has to be used.
+        """
+        closedKlines, currentKline = self.feed.pop_updates()
+        if self.feed.error is not None:
+            self.output_message(f"Stream error: {self.feed.error}", 4)
+            self.feed.error = None
+
+        latestTimestamp = self.data[0].get_timestamp() if len(self.data) > 0 else None
+        if latestTimestamp is None:
+            return False
+
+        intervalMilliseconds = self.get_interval_minutes() * 60 * 1000
+        newKlines = [kline for kline in closedKlines if kline[0] > latestTimestamp]
+        if newKlines:
+            if newKlines[0][0] - latestTimestamp > intervalMilliseconds:
+                return False  # Periods were missed while stream was down.
+            self.insert_data(newKlines)
+            latestTimestamp = newKlines[-1][0]
+
+        if currentKline is None or currentKline[0] != latestTimestamp + intervalMilliseconds:
+            return False
+
+        self.current_values = self.get_kline_dictionary(currentKline)
+        return True
+
+    def wait_for_update(self, timeout: float = None) -> bool:
+        """
+        Blocks until the stream pushes new data or timeout passes.
+        :param timeout: Maximum seconds to wait.
+        :return: Boolean whether new data arrived or not.
+        """
+        if self.feed is None:
+            return False
+
+        version = self.feed.wait_for_update(self.feedVersion, timeout=timeout)
+        updated = version != self.feedVersion
+        self.feedVersion = version
+        return updated
 
     def get_current_data(self, counter: int = 0) -> dict:
         """
-        Retrieves current market dictionary with open, high, low, close prices.
+        Retrieves current market dictionary with open, high, low, close prices. If klines are streamed, the latest
+        streamed values are returned without any REST calls.
         :param counter: Counter to check how many times bot is trying to retrieve current data.
         :return: A dictionary with current open, high, low, and close prices.
         """
         try:
             self.remove_past_data_if_needed()
+            if self.feed is not None and self.apply_stream_updates():
+                return self.current_values
+
             if not self.data_is_updated():
                 self.update_data()
 
@@ -474,16 +743,7 @@ class Data:
                                                         startTime=currentTimestamp,
                                                         endTime=nextTimestamp,
                                                         )[0]
-            currentDataDictionary = {'date_utc': currentInterval,
-                                     'open': float(currentData[1]),
-                                     'high': float(currentData[2]),
-                                     'low': float(currentData[3]),
-                                     'close': float(currentData[4]),
-                                     'volume': float(currentData[5]),
-                                     'quote_asset_volume': float(currentData[6]),
-                                     'number_of_trades': float(currentData[7]),
-                                     'taker_buy_base_asset': float(currentData[8]),
-                                     'taker_buy_quote_asset': float(currentData[9]), }
+            currentDataDictionary = self.get_kline_dictionary(currentData)
             self.current_values = currentDataDictionary
             if counter > 0:
                 self.try_callback(f"Successfully reconnected.")
@@ -494,6 +754,9 @@ class Data:
             self.output_message(error_message, 4)
             self.try_callback(f"Internet connectivity issue detected. Trying again in {sleepTime} seconds.")
             self.ema_dict = {}  # Reset EMA cache as it could be corrupted.
+            self.rollingWindows = {}
+            self.rsiStates = {}
+            self.rollingExtremes = {}
             time.sleep(sleepTime)
             return self.get_current_data(counter=counter + 1)
 
@@ -507,9 +770,12 @@ class Data:
 
     def get_current_price(self) -> float:
         """
-        Returns the current market ticker price.
+        Returns the current market ticker price. If klines are streamed, the latest streamed close price is returned.
         :return: Ticker market price
         """
+        if self.feed is not None and self.apply_stream_updates():
+            return self.current_values['close']
+
         try:
             return float(self.binanceClient.get_symbol_ticker(symbol=self.symbol)['price'])
         except Exception as e:
@@ -596,10 +862,7 @@ class Data:
 
         data = self.data
         if startDate is not None:
-            for index, period in enumerate(data):
-                if period['date_utc'].date() < startDate:
-                    data = self.data[:index]
-                    break
+            data = self.data[TimestampIndex(self.data).get_slice(date_to_timestamp(startDate))]
 
         if descending:
             path = self.write_csv_data(data, fileName=fileName, armyTime=armyTime)
@@ -636,15 +899,12 @@ class Data:
 
     def is_valid_symbol(self, symbol: str) -> bool:
         """
-        Checks whether the symbol provided is valid or not for Binance.
+        Checks whether the symbol provided is valid or not for Binance. Symbols are looked up in the process-wide
+        symbol registry, so exchange information is only downloaded once its cache expires.
         :param symbol: Symbol to be checked.
         :return: A boolean whether the symbol is valid or not.
         """
-        tickers = self.binanceClient.get_all_tickers()
-        for ticker in tickers:
-            if ticker['symbol'] == symbol:
-                return True
-        return False
+        return get_symbol_registry().is_valid_symbol(symbol, client=self.binanceClient)
 
     def is_valid_average_input(self, shift: int, prices: int, extraShift: int = 0) -> bool:
         """
@@ -660,7 +920,9 @@ class Data:
         elif prices <= 0:
             self.output_message("Prices cannot be 0 or less than 0.")
             return False
-        elif shift + extraShift + prices > len(self.data) + 1:
+
+        self.ensure_data_length(shift + extraShift + prices - 1)  # Page in older data from database if needed.
+        if shift + extraShift + prices > len(self.data) + 1:
             self.output_message("Shift + prices period cannot be more than data available.")
             return False
         return True
@@ -686,29 +948,55 @@ class Data:
         self.output_message("Data has been verified to be correct.")
         return True
 
-    def get_total_non_updated_data(self) -> list:
-        return [self.current_values] + self.data
+    def get_total_non_updated_data(self) -> CandleStore:
+        return self.get_total_data(update=False)
+
+    def get_total_data(self, update: bool = True, end: int = None) -> CandleStore:
+        """
+        Returns current period followed by run-time data. Only periods up to end are copied from run-time data.
+        :param update: Boolean for whether function should call API and get latest data or not.
+        :param end: Amount of run-time data periods to include. If none, all periods are included.
+        :return: Candle store with current period at the front.
+        """
+        currentData = self.get_current_data() if update else self.current_values
+        return [currentData] + self.data[:end]
 
     def get_summation(self, prices: int, parameter: str, round_value: bool = True, update: bool = True) -> float:
         """
-        Returns total summation.
+        Returns total summation. Closed periods are summed incrementally, so only periods closed since the last call
+        are added to the total.
         :param update: Boolean for whether function should call API and get latest data or not.
         :param prices: Amount of periods to iterate through for summation.
         :param parameter: Parameter to iterate through.
         :param round_value: Boolean that determines whether returned output is rounded or not.
         :return: Total summation.
         """
-        data = [self.get_current_data()] + self.data if update else self.get_total_non_updated_data()
-        data = data[:prices]
-
-        total = 0
-        for period in data:
-            total += period[parameter]
+        window, currentValue = self.get_moving_average_window(prices, parameter, shift=0, update=update)
+        total = window.get_sum(currentValue)
 
         if round_value:
             return round(total, self.precision)
         return total
 
+    def get_extremum(self, prices: int, parameter: str, findMax: bool, update: bool) -> float:
+        """
+        Returns lowest or highest value of parameter over the current period and the prices - 1 periods before it.
+        Closed periods are kept in a monotonic deque synced with run-time data, so lookups are O(1) amortized.
+        :param prices: Amount of periods to iterate through.
+        :param parameter: Parameter to iterate through.
+        :param findMax: Boolean whether highest or lowest value is returned.
+        :param update: Boolean for whether function should call API and get latest data or not.
+        :return: Lowest or highest value.
+        """
+        currentData = self.get_current_data() if update else self.current_values
+        key = (prices - 1, parameter, findMax)
+        if key not in self.rollingExtremes:
+            self.rollingExtremes[key] = RollingExtremum(prices - 1, parameter, findMax)
+
+        extremum = self.rollingExtremes[key]
+        extremum.sync(self.data)
+        return extremum.get_value(get_data_from_parameter(currentData, parameter))
+
     def get_lowest_low_value(self, prices: int, parameter: str = 'low', round_value: bool = True,
                              update: bool = True) -> float:
         """
@@ -719,14 +1007,7 @@ class Data:
         :param round_value: Boolean that determines whether returned output is rounded or not.
         :return: Lowest low value from periods.
         """
-        data = [self.get_current_data()] + self.data if update else self.get_total_non_updated_data()
-        data = data[:prices]
-
-        lowest = data[0][parameter]
-
-        for period in data[1:]:
-            if period[parameter] < lowest:
-                lowest = period[parameter]
+        lowest = self.get_extremum(prices, parameter, findMax=False, update=update)
 
         if round_value:
             return round(lowest, self.precision)
@@ -742,14 +1023,7 @@ class Data:
         :param round_value: Boolean that determines whether returned output is rounded or not.
         :return: Highest high value from periods.
         """
-        data = [self.get_current_data()] + self.data if update else self.get_total_non_updated_data()
-        data = data[:prices]
-
-        highest = data[0][parameter]
-
-        for period in data[1:]:
-            if period[parameter] > highest:
-                highest = period[parameter]
+        highest = self.get_extremum(prices, parameter, findMax=True, update=update)
 
         if round_value:
             return round(highest, self.precision)
@@ -777,7 +1051,8 @@ class Data:
     def get_rsi(self, prices: int = 14, parameter: str = 'close', shift: int = 0, round_value: bool = True,
                 update: bool = True) -> float:
         """
-        Returns relative strength index.
+        Returns relative strength index. Smoothed averages are carried forward as periods close, and the current
+        period is evaluated on top of them without changing them.
         :param update: Boolean for whether function should call API and get latest data or not.
         :param prices: Amount of prices to iterate through.
         :param parameter: Parameter to use for iterations. By default, it's close.
@@ -788,35 +1063,58 @@ class Data:
         if not self.is_valid_average_input(shift, prices):
             raise ValueError('Invalid input specified.')
 
-        if shift > 0:
-            updateDict = False
-            data = self.data
-            shift -= 1
-        else:
-            updateDict = True
-            data = [self.get_current_data()] + self.data if update else self.get_total_non_updated_data()
+        self.ensure_data_length(RSI_WARM_UP + prices + shift)
+        currentValue = None
+        if shift == 0:
+            currentData = self.get_current_data() if update else self.current_values
+            currentValue = get_data_from_parameter(currentData, parameter)
 
-        start = 500 + prices + shift if len(data) > 500 + prices + shift else len(data)
-        data = data[shift:start]
-        data = data[:]
-        data.reverse()
+        key = (prices, parameter)
+        if key not in self.rsiStates:
+            self.rsiStates[key] = RollingRSI(prices, parameter)
 
-        ups, downs = get_ups_and_downs(data=data, parameter=parameter)
-        averageUp, averageDown = self.helper_get_ema(ups, downs, prices)
-        rs = averageUp / averageDown
-        rsi = 100 - 100 / (1 + rs)
+        rsiState = self.rsiStates[key]
+        rsiState.sync(self.data)
+        rsi = rsiState.get_rsi(periodsAgo=max(shift - 1, 0), currentValue=currentValue)
+        if rsi is None:  # Shifted further back than the states kept, so calculate it from scratch.
+            data = self.data[shift - 1:shift - 1 + RSI_WARM_UP + prices]
+            rsi = get_rsi_from_averages(*get_rsi_averages(data.get_column(parameter).tolist()[::-1], prices))
 
-        if shift == 0 and updateDict:
+        if shift == 0:
             self.rsi_data[prices] = rsi
 
         if round_value:
             return round(rsi, self.precision)
         return rsi
 
+    def get_moving_average_window(self, prices: int, parameter: str, shift: int,
+                                  update: bool) -> Tuple[RollingWindow, Union[float, None]]:
+        """
+        Returns rolling window of closed periods synced with run-time data and the current period's value. With no
+        shift, the window holds the prices - 1 periods before the current period and the current value completes it.
+        Otherwise, the window holds prices periods starting shift periods ago and no current value is returned.
+        :param prices: Amount of prices in moving average.
+        :param parameter: Parameter to get the average of.
+        :param shift: Prices shifted from current period.
+        :param update: Boolean for whether function should call API and get latest data or not.
+        :return: Tuple of rolling window and current value.
+        """
+        currentData = self.get_current_data() if update else self.current_values
+        length, offset = (prices - 1, 0) if shift == 0 else (prices, shift - 1)
+        key = (length, parameter, offset)
+        if key not in self.rollingWindows:
+            self.rollingWindows[key] = RollingWindow(length, parameter, offset)
+
+        window = self.rollingWindows[key]
+        window.sync(self.data)
+        currentValue = get_data_from_parameter(currentData, parameter) if shift == 0 else None
+        return window, currentValue
+
     def get_sma(self, prices: int, parameter: str, shift: int = 0, round_value: bool = True,
                 update: bool = True) -> float:
         """
-        Returns the simple moving average with run-time data and prices provided.
+        Returns the simple moving average with run-time data and prices provided. Closed periods are summed
+        incrementally, so only periods closed since the last call are added to the average.
         :param update: Boolean for whether function should call API and get latest data or not.
         :param boolean round_value: Boolean that specifies whether return value should be rounded
         :param int prices: Number of values for average
@@ -827,9 +1125,8 @@ class Data:
         if not self.is_valid_average_input(shift, prices):
             raise ValueError('Invalid average input specified.')
 
-        data = [self.get_current_data()] + self.data if update else self.get_total_non_updated_data()
-        data = data[shift: prices + shift]  # Data now starts from shift and goes up to prices + shift
-        sma = get_sma(data, prices, parameter)
+        window, currentValue = self.get_moving_average_window(prices, parameter, shift, update)
+        sma = window.get_sma(prices, currentValue)
 
         if round_value:
             return round(sma, self.precision)
@@ -838,7 +1135,8 @@ class Data:
     def get_wma(self, prices: int, parameter: str, shift: int = 0, round_value: bool = True,
                 update: bool = True) -> float:
         """
-        Returns the weighted moving average with run-time data and prices provided.
+        Returns the weighted moving average with run-time data and prices provided. Closed periods are summed
+        incrementally, so only periods closed since the last call are added to the average.
         :param update: Boolean for whether function should call API and get latest data or not.
         :param shift: Prices shifted from current period.
         :param boolean round_value: Boolean that specifies whether return value should be rounded
@@ -849,9 +1147,8 @@ class Data:
         if not self.is_valid_average_input(shift, prices):
             raise ValueError('Invalid average input specified.')
 
-        data = [self.get_current_data()] + self.data if update else self.get_total_non_updated_data()
-        data = data[shift: prices + shift]
-        wma = get_wma(data, prices, parameter)
+        window, currentValue = self.get_moving_average_window(prices, parameter, shift, update)
+        wma = window.get_wma(prices, currentValue)
 
         if round_value:
             return round(wma, self.precision)
@@ -878,7 +1175,7 @@ class Data:
             self.ema_dict = {}
             self.update_data()
 
-        data = [self.get_current_data()] + self.data if update else self.get_total_non_updated_data()
+        data = self.get_total_data(update)
         data = data[shift:]
         ema, self.ema_dict = get_ema(data, prices, parameter, sma_prices, self.ema_dict)
 
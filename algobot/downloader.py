@@ -0,0 +1,185 @@
+"""
+Concurrent historical kline downloader. The requested time range is split into page-sized chunks that are fetched on a
+thread pool while a token bucket keeps the request weight under Binance's limits.
+"""
+
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Tuple
+
+from binance.helpers import interval_to_milliseconds
+
+DEFAULT_MAX_WORKERS = 4  # Amount of pages fetched at the same time.
+DEFAULT_WEIGHT_PER_MINUTE = 600  # Half of Binance's 1200 weight per minute, so live bots still have room.
+
+
+def get_klines_request_weight(limit: int) -> int:
+    """
+    Returns Binance request weight of a kline request with limit provided.
+    :param limit: Amount of klines requested.
+    :return: Request weight.
+    """
+    if limit < 100:
+        return 1
+    elif limit < 500:
+        return 2
+    elif limit <= 1000:
+        return 5
+    return 10
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, refillRate: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Thread-safe token bucket used to rate limit requests.
+        :param capacity: Maximum amount of tokens bucket can hold. Bucket starts full.
+        :param refillRate: Amount of tokens added per second.
+        :param clock: Function that returns current time in seconds.
+        :param sleep: Function used to wait for tokens.
+        """
+        if capacity <= 0 or refillRate <= 0:
+            raise ValueError("Token bucket capacity and refill rate must be greater than 0.")
+
+        self.capacity = capacity
+        self.refillRate = refillRate
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = capacity
+        self.lastRefill = clock()
+        self.lock = threading.Lock()
+
+    def refill(self):
+        """
+        Adds tokens accumulated since last refill.
+        """
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.lastRefill) * self.refillRate)
+        self.lastRefill = now
+
+    def acquire(self, tokens: float = 1):
+        """
+        Takes tokens from bucket and blocks until enough tokens are available.
+        :param tokens: Amount of tokens to take.
+        """
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self.lock:
+                self.refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                waitTime = (tokens - self.tokens) / self.refillRate
+            self.sleep(waitTime)
+
+
+class KlineDownloader:
+    def __init__(self, clientFactory: Callable[[], Any], symbol: str, interval: str, limit: int = 500,
+                 maxWorkers: int = DEFAULT_MAX_WORKERS, weightPerMinute: int = DEFAULT_WEIGHT_PER_MINUTE,
+                 bucket: TokenBucket = None):
+        """
+        Downloads historical klines concurrently.
+        :param clientFactory: Function that returns a Binance client (or any object with a compatible get_klines
+        method). It's called once per worker thread, because python-binance keeps the last response on the client, so
+        a client shared by workers can return another worker's page.
+        :param symbol: Symbol to download klines of.
+        :param interval: Interval to download klines in.
+        :param limit: Amount of klines per page.
+        :param maxWorkers: Amount of pages fetched at the same time.
+        :param weightPerMinute: Request weight budget per minute.
+        :param bucket: Token bucket to use. If none, a bucket is created from weightPerMinute.
+        """
+        self.clientFactory = clientFactory
+        self.workerClients = threading.local()  # Client of every worker thread.
+        self.symbol = symbol
+        self.interval = interval
+        self.limit = limit
+        self.maxWorkers = maxWorkers
+        self.requestWeight = get_klines_request_weight(limit)
+        self.bucket = bucket or TokenBucket(capacity=weightPerMinute, refillRate=weightPerMinute / 60)
+
+    def get_worker_client(self):
+        """
+        Returns client of the current worker thread and creates it on first use.
+        """
+        client = getattr(self.workerClients, 'client', None)
+        if client is None:
+            client = self.workerClients.client = self.clientFactory()
+        return client
+
+    def get_chunks(self, startTimestamp: int, endTimestamp: int) -> List[Tuple[int, int]]:
+        """
+        Splits time range provided into chunks that fit in a single page.
+        :param startTimestamp: Starting timestamp in milliseconds.
+        :param endTimestamp: Ending timestamp in milliseconds.
+        :return: List of (start, end) timestamp tuples in ascending order. Both ends are inclusive.
+        """
+        chunkLength = self.limit * interval_to_milliseconds(self.interval)
+        return [(start, min(start + chunkLength - 1, endTimestamp))
+                for start in range(startTimestamp, endTimestamp + 1, chunkLength)]
+
+    def fetch_chunk(self, chunk: Tuple[int, int]) -> List[list]:
+        """
+        Fetches klines of chunk provided once the token bucket allows it.
+        :param chunk: Tuple of starting and ending timestamp.
+        :return: List of klines.
+        """
+        self.bucket.acquire(self.requestWeight)
+        return self.get_worker_client().get_klines(symbol=self.symbol, interval=self.interval, limit=self.limit,
+                                                   startTime=chunk[0], endTime=chunk[1])
+
+    def iter_pages(self, startTimestamp: int, endTimestamp: int = None,
+                   isRunning: Callable[[], bool] = None) -> Iterator[Tuple[int, int, List[list]]]:
+        """
+        Fetches pages concurrently and yields them in chronological order. Only a few pages per worker are fetched
+        ahead of the page being yielded, so a stopped download doesn't keep on hitting the API.
+        :param startTimestamp: Starting timestamp in milliseconds.
+        :param endTimestamp: Ending timestamp in milliseconds. If none, current time is used.
+        :param isRunning: Function that returns false once the download should stop.
+        :return: Iterator of (page number, total pages, klines) tuples.
+        """
+        if endTimestamp is None:
+            endTimestamp = int(time.time() * 1000)
+
+        chunks = deque(self.get_chunks(startTimestamp, endTimestamp))
+        totalPages = len(chunks)
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=self.maxWorkers, thread_name_prefix='KlineDownloader') as executor:
+            try:
+                for pageNumber in range(1, totalPages + 1):
+                    while chunks and len(pending) < self.maxWorkers * 2:
+                        pending.append(executor.submit(self.fetch_chunk, chunks.popleft()))
+
+                    if isRunning is not None and not isRunning():
+                        break
+                    yield pageNumber, totalPages, pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def download(self, startTimestamp: int, endTimestamp: int = None, isRunning: Callable[[], bool] = None,
+                 progressCallback: Callable[[int, int], None] = None,
+                 pageCallback: Callable[[List[list]], None] = None) -> List[list]:
+        """
+        Downloads all klines between timestamps provided and stitches them together in chronological order.
+        :param startTimestamp: Starting timestamp in milliseconds.
+        :param endTimestamp: Ending timestamp in milliseconds. If none, current time is used.
+        :param isRunning: Function that returns false once the download should stop.
+        :param progressCallback: Function called with pages downloaded and total pages after every page.
+        :param pageCallback: Function called with every page's klines in chronological order as soon as it's stitched.
+        :return: List of klines in ascending order.
+        """
+        klines = []
+        for pageNumber, totalPages, page in self.iter_pages(startTimestamp, endTimestamp, isRunning):
+            if klines and page and page[0][0] <= klines[-1][0]:  # Pages should never overlap, but just in case.
+                page = [kline for kline in page if kline[0] > klines[-1][0]]
+            klines += page
+            if pageCallback:
+                pageCallback(page)
+            if progressCallback:
+                progressCallback(pageNumber, totalPages)
+        return klines
@@ -0,0 +1,152 @@
+"""
+Vectorized indicators. Every series function takes an array of values in ascending order (oldest first) and returns
+an array of the same length holding the indicator as of each period. Periods without enough data before them are NaN.
+"""
+
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from candles import CandleBuffer, CandleStore
+from helpers import get_data_from_parameter
+
+
+def get_values(data: Union[List[dict], CandleStore, CandleBuffer, np.ndarray], parameter: str = None,
+               desc: bool = False) -> np.ndarray:
+    """
+    Returns values of parameter provided as an array in ascending order. Besides regular fields, high/low and
+    open/close return the average of both values for each period.
+    :param data: List of dictionaries, candle store, candle buffer, or array of values.
+    :param parameter: Parameter to get values of. Ignored if data is already an array of values.
+    :param desc: Boolean whether data is in descending order (newest first) or not.
+    :return: Array of values in ascending order.
+    """
+    if isinstance(data, np.ndarray):
+        values = data.astype(np.float64, copy=False)
+    elif isinstance(data, (CandleStore, CandleBuffer)):
+        values = data.get_column(parameter)
+    else:
+        values = np.fromiter((get_data_from_parameter(period, parameter) for period in data), dtype=np.float64,
+                             count=len(data))
+    return values[::-1] if desc else values
+
+
+def get_empty_series(length: int) -> np.ndarray:
+    """
+    Returns series of NaN values with length provided.
+    """
+    return np.full(length, np.nan)
+
+
+def get_sma_series(values: np.ndarray, prices: int) -> np.ndarray:
+    """
+    Returns simple moving average as of every period.
+    :param values: Values in ascending order.
+    :param prices: Amount of prices averaged.
+    :return: Array of simple moving averages.
+    """
+    if prices <= 0:
+        raise ValueError("Amount of prices must be greater than 0.")
+
+    series = get_empty_series(len(values))
+    if len(values) >= prices:
+        series[prices - 1:] = np.convolve(values, np.ones(prices), 'valid') / prices
+    return series
+
+
+def get_wma_series(values: np.ndarray, prices: int) -> np.ndarray:
+    """
+    Returns weighted moving average as of every period. The newest value is weighted with prices and the oldest with 1.
+    :param values: Values in ascending order.
+    :param prices: Amount of prices averaged.
+    :return: Array of weighted moving averages.
+    """
+    if prices <= 0:
+        raise ValueError("Amount of prices must be greater than 0.")
+
+    series = get_empty_series(len(values))
+    if len(values) >= prices:
+        weights = np.arange(prices, 0, -1, dtype=np.float64)  # Reversed, because convolution flips weights.
+        series[prices - 1:] = np.convolve(values, weights, 'valid') / (prices * (prices + 1) / 2)
+    return series
+
+
+def get_ema_series(values: np.ndarray, prices: int, smaPrices: int) -> np.ndarray:
+    """
+    Returns exponential moving average as of every period. The first EMA is the SMA of the first smaPrices values,
+    and every later value is smoothed into it. Smoothing is recursive, so it's carried forward in a single pass.
+    :param values: Values in ascending order.
+    :param prices: Amount of prices in exponential moving average.
+    :param smaPrices: Initial SMA periods to use to calculate first exponential moving average.
+    :return: Array of exponential moving averages.
+    """
+    if smaPrices <= 0:
+        raise ValueError("Initial amount of SMA values for initial EMA must be greater than 0.")
+
+    series = get_empty_series(len(values))
+    if len(values) < smaPrices:
+        return series
+
+    values = values.tolist()
+    multiplier = 2 / (prices + 1)
+    ema = sum(values[:smaPrices]) / smaPrices
+    emas = [ema]
+    for value in values[smaPrices:]:
+        ema = value * multiplier + ema * (1 - multiplier)
+        emas.append(ema)
+
+    series[smaPrices - 1:] = emas
+    return series
+
+
+def get_ups_and_downs_series(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns arrays of ups and downs between consecutive values. The first period has no previous value, so it's 0.
+    :param values: Values in ascending order.
+    :return: Tuple of arrays of ups and downs.
+    """
+    differences = np.diff(values, prepend=values[:1])
+    return np.where(differences > 0, differences, 0.0), np.where(differences > 0, 0.0, -differences)
+
+
+def get_rsi_averages_series(values: np.ndarray, prices: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns Wilder-smoothed averages of ups and downs as of every period, starting from averages of 0 at the oldest
+    value. Smoothing is recursive, so it's carried forward in a single pass.
+    :param values: Values in ascending order.
+    :param prices: RSI period.
+    :return: Tuple of arrays of average ups and average downs.
+    """
+    ups, downs = get_ups_and_downs_series(values)
+    alpha = 1 / prices
+    averageUp = averageDown = 0
+    averageUps = []
+    averageDowns = []
+    for up, down in zip(ups.tolist(), downs.tolist()):
+        averageUp = up * alpha + averageUp * (1 - alpha)
+        averageDown = down * alpha + averageDown * (1 - alpha)
+        averageUps.append(averageUp)
+        averageDowns.append(averageDown)
+    return np.array(averageUps, dtype=np.float64), np.array(averageDowns, dtype=np.float64)
+
+
+def get_rsi_series(values: np.ndarray, prices: int) -> np.ndarray:
+    """
+    Returns relative strength index as of every period with averages smoothed from the oldest value. Periods without
+    any downs have an RSI of 100.
+    :param values: Values in ascending order.
+    :param prices: RSI period.
+    :return: Array of relative strength indices.
+    """
+    if prices <= 0:
+        raise ValueError("Amount of prices must be greater than 0.")
+
+    series = get_empty_series(len(values))
+    if len(values) < 2:
+        return series
+
+    averageUps, averageDowns = get_rsi_averages_series(values, prices)
+    hasDowns = averageDowns != 0
+    rs = np.divide(averageUps, averageDowns, out=np.zeros_like(averageUps), where=hasDowns)
+    series[1:] = np.where(hasDowns, 100 - 100 / (1 + rs), 100)[1:]
+    return series
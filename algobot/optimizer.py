@@ -0,0 +1,381 @@
+"""
+Parallel backtest optimizer. Settings are expanded into permutations, and every permutation runs in its own backtester
+on a process pool. Candle data is shared with worker processes through shared memory, so workers attach to it by
+name instead of receiving a copy. Results can be persisted to an optimizer result store, so settings already
+computed aren't run again.
+"""
+
+import copy
+import os
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import product
+from typing import Any, Callable, Dict, List, Union
+
+import numpy as np
+
+from candles import CandleStore
+from enums import STOP, TRAILING
+from helpers import convert_all_dates_to_datetime
+from optimizerStore import OptimizerResultStore, get_dataset_fingerprint, get_settings_key, get_sweep_key
+from sharedCandles import SharedCandleDataset
+from strategies.movingAverage import MovingAverageStrategy
+from traders.backtester import Backtester
+
+OPTION_FIELDS = ('movingAverage', 'parameter', 'initialBound', 'finalBound')
+DEFAULT_SETTINGS = {
+    'lossType': None,
+    'lossPercentage': 0,
+    'takeProfitType': None,
+    'takeProfitPercentage': 0,
+    'stopLossCounter': 0,
+    'marginEnabled': True,
+    'strategyInterval': None,
+    'movingAverage': [],  # List of moving average options, each a list of values in the order of OPTION_FIELDS.
+}
+
+workerDataset = None  # Shared dataset worker process is attached to.
+workerData = None  # Read-only candle store of shared dataset.
+workerOptions = None  # Backtester options shared by every run of worker process.
+
+
+def get_choices(value) -> list:
+    """
+    Returns choices of a setting. Tuples are explicit choices, lists of three numbers are inclusive ranges of start,
+    end, and step, and anything else is a single choice.
+    :param value: Setting value to expand.
+    :return: List of choices.
+    """
+    if type(value) == tuple:
+        return list(value)
+    elif type(value) == list and len(value) == 3 and all(isinstance(x, (int, float)) for x in value):
+        start, end, step = value
+        if step <= 0:
+            raise ValueError("Range step must be greater than 0.")
+
+        count = int(round((end - start) / step, 10)) + 1
+        choices = [round(start + index * step, 10) for index in range(count)]
+        if all(type(x) == int for x in value):
+            choices = [int(choice) for choice in choices]
+        return choices
+    else:
+        return [value]
+
+
+def get_option_choices(options: list) -> List[list]:
+    """
+    Returns every permutation of moving average options provided. Every value of every option can be a choice tuple
+    or a range list.
+    :param options: List of moving average options.
+    :return: List of permutations, each a list of options.
+    """
+    optionChoices = [[list(values) for values in product(*[get_choices(value) for value in option])]
+                     for option in options]
+    return [list(permutation) for permutation in product(*optionChoices)]
+
+
+def get_all_settings(combos: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Returns every permutation of settings from combos provided. Settings missing from combos use their defaults.
+    :param combos: Dictionary of setting names to choices (see get_choices). Moving average options are expanded
+        value by value.
+    :return: List of settings dictionaries.
+    """
+    combos = {**DEFAULT_SETTINGS, **combos}
+    keys = list(combos)
+    choices = [get_option_choices(combos[key]) if key == 'movingAverage' else get_choices(combos[key])
+               for key in keys]
+    return [dict(zip(keys, values)) for values in product(*choices)]
+
+
+def get_strategies(settings: Dict[str, Any]) -> list:
+    """
+    Returns strategies in the format backtesters take from settings provided.
+    """
+    if not settings['movingAverage']:
+        return []
+    values = [value for option in settings['movingAverage'] for value in option]
+    return [(MovingAverageStrategy, values, 'Moving Average')]
+
+
+def get_settings_label(settings: Dict[str, Any]) -> str:
+    """
+    Returns short human readable description of settings provided.
+    """
+    lossTypes = {TRAILING: 'Trailing', STOP: 'Stop', None: 'None'}
+    options = ', '.join(f'{average.upper()}({parameter}, {initialBound}, {finalBound})'
+                        for average, parameter, initialBound, finalBound in settings['movingAverage']) or 'Hold'
+    label = f"{options} | Loss: {lossTypes[settings['lossType']]}"
+    if settings['lossType'] is not None:
+        label += f" {settings['lossPercentage']}%"
+    label += f" | Take Profit: {lossTypes[settings['takeProfitType']]}"
+    if settings['takeProfitType'] is not None:
+        label += f" {settings['takeProfitPercentage']}%"
+    if settings['stopLossCounter']:
+        label += f" | Smart Stop Loss: {settings['stopLossCounter']}"
+    if settings['strategyInterval']:
+        label += f" | {settings['strategyInterval']}"
+    return label
+
+
+def get_max_drawdown(startingBalance: float, trades: List[dict]) -> float:
+    """
+    Returns largest drop in percentage of net from a previous peak, measured at every trade.
+    :param startingBalance: Balance backtest started with.
+    :param trades: Trades made in backtest.
+    :return: Maximum drawdown percentage.
+    """
+    nets = np.array([startingBalance] + [trade['net'] for trade in trades], dtype=np.float64)
+    peaks = np.maximum.accumulate(nets)
+    return float(np.max((peaks - nets) / peaks) * 100)
+
+
+def get_backtester(data: Union[list, CandleStore], settings: Dict[str, Any], startingBalance: float = 1000,
+                   symbol: str = None, startDate=None, endDate=None, precision: int = 4) -> Backtester:
+    """
+    Returns a new backtester set up with settings provided.
+    """
+    backtester = Backtester(
+        startingBalance=startingBalance,
+        data=data,
+        lossStrategy=settings['lossType'],
+        lossPercentage=settings['lossPercentage'],
+        takeProfitType=settings['takeProfitType'],
+        takeProfitPercentage=settings['takeProfitPercentage'],
+        strategies=get_strategies(settings),
+        strategyInterval=settings['strategyInterval'],
+        symbol=symbol,
+        marginEnabled=settings['marginEnabled'],
+        startDate=startDate,
+        endDate=endDate,
+        precision=precision,
+        outputTrades=False,
+    )
+    backtester.set_stop_loss_counter(settings['stopLossCounter'])
+    return backtester
+
+
+def run_settings(data: Union[list, CandleStore], settings: Dict[str, Any], vectorized: bool = True, thread=None,
+                 **backtesterOptions) -> Dict[str, Any]:
+    """
+    Runs a backtest with settings provided in a fresh backtester and returns its result. Errors are returned in the
+    result instead of being raised, so one invalid permutation doesn't stop the rest.
+    :param data: Candle data to backtest with.
+    :param settings: Settings dictionary.
+    :param vectorized: Boolean whether to use the vectorized engine when the configuration supports it.
+    :param thread: Thread backtest reports progress to and that can cancel it (see Backtester.start_backtest).
+    :param backtesterOptions: Starting balance, symbol, start date, end date, and precision.
+    :return: Result dictionary.
+    """
+    try:
+        backtester = get_backtester(data, settings, **backtesterOptions)
+        backtester.start_backtest(thread=thread, vectorized=vectorized)
+    except Exception as e:
+        return {'settings': settings, 'net': None, 'profit': None, 'profitPercentage': None, 'drawdown': None,
+                'trades': None, 'commissions': None, 'error': f'{type(e).__name__}: {e}'}
+
+    net = backtester.get_net()
+    return {
+        'settings': settings,
+        'net': net,
+        'profit': net - backtester.startingBalance,
+        'profitPercentage': net / backtester.startingBalance * 100 - 100,
+        'drawdown': get_max_drawdown(backtester.startingBalance, backtester.trades),
+        'trades': len(backtester.trades),
+        'commissions': backtester.commissionsPaid,
+        'error': None,
+    }
+
+
+def initialize_worker(dataset: SharedCandleDataset, options: Dict[str, Any]):
+    """
+    Attaches worker process to shared dataset and stores backtester options. Called once per worker when the pool
+    starts.
+    """
+    global workerDataset, workerData, workerOptions
+    workerDataset = dataset
+    workerData = dataset.get_store()
+    workerOptions = options
+
+
+def run_worker_settings(settingsList: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Runs a chunk of settings in a worker process with data stored by initialize_worker.
+    """
+    return [run_settings(workerData, settings, **workerOptions) for settings in settingsList]
+
+
+def rank_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Sorts results by net in descending order and numbers them. Failed runs go last.
+    :param results: Result dictionaries.
+    :return: Ranked results.
+    """
+    results = sorted(results, key=lambda result: (result['error'] is not None, -(result['net'] or 0)))
+    for rank, result in enumerate(results, start=1):
+        result['rank'] = rank
+    return results
+
+
+def format_results_table(results: List[Dict[str, Any]], limit: int = None, precision: int = 2) -> str:
+    """
+    Returns ranked results as a plain text table.
+    :param results: Ranked result dictionaries.
+    :param limit: Maximum amount of results shown.
+    :param precision: Decimal places of values.
+    :return: Table string.
+    """
+    rows = [('Rank', 'Net', 'Profit %', 'Drawdown %', 'Trades', 'Commissions', 'Settings')]
+    for result in results[:limit]:
+        if result['error'] is not None:
+            rows.append((str(result['rank']), '-', '-', '-', '-', '-',
+                         f"{get_settings_label(result['settings'])} ({result['error']})"))
+            continue
+        rows.append((str(result['rank']), f"{result['net']:.{precision}f}", f"{result['profitPercentage']:.2f}",
+                     f"{result['drawdown']:.2f}", str(result['trades']), f"{result['commissions']:.{precision}f}",
+                     get_settings_label(result['settings'])))
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]) - 1)]
+    return '\n'.join('  '.join(value.rjust(width) for value, width in zip(row, widths)) + '  ' + row[-1]
+                     for row in rows)
+
+
+class Optimizer:
+    def __init__(self, data: Union[list, CandleStore, SharedCandleDataset], startingBalance: float = 1000,
+                 symbol: str = None, startDate=None, endDate=None, precision: int = 4, processes: int = None,
+                 vectorized: bool = True, store: OptimizerResultStore = None):
+        """
+        Runs backtests of many settings permutations in parallel.
+        :param data: Candle data to backtest with. Shared datasets are used by workers as they are; other data is
+            copied to a shared dataset for every run.
+        :param startingBalance: Balance every backtest starts with.
+        :param symbol: Symbol of data.
+        :param startDate: Date backtests start at.
+        :param endDate: Date backtests end at.
+        :param precision: Precision of backtest values.
+        :param processes: Amount of worker processes. If none, every CPU is used. With 1, backtests run in-process.
+        :param vectorized: Boolean whether to use the vectorized engine when a configuration supports it.
+        :param store: Result store results are saved to and loaded from. If none, results aren't persisted.
+        """
+        self.dataset = None
+        if isinstance(data, SharedCandleDataset):
+            self.dataset = data
+            data = data.get_store()
+        elif not isinstance(data, CandleStore):
+            convert_all_dates_to_datetime(data)
+            data = CandleStore.from_dicts(data)
+
+        self.data = data
+        self.processes = processes or os.cpu_count() or 1
+        self.backtesterOptions = {
+            'startingBalance': startingBalance,
+            'symbol': symbol,
+            'startDate': startDate,
+            'endDate': endDate,
+            'precision': precision,
+            'vectorized': vectorized,
+        }
+        self.store = store
+        self.sweepKey = None  # Key of results of this data and these options in store; calculated when first needed.
+
+    def copy(self, dataset: SharedCandleDataset = None, **backtesterOptions):
+        """
+        Returns an optimizer with the same data, processes, and result store as this one.
+        :param dataset: Shared dataset of this optimizer's data workers use. If none, this optimizer's is used.
+        :param backtesterOptions: Backtester options that replace the ones of this optimizer, like an end date.
+        :return: Optimizer.
+        """
+        optimizer = copy.copy(self)
+        optimizer.dataset = dataset if dataset is not None else self.dataset
+        optimizer.backtesterOptions = {**self.backtesterOptions, **backtesterOptions}
+        optimizer.sweepKey = None
+        return optimizer
+
+    def get_sweep_key(self) -> str:
+        """
+        Returns key results of this optimizer are stored with in result store.
+        """
+        if self.sweepKey is None:
+            self.sweepKey = get_sweep_key(get_dataset_fingerprint(self.data), self.backtesterOptions)
+        return self.sweepKey
+
+    def get_top_results(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Returns stored results with the highest nets without running anything.
+        :param limit: Maximum amount of results returned.
+        :return: Ranked result dictionaries.
+        """
+        if self.store is None:
+            raise ValueError("Optimizer has no result store.")
+        return self.store.get_top_results(self.get_sweep_key(), limit)
+
+    def get_chunk_size(self, count: int) -> int:
+        """
+        Returns amount of settings sent to a worker at once. Chunks are small enough for every worker to get several,
+        so workers finishing early don't sit idle.
+        """
+        return max(1, min(32, count // (self.processes * 4)))
+
+    def run(self, settingsList: List[Dict[str, Any]], callback: Callable[[Dict[str, Any], int, int], None] = None,
+            isRunning: Callable[[], bool] = None) -> List[Dict[str, Any]]:
+        """
+        Runs backtests of every settings dictionary provided and returns ranked results. With a result store, stored
+        results are reused and new results are saved as soon as they complete, so an interrupted run resumes where it
+        stopped.
+        :param settingsList: List of settings dictionaries (see get_all_settings).
+        :param callback: Function called with every result, amount of results completed, and total amount.
+        :param isRunning: Function that returns whether optimization should continue.
+        :return: Ranked result dictionaries.
+        """
+        settingsList = [{**DEFAULT_SETTINGS, **settings} for settings in settingsList]
+        total = len(settingsList)
+        results = []
+
+        def add_results(newResults: List[Dict[str, Any]]):
+            for result in newResults:
+                results.append(result)
+                if callback is not None:
+                    callback(result, len(results), total)
+
+        if self.store is not None:
+            sweepKey = self.get_sweep_key()
+            keys = [get_settings_key(sweepKey, settings) for settings in settingsList]
+            storedResults = self.store.get_results(keys)
+            add_results([{**storedResults[key], 'settings': settings} for key, settings in zip(keys, settingsList)
+                         if key in storedResults])
+            settingsList = [settings for key, settings in zip(keys, settingsList) if key not in storedResults]
+
+            def save_results(newResults: List[Dict[str, Any]]):
+                self.store.add_results(sweepKey, newResults)
+                add_results(newResults)
+        else:
+            save_results = add_results
+
+        if self.processes == 1 or len(settingsList) <= 1:
+            for settings in settingsList:
+                if isRunning is not None and not isRunning():
+                    raise RuntimeError("Optimizer was canceled.")
+                save_results([run_settings(self.data, settings, **self.backtesterOptions)])
+            return rank_results(results)
+
+        chunkSize = self.get_chunk_size(len(settingsList))
+        chunks = [settingsList[index:index + chunkSize] for index in range(0, len(settingsList), chunkSize)]
+        dataset = self.dataset if self.dataset is not None else SharedCandleDataset.from_store(self.data)
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.processes, len(chunks)), initializer=initialize_worker,
+                                     initargs=(dataset, self.backtesterOptions)) as executor:
+                pending = {executor.submit(run_worker_settings, chunk) for chunk in chunks}
+                while pending:
+                    done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        save_results(future.result())
+                    if isRunning is not None and not isRunning():
+                        for future in pending:
+                            future.cancel()
+                        raise RuntimeError("Optimizer was canceled.")
+        finally:
+            if dataset is not self.dataset:
+                dataset.close()
+                dataset.unlink()
+
+        return rank_results(results)
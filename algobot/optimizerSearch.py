@@ -0,0 +1,383 @@
+"""
+Optimizer search strategies. A full grid of settings permutations grows exponentially with every swept setting, so
+search strategies pick which permutations to backtest within a fixed budget of backtests instead. Strategies run
+their backtests through an optimizer, so processes and result stores work the same way they do for a grid.
+"""
+
+import math
+import random
+
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from candles import DAY_MILLISECONDS, CandleStore, TimestampIndex, date_to_timestamp
+from optimizer import DEFAULT_SETTINGS, Optimizer, get_choices, rank_results
+from sharedCandles import SharedCandleDataset
+
+
+class SearchSpace:
+    def __init__(self, combos: Dict[str, Any]):
+        """
+        Space of settings permutations of combos provided. Every permutation is a tuple with the index of the choice
+        of every dimension, where dimensions are settings and values of moving average options.
+        :param combos: Dictionary of setting names to choices (see optimizer.get_all_settings).
+        """
+        combos = {**DEFAULT_SETTINGS, **combos}
+        self.keys = [key for key in combos if key != 'movingAverage']
+        self.optionLengths = [len(option) for option in combos['movingAverage']]
+        self.dimensions = [get_choices(combos[key]) for key in self.keys]
+        self.dimensions += [get_choices(value) for option in combos['movingAverage'] for value in option]
+        self.size = math.prod(len(choices) for choices in self.dimensions)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def is_ordinal(self, dimension: int) -> bool:
+        """
+        Returns whether choices of dimension are numbers, so neighbouring choices are alike.
+        """
+        return all(isinstance(x, (int, float)) and not isinstance(x, bool) for x in self.dimensions[dimension])
+
+    def get_settings(self, point: Tuple[int, ...]) -> Dict[str, Any]:
+        """
+        Returns settings dictionary of point provided.
+        """
+        values = [choices[index] for choices, index in zip(self.dimensions, point)]
+        settings = dict(zip(self.keys, values))
+        position = len(self.keys)
+        settings['movingAverage'] = []
+        for length in self.optionLengths:
+            settings['movingAverage'].append(values[position:position + length])
+            position += length
+        return settings
+
+    def get_point(self, number: int) -> Tuple[int, ...]:
+        """
+        Returns point with number provided, where points are numbered from 0 to the size of space.
+        """
+        point = []
+        for choices in reversed(self.dimensions):
+            number, index = divmod(number, len(choices))
+            point.append(index)
+        return tuple(reversed(point))
+
+    def sample(self, count: int, generator: random.Random) -> List[Tuple[int, ...]]:
+        """
+        Returns unique points picked uniformly at random. If count is larger than space, every point is returned.
+        """
+        if count >= self.size:
+            return [self.get_point(number) for number in range(self.size)]
+        return [self.get_point(number) for number in generator.sample(range(self.size), count)]
+
+
+def get_shorter_range(data: CandleStore, startDate, endDate, fraction: float) -> Tuple[Optional[date], float]:
+    """
+    Returns end date of a backtest that covers about fraction provided of the range from start date to end date, and
+    the fraction it actually covers. Backtests end at the last period of a date, so ranges are rounded up to whole
+    days.
+    :param data: Candle data in ascending order.
+    :param startDate: Date backtests start at. If none, they start at the first period.
+    :param endDate: Date backtests end at. If none, they end at the last period.
+    :param fraction: Fraction of range to cover.
+    :return: End date (none if the full range has to be used) and fraction covered.
+    """
+    index = TimestampIndex(data)
+    startTimestamp = date_to_timestamp(startDate) if startDate else None
+    endTimestamp = date_to_timestamp(endDate) + DAY_MILLISECONDS if endDate else None
+    periods = index.get_slice(startTimestamp, endTimestamp)
+    startIndex, endIndex = periods.start, periods.stop - 1
+    if fraction >= 1 or endIndex <= startIndex:
+        return endDate, 1
+
+    targetIndex = startIndex + math.ceil(fraction * (endIndex - startIndex))
+    targetDate = data[targetIndex]['date_utc'].date()
+    lastIndex = index.find_date(targetDate, first=False)
+    if lastIndex >= endIndex or lastIndex <= startIndex:
+        return endDate, 1
+    return targetDate, (lastIndex - startIndex) / (endIndex - startIndex)
+
+
+class SearchStrategy:
+    name = None
+
+    def __init__(self, combos: Dict[str, Any], budget: int = None, seed: int = None):
+        """
+        Base class of optimizer search strategies.
+        :param combos: Dictionary of setting names to choices (see optimizer.get_all_settings).
+        :param budget: Amount of full-length backtests search may run. If none, it's the size of the search space.
+        :param seed: Seed of random choices, so searches can be repeated.
+        """
+        self.space = SearchSpace(combos)
+        self.budget = len(self.space) if budget is None else budget
+        self.random = random.Random(seed)
+        self.completed = 0  # Amount of backtests completed in current search.
+        self.cost = 0  # Full-length backtests completed in current search; shorter backtests count as a fraction.
+
+        if self.budget < 1:
+            raise ValueError("Search budget must be at least 1.")
+
+    def get_evaluation_count(self) -> int:
+        """
+        Returns amount of backtests search runs in total.
+        """
+        return min(self.budget, len(self.space))
+
+    def evaluate(self, optimizer: Optimizer, points: List[Tuple[int, ...]], callback: Callable = None,
+                 isRunning: Callable[[], bool] = None, fraction: float = 1) -> List[Dict[str, Any]]:
+        """
+        Backtests settings of points provided with optimizer and returns their results in order of points.
+        :param optimizer: Optimizer to run backtests with.
+        :param points: Points of search space to backtest.
+        :param callback: Function called with every result, amount of backtests completed, and total amount.
+        :param isRunning: Function that returns whether search should continue.
+        :param fraction: Fraction of full-length backtest every backtest costs.
+        :return: Result dictionaries in order of points.
+        """
+        total = self.get_evaluation_count()
+
+        def on_result(result: Dict[str, Any], *_):
+            self.completed += 1
+            self.cost += fraction
+            if callback is not None:
+                callback(result, self.completed, total)
+
+        settingsList = [self.space.get_settings(point) for point in points]
+        results = optimizer.run(settingsList, callback=on_result, isRunning=isRunning)
+        resultsByLabel = {repr(result['settings']): result for result in results}
+        return [resultsByLabel[repr({**DEFAULT_SETTINGS, **settings})] for settings in settingsList]
+
+    def search(self, optimizer: Optimizer, callback: Callable = None,
+               isRunning: Callable[[], bool] = None) -> List[Dict[str, Any]]:
+        """
+        Runs search and returns results of full-length backtests. Implemented by every search strategy.
+        """
+        raise NotImplementedError("Search strategies must implement search.")
+
+    def run(self, optimizer: Optimizer, callback: Callable[[Dict[str, Any], int, int], None] = None,
+            isRunning: Callable[[], bool] = None) -> List[Dict[str, Any]]:
+        """
+        Runs search with optimizer provided. Data is shared with worker processes once for the whole search.
+        :param optimizer: Optimizer to run backtests with.
+        :param callback: Function called with every result, amount of backtests completed, and total amount.
+        :param isRunning: Function that returns whether search should continue.
+        :return: Ranked result dictionaries of full-length backtests.
+        """
+        self.completed = self.cost = 0
+        if optimizer.processes == 1 or optimizer.dataset is not None:
+            return rank_results(self.search(optimizer, callback, isRunning))
+
+        with SharedCandleDataset.from_store(optimizer.data) as dataset:
+            return rank_results(self.search(optimizer.copy(dataset=dataset), callback, isRunning))
+
+
+class GridSearch(SearchStrategy):
+    name = 'grid'
+
+    def get_evaluation_count(self) -> int:
+        return len(self.space)
+
+    def search(self, optimizer, callback=None, isRunning=None):
+        """
+        Backtests every point of search space regardless of budget.
+        """
+        points = [self.space.get_point(number) for number in range(len(self.space))]
+        return self.evaluate(optimizer, points, callback, isRunning)
+
+
+class RandomSearch(SearchStrategy):
+    name = 'random'
+
+    def search(self, optimizer, callback=None, isRunning=None):
+        """
+        Backtests as many unique points picked at random as the budget allows.
+        """
+        return self.evaluate(optimizer, self.space.sample(self.budget, self.random), callback, isRunning)
+
+
+class SuccessiveHalvingSearch(SearchStrategy):
+    name = 'halving'
+
+    def __init__(self, combos: Dict[str, Any], budget: int = None, seed: int = None, eta: int = 3, rungs: int = 3):
+        """
+        Successive halving search. Many random points are backtested on a short date range first, and the best
+        1 / eta of them are promoted to a range eta times longer until the survivors run on the full range. Shorter
+        backtests start at the same date as full ones, so they're the beginning of the full backtest.
+        :param eta: Factor candidates are cut by and date ranges grow by between rungs.
+        :param rungs: Amount of rungs, including the full-length one.
+        """
+        super().__init__(combos, budget, seed)
+        if eta < 2 or rungs < 1:
+            raise ValueError("Successive halving needs an eta of at least 2 and at least 1 rung.")
+        self.eta = eta
+        self.rungs = rungs
+        self.rungFractions = [eta ** (rung - rungs + 1) for rung in range(rungs)]  # Fractions of range rungs cover.
+        self.fractions = self.rungFractions  # Fractions rungs actually cover once ranges are rounded to days.
+
+    def get_rung_counts(self) -> List[int]:
+        """
+        Returns amount of candidates of every rung. The first rung gets as many candidates as budget allows when
+        every rung keeps 1 / eta of the candidates of the rung before.
+        """
+        count = min(len(self.space), max(1, int(self.budget / sum(fraction / self.eta ** rung
+                                                                  for rung, fraction in enumerate(self.fractions)))))
+        while count > 1 and self.get_cost(self.get_counts(count)) > self.budget:
+            count -= 1
+        return self.get_counts(count)
+
+    def get_counts(self, count: int) -> List[int]:
+        """
+        Returns amount of candidates of every rung when the first one has count provided.
+        """
+        return [max(1, count // self.eta ** rung) for rung in range(self.rungs)]
+
+    def get_cost(self, counts: List[int]) -> float:
+        """
+        Returns full-length backtests rungs with counts provided cost.
+        """
+        return sum(count * fraction for count, fraction in zip(counts, self.fractions))
+
+    def get_evaluation_count(self) -> int:
+        return sum(self.get_rung_counts())
+
+    def search(self, optimizer, callback=None, isRunning=None):
+        """
+        Backtests random points on shorter date ranges and promotes the best to the full date range.
+        """
+        options = optimizer.backtesterOptions
+        ranges = [get_shorter_range(optimizer.data, options['startDate'], options['endDate'], fraction)
+                  for fraction in self.rungFractions]
+        self.fractions = [fraction for _, fraction in ranges]  # Ranges are rounded to whole days, so costs change.
+
+        counts = self.get_rung_counts()
+        points = self.space.sample(counts[0], self.random)
+        results = []
+        for (endDate, fraction), count in zip(ranges, counts):
+            points = points[:count]
+            rungOptimizer = optimizer if fraction == 1 else optimizer.copy(endDate=endDate)
+            results = self.evaluate(rungOptimizer, points, callback, isRunning, fraction)
+
+            ranked = sorted(zip(points, results), key=lambda pair: (pair[1]['error'] is not None,
+                                                                    -(pair[1]['net'] or 0)))
+            points = [point for point, _ in ranked]
+        return results
+
+
+class TPESearch(SearchStrategy):
+    name = 'tpe'
+
+    def __init__(self, combos: Dict[str, Any], budget: int = None, seed: int = None, startupCount: int = None,
+                 gamma: float = 0.25, candidateCount: int = 24, batchSize: int = None):
+        """
+        Tree-structured Parzen estimator search. After random startup backtests, points are split into good ones
+        (the best gamma of them) and the rest. Every new point is the candidate, sampled from the good points'
+        distribution, that is most likely under the good distribution compared to the other one.
+        :param startupCount: Amount of random backtests before the model is used. If none, it's a fifth of budget
+            (at least 5).
+        :param gamma: Fraction of backtests counted as good.
+        :param candidateCount: Amount of candidates sampled for every point picked.
+        :param batchSize: Amount of points picked before their results are used. If none, it's the amount of
+            optimizer processes, so every process gets work.
+        """
+        super().__init__(combos, budget, seed)
+        self.startupCount = max(5, self.budget // 5) if startupCount is None else startupCount
+        self.gamma = gamma
+        self.candidateCount = candidateCount
+        self.batchSize = batchSize
+
+    def get_densities(self, points: List[Tuple[int, ...]], dimension: int) -> np.ndarray:
+        """
+        Returns probability of every choice of dimension given points provided. Ordinal choices are smoothed with a
+        Gaussian kernel, so choices near good points are likely too; every choice keeps a uniform prior.
+        """
+        size = len(self.space.dimensions[dimension])
+        indexes = np.arange(size)
+        weights = np.ones(size) / size
+        bandwidth = max(1.0, size / 10)
+        for point in points:
+            if self.space.is_ordinal(dimension):
+                kernel = np.exp(-0.5 * ((indexes - point[dimension]) / bandwidth) ** 2)
+            else:
+                kernel = (indexes == point[dimension]).astype(np.float64)
+            weights += kernel / kernel.sum()
+        return weights / weights.sum()
+
+    def get_next_points(self, observations: List[Tuple[Tuple[int, ...], float]], count: int,
+                        seen: set) -> List[Tuple[int, ...]]:
+        """
+        Returns up to count unseen points with the highest ratio of good to bad density.
+        :param observations: Points backtested and their nets (negative infinity for failed backtests).
+        :param count: Amount of points to return.
+        :param seen: Points already backtested.
+        :return: List of points.
+        """
+        ranked = sorted(observations, key=lambda observation: -observation[1])
+        goodCount = max(1, math.ceil(self.gamma * len(ranked)))
+        good = [point for point, _ in ranked[:goodCount]]
+        bad = [point for point, _ in ranked[goodCount:]]
+
+        dimensions = range(len(self.space.dimensions))
+        goodDensities = [self.get_densities(good, dimension) for dimension in dimensions]
+        badDensities = [self.get_densities(bad, dimension) for dimension in dimensions]
+
+        scores = {}
+        for _ in range(self.candidateCount * count):
+            point = tuple(self.random.choices(range(len(densities)), weights=densities)[0]
+                          for densities in goodDensities)
+            if point not in seen and point not in scores:
+                scores[point] = sum(math.log(goodDensities[dimension][index] / badDensities[dimension][index])
+                                    for dimension, index in enumerate(point))
+
+        points = sorted(scores, key=scores.get, reverse=True)[:count]
+        if len(points) < count:  # Candidates were all backtested already, so fill in with random unseen points.
+            unseen = [point for point in self.space.sample(len(seen) + count, self.random)
+                      if point not in seen and point not in points]
+            points += unseen[:count - len(points)]
+        return points
+
+    def search(self, optimizer, callback=None, isRunning=None):
+        """
+        Backtests random points first, then points the model expects to be good, until budget is used.
+        """
+        total = self.get_evaluation_count()
+        batchSize = self.batchSize or optimizer.processes
+        seen = set()
+        observations = []
+        results = []
+
+        while len(seen) < total:
+            count = min(batchSize, total - len(seen))
+            if len(seen) < self.startupCount:
+                count = min(self.startupCount - len(seen), total - len(seen))
+                points = [point for point in self.space.sample(len(seen) + count, self.random) if point not in seen]
+                points = points[:count]
+            else:
+                points = self.get_next_points(observations, count, seen)
+            if not points:
+                break
+
+            batchResults = self.evaluate(optimizer, points, callback, isRunning)
+            for point, result in zip(points, batchResults):
+                seen.add(point)
+                observations.append((point, -math.inf if result['error'] is not None else result['net']))
+            results += batchResults
+        return results
+
+
+SEARCH_STRATEGIES = {strategy.name: strategy for strategy in (GridSearch, RandomSearch, SuccessiveHalvingSearch,
+                                                              TPESearch)}
+
+
+def get_search_strategy(name: str, combos: Dict[str, Any], budget: int = None, **options) -> SearchStrategy:
+    """
+    Returns search strategy with name provided.
+    :param name: Name of search strategy (see SEARCH_STRATEGIES).
+    :param combos: Dictionary of setting names to choices (see optimizer.get_all_settings).
+    :param budget: Amount of full-length backtests search may run.
+    :param options: Options of search strategy.
+    :return: Search strategy.
+    """
+    if name not in SEARCH_STRATEGIES:
+        raise ValueError(f"Unknown search strategy {name}. Choose from {', '.join(SEARCH_STRATEGIES)}.")
+    return SEARCH_STRATEGIES[name](combos, budget, **options)
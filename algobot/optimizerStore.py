@@ -0,0 +1,210 @@
+"""
+Persistent optimizer results. Every result is stored in a SQLite table keyed by a hash of the dataset, the backtest
+options, and the settings it was run with, so sweeps skip settings that were already computed and interrupted sweeps
+resume where they stopped.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from contextlib import closing
+from typing import Any, Dict, List
+
+import numpy as np
+
+from candles import CandleStore
+from helpers import ROOT_DIR
+
+RESULTS_TABLE = 'optimizer_results'
+RESULT_COLUMNS = ('net', 'profit', 'profitPercentage', 'drawdown', 'trades', 'commissions', 'error')
+FINGERPRINT_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+SWEEP_OPTIONS = ('startingBalance', 'startDate', 'endDate', 'precision')  # Backtester options that change results.
+QUERY_CHUNK_SIZE = 500  # Maximum amount of keys looked up in one query.
+
+
+def get_canonical_value(value):
+    """
+    Returns value in a form that hashes the same however it was written. Numbers become floats (so 1 and 1.0 are
+    equal), tuples become lists, and anything else that isn't JSON serializable becomes a string.
+    """
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    elif isinstance(value, (int, float, np.number)):
+        return float(value)
+    elif isinstance(value, (list, tuple)):
+        return [get_canonical_value(x) for x in value]
+    elif isinstance(value, dict):
+        return {str(key): get_canonical_value(x) for key, x in value.items()}
+    return str(value)
+
+
+def get_hash(value) -> str:
+    """
+    Returns SHA-256 hex digest of canonical JSON of value provided.
+    """
+    dump = json.dumps(get_canonical_value(value), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(dump.encode()).hexdigest()
+
+
+def get_dataset_fingerprint(data: CandleStore) -> str:
+    """
+    Returns SHA-256 hex digest of timestamps and prices of candle data. Columns other than prices and volume are left
+    out, so the same candles loaded from a CSV file or a database have the same fingerprint.
+    :param data: Candle data in ascending order.
+    :return: Fingerprint string.
+    """
+    digest = hashlib.sha256(str(len(data)).encode())
+    digest.update(np.ascontiguousarray(data.get_timestamps()))
+    for field in FINGERPRINT_FIELDS:
+        digest.update(np.ascontiguousarray(data.get_column(field)))
+    return digest.hexdigest()
+
+
+def get_sweep_key(fingerprint: str, backtesterOptions: Dict[str, Any]) -> str:
+    """
+    Returns key shared by every result of a dataset run with the same backtester options.
+    :param fingerprint: Dataset fingerprint (see get_dataset_fingerprint).
+    :param backtesterOptions: Options every backtest of sweep is run with.
+    :return: Sweep key string.
+    """
+    return get_hash({'dataset': fingerprint, **{option: backtesterOptions.get(option) for option in SWEEP_OPTIONS}})
+
+
+def get_settings_key(sweepKey: str, settings: Dict[str, Any]) -> str:
+    """
+    Returns key of a result of settings provided in sweep provided.
+    """
+    return get_hash([sweepKey, settings])
+
+
+class OptimizerResultStore:
+    def __init__(self, path: str = None):
+        """
+        SQLite store of optimizer results.
+        :param path: Path to database file. If none, results are stored in optimizer.db in Databases.
+        """
+        if path is None:
+            path = os.path.join(ROOT_DIR, 'Databases', 'optimizer.db')
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.create_table()
+
+    def get_connection(self) -> sqlite3.Connection:
+        """
+        Returns a connection to the database file with write-ahead logging, so results can be read while a sweep is
+        writing them.
+        :return: SQLite connection.
+        """
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = NORMAL')
+        return connection
+
+    def create_table(self):
+        """
+        Creates results table and its index if they don't exist.
+        """
+        with closing(self.get_connection()) as connection:
+            with connection:
+                connection.execute(f'''
+                CREATE TABLE IF NOT EXISTS {RESULTS_TABLE}(
+                key TEXT PRIMARY KEY,
+                sweep TEXT NOT NULL,
+                settings TEXT NOT NULL,
+                net REAL,
+                profit REAL,
+                profit_percentage REAL,
+                drawdown REAL,
+                trades INTEGER,
+                commissions REAL,
+                error TEXT,
+                created_at REAL NOT NULL
+                ) WITHOUT ROWID;''')
+                connection.execute(f'CREATE INDEX IF NOT EXISTS {RESULTS_TABLE}_net ON {RESULTS_TABLE}(sweep, net)')
+
+    @staticmethod
+    def get_result(row: tuple) -> Dict[str, Any]:
+        """
+        Returns result dictionary from a row of settings followed by RESULT_COLUMNS.
+        """
+        return {'settings': json.loads(row[0]), **dict(zip(RESULT_COLUMNS, row[1:]))}
+
+    def add_results(self, sweepKey: str, results: List[Dict[str, Any]]):
+        """
+        Stores results of sweep provided in a single transaction. Results already stored are replaced. Failed results
+        aren't stored, so their settings are run again by the next sweep instead of being skipped forever.
+        :param sweepKey: Key of sweep results belong to (see get_sweep_key).
+        :param results: Result dictionaries like the ones optimizer.run_settings returns.
+        """
+        createdAt = time.time()
+        rows = [(get_settings_key(sweepKey, result['settings']), sweepKey, json.dumps(result['settings']),
+                 *(result[column] for column in RESULT_COLUMNS), createdAt)
+                for result in results if result['error'] is None]
+        with closing(self.get_connection()) as connection:
+            with connection:
+                connection.executemany(f'''
+                INSERT OR REPLACE INTO {RESULTS_TABLE} (key, sweep, settings, net, profit, profit_percentage,
+                drawdown, trades, commissions, error, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);''', rows)
+
+    def get_results(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns stored results of keys provided. Keys without results or with failed results are left out, so their
+        settings are run again.
+        :param keys: Settings keys (see get_settings_key).
+        :return: Dictionary of keys to result dictionaries.
+        """
+        results = {}
+        with closing(self.get_connection()) as connection:
+            for index in range(0, len(keys), QUERY_CHUNK_SIZE):
+                chunk = keys[index:index + QUERY_CHUNK_SIZE]
+                rows = connection.execute(f'''
+                SELECT key, settings, net, profit, profit_percentage, drawdown, trades, commissions, error
+                FROM {RESULTS_TABLE} WHERE key IN ({', '.join('?' * len(chunk))}) AND error IS NULL''',
+                                          chunk).fetchall()
+                for row in rows:
+                    results[row[0]] = self.get_result(row[1:])
+        return results
+
+    def get_top_results(self, sweepKey: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Returns stored results of sweep provided with the highest nets, ranked like optimizer results. Failed runs
+        are left out.
+        :param sweepKey: Key of sweep (see get_sweep_key).
+        :param limit: Maximum amount of results returned.
+        :return: Ranked result dictionaries.
+        """
+        with closing(self.get_connection()) as connection:
+            rows = connection.execute(f'''
+            SELECT settings, net, profit, profit_percentage, drawdown, trades, commissions, error
+            FROM {RESULTS_TABLE} WHERE sweep = ? AND error IS NULL ORDER BY net DESC LIMIT ?''',
+                                      (sweepKey, limit)).fetchall()
+
+        results = [self.get_result(row) for row in rows]
+        for rank, result in enumerate(results, start=1):
+            result['rank'] = rank
+        return results
+
+    def get_count(self, sweepKey: str = None) -> int:
+        """
+        Returns amount of results stored for sweep provided. If no sweep is provided, every result is counted.
+        """
+        with closing(self.get_connection()) as connection:
+            if sweepKey is None:
+                return connection.execute(f'SELECT COUNT(*) FROM {RESULTS_TABLE}').fetchone()[0]
+            return connection.execute(f'SELECT COUNT(*) FROM {RESULTS_TABLE} WHERE sweep = ?',
+                                      (sweepKey,)).fetchone()[0]
+
+    def delete_sweep(self, sweepKey: str):
+        """
+        Deletes every result stored for sweep provided.
+        """
+        with closing(self.get_connection()) as connection:
+            with connection:
+                connection.execute(f'DELETE FROM {RESULTS_TABLE} WHERE sweep = ?', (sweepKey,))
@@ -0,0 +1,129 @@
+"""
+Resampling of candle data to larger intervals. Backtests with a strategy interval larger than the data interval feed
+strategies candles of the strategy interval; they're built here for the whole backtest in a single vectorized pass,
+so backtests read them by index instead of aggregating periods as they go.
+"""
+
+import numpy as np
+
+from candles import CandleStore
+
+
+def get_boundaries(timestamps: np.ndarray, startIndex: int, endIndex: int, intervalMilliseconds: int) -> np.ndarray:
+    """
+    Returns indices of periods at which backtests complete a candle of the strategy interval. The first candle is
+    completed by the first period at least an interval after the start period, and every later candle by the first
+    period at least an interval after the period that completed the one before it, so gaps in data shift them.
+    :param timestamps: Epoch timestamps in milliseconds of data in ascending order.
+    :param startIndex: Index of the first period of backtest.
+    :param endIndex: Index of the last period of backtest.
+    :param intervalMilliseconds: Strategy interval in milliseconds.
+    :return: Array of indices in ascending order.
+    """
+    timestamps = np.ascontiguousarray(timestamps[startIndex:endIndex + 1])
+    if len(timestamps) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    steps = np.diff(timestamps)
+    if len(steps) == 0 or np.all(steps == steps[0]):  # Regular data completes candles every gap periods.
+        first = int(np.searchsorted(timestamps, timestamps[0] + intervalMilliseconds))
+        gap = -(-intervalMilliseconds // int(steps[0])) if len(steps) else 1
+        return np.arange(first, len(timestamps), gap, dtype=np.int64) + startIndex
+
+    boundaries = []
+    boundary = 0
+    while True:
+        boundary = int(np.searchsorted(timestamps, timestamps[boundary] + intervalMilliseconds))
+        if boundary >= len(timestamps):
+            return np.array(boundaries, dtype=np.int64) + startIndex
+        boundaries.append(boundary)
+
+
+def get_window_extremes(values: np.ndarray, ends: np.ndarray, length: int, findMax: bool) -> np.ndarray:
+    """
+    Returns highest or lowest of length values before every end index provided. Windows that would start before the
+    first value are cut off.
+    """
+    if len(ends) == 0:
+        return np.zeros(0, dtype=values.dtype)
+
+    # Every window is reduced between its start and end index; the reductions between windows are thrown away.
+    indices = np.empty(2 * len(ends), dtype=np.intp)
+    indices[0::2] = np.maximum(ends - length, 0)
+    indices[1::2] = ends
+    values = np.append(values, values[-1])  # Indices have to be smaller than the amount of values.
+    return (np.maximum if findMax else np.minimum).reduceat(values, indices)[0::2]
+
+
+def resample(data: CandleStore, boundaries: np.ndarray, length: int) -> CandleStore:
+    """
+    Returns candles completed at boundaries provided. Like the gap data of backtests, a candle completed at a period
+    aggregates the length periods before it, not including the period itself.
+    :param data: Candle data in ascending order.
+    :param boundaries: Indices of periods that complete candles (see get_boundaries).
+    :param length: Amount of periods aggregated in every candle.
+    :return: Candle store of open, high, low, close, and volume of every candle in ascending order.
+    """
+    starts = np.maximum(boundaries - length, 0)
+    volumes = np.concatenate(([0], np.cumsum(data.get_column('volume'))))
+    columns = {
+        'open': data.get_column('open')[starts],
+        'high': get_window_extremes(data.get_column('high'), boundaries, length, findMax=True),
+        'low': get_window_extremes(data.get_column('low'), boundaries, length, findMax=False),
+        'close': data.get_column('close')[boundaries - 1],
+        'volume': volumes[boundaries] - volumes[starts],
+    }
+    return CandleStore.from_arrays(data.get_timestamps()[starts], columns, data.timezoneAware)
+
+
+def get_candle_counts(boundaries: np.ndarray, length: int) -> np.ndarray:
+    """
+    Returns amount of candles completed before every period of data. A candle completed at a period is available
+    from the period after it.
+    :param boundaries: Indices of periods that complete candles (see get_boundaries).
+    :param length: Amount of periods in data.
+    :return: Array of candle counts.
+    """
+    return np.searchsorted(boundaries, np.arange(length), 'left')
+
+
+def get_windows(candleValues: np.ndarray, counts: np.ndarray, values: np.ndarray, prices: int,
+                weights: np.ndarray) -> np.ndarray:
+    """
+    Returns weighted sums of windows of prices values, where every window is the prices - 1 newest completed candles
+    followed by the current period. Windows without enough candles are NaN.
+    :param candleValues: Values of completed candles in ascending order.
+    :param counts: Amount of candles completed before every period (see get_candle_counts).
+    :param values: Values of every period.
+    :param prices: Amount of values in every window.
+    :param weights: Weight of every value of window from oldest to newest.
+    :return: Array of weighted sums.
+    """
+    sums = np.full(len(values), np.nan)
+    starts = counts - (prices - 1)  # Index of the oldest candle of every window.
+    valid = starts >= 0
+    if prices == 1:
+        sums[valid] = values[valid] * weights[-1]
+    elif len(candleValues) >= prices - 1:
+        candleSums = np.correlate(candleValues, weights[:-1], 'valid')
+        valid &= starts < len(candleSums)
+        sums[valid] = candleSums[starts[valid]] + values[valid] * weights[-1]
+    return sums
+
+
+def get_resampled_sma_series(candleValues: np.ndarray, counts: np.ndarray, values: np.ndarray,
+                             prices: int) -> np.ndarray:
+    """
+    Returns simple moving average of completed candles and the current period as of every period.
+    """
+    return get_windows(candleValues, counts, values, prices, np.ones(prices)) / prices
+
+
+def get_resampled_wma_series(candleValues: np.ndarray, counts: np.ndarray, values: np.ndarray,
+                             prices: int) -> np.ndarray:
+    """
+    Returns weighted moving average of completed candles and the current period as of every period. The current
+    period is weighted with prices and the oldest candle with 1.
+    """
+    weights = np.arange(1, prices + 1, dtype=np.float64)
+    return get_windows(candleValues, counts, values, prices, weights) / (prices * (prices + 1) / 2)
@@ -0,0 +1,323 @@
+"""
+Incremental indicator state for live data. Windows are kept in sync with run-time data (newest periods first) and are
+updated in O(1) per closed period instead of being recalculated from scratch on every call.
+"""
+
+from collections import deque
+from fractions import Fraction
+from typing import List, Tuple, Union
+
+from candles import CandleBuffer, CandleStore
+from helpers import get_data_from_parameter
+
+RSI_WARM_UP = 500  # Periods RSI smoothing is warmed up with on top of the RSI period.
+RSI_HISTORY = 100  # Past closed period RSI states kept for shifted RSI values.
+
+
+class RollingWindow:
+    def __init__(self, length: int, parameter: str, offset: int = 0):
+        """
+        Running simple and weighted sums of a window of closed periods. Sums are kept as exact fractions, so they never
+        drift no matter how many periods enter and leave the window.
+        :param length: Amount of periods in window.
+        :param parameter: Parameter to sum (e.g. close or high/low).
+        :param offset: Index in run-time data of the newest period in window.
+        """
+        self.length = length
+        self.parameter = parameter
+        self.offset = offset
+        self.total = Fraction(0)  # Sum of values in window.
+        self.weightedTotal = Fraction(0)  # Sum of values weighted from length (newest) down to 1 (oldest).
+        self.latestTimestamp = None  # Timestamp of newest run-time period when window was last synced.
+
+    def get_value(self, data: Union[CandleBuffer, CandleStore], index: int) -> Fraction:
+        """
+        Returns exact value of parameter at index provided.
+        """
+        return Fraction(get_data_from_parameter(data[index], self.parameter))
+
+    def recalculate(self, data: Union[CandleBuffer, CandleStore]):
+        """
+        Recalculates sums from scratch.
+        :param data: Run-time data with newest periods first.
+        """
+        values = data[self.offset:self.offset + self.length].get_column(self.parameter).tolist()
+        self.total = Fraction(0)
+        self.weightedTotal = Fraction(0)
+        for index, value in enumerate(values):
+            value = Fraction(value)
+            self.total += value
+            self.weightedTotal += (self.length - index) * value
+        self.latestTimestamp = data[0].get_timestamp()
+
+    def get_new_periods(self, data: Union[CandleBuffer, CandleStore]) -> Union[int, None]:
+        """
+        Returns amount of periods added to data since the last sync, or None if sums have to be recalculated.
+        :param data: Run-time data with newest periods first.
+        """
+        if self.latestTimestamp is None:
+            return None
+
+        for index in range(min(self.length, len(data) - self.offset - self.length)):
+            if data[index].get_timestamp() == self.latestTimestamp:
+                return index
+        return None
+
+    def sync(self, data: Union[CandleBuffer, CandleStore]):
+        """
+        Brings sums up to date with run-time data. Every new closed period costs O(1).
+        :param data: Run-time data with newest periods first.
+        """
+        if len(data) == 0:
+            raise ValueError("Cannot calculate rolling window of empty data.")
+
+        newPeriods = self.get_new_periods(data)
+        if newPeriods is None:
+            self.recalculate(data)
+            return
+
+        for index in range(newPeriods - 1, -1, -1):  # Slide window one period at a time, oldest new period first.
+            enteringValue = self.get_value(data, self.offset + index)
+            leavingValue = self.get_value(data, self.offset + self.length + index)
+            self.weightedTotal = self.length * enteringValue + self.weightedTotal - self.total
+            self.total += enteringValue - leavingValue
+        self.latestTimestamp = data[0].get_timestamp()
+
+    def get_sum(self, currentValue: float = None) -> float:
+        """
+        Returns sum of window. If a current value is provided, it's treated as the newest period.
+        :param currentValue: Value of period in progress.
+        :return: Sum of values.
+        """
+        return float(self.total if currentValue is None else self.total + Fraction(currentValue))
+
+    def get_sma(self, prices: int, currentValue: float = None) -> float:
+        """
+        Returns simple moving average of window. If a current value is provided, it's treated as the newest period.
+        :param prices: Amount of prices averaged.
+        :param currentValue: Value of period in progress.
+        :return: Simple moving average.
+        """
+        total = self.total if currentValue is None else self.total + Fraction(currentValue)
+        return float(total) / prices
+
+    def get_wma(self, prices: int, currentValue: float = None) -> float:
+        """
+        Returns weighted moving average of window. If a current value is provided, it's treated as the newest period.
+        :param prices: Amount of prices averaged.
+        :param currentValue: Value of period in progress.
+        :return: Weighted moving average.
+        """
+        total = self.weightedTotal
+        if currentValue is not None:
+            total += prices * Fraction(currentValue)
+        return float(total) / (prices * (prices + 1) / 2)
+
+
+class RollingExtremum:
+    def __init__(self, length: int, parameter: str, findMax: bool = False):
+        """
+        Rolling minimum or maximum of the newest closed periods kept with a monotonic deque. Every period enters and
+        leaves the deque once, so keeping it in sync costs O(1) amortized per closed period.
+        :param length: Amount of periods in window.
+        :param parameter: Parameter to find extremum of (e.g. low or high).
+        :param findMax: Boolean whether maximum or minimum is kept.
+        """
+        self.length = length
+        self.parameter = parameter
+        self.findMax = findMax
+        self.candidates = deque()  # (timestamp, value) from oldest to newest. Values are monotonic.
+        self.latestTimestamp = None  # Timestamp of newest run-time period when window was last synced.
+
+    def push(self, timestamp: int, value: float):
+        """
+        Adds newest period to deque and drops candidates it makes irrelevant.
+        """
+        candidates = self.candidates
+        if self.findMax:
+            while candidates and candidates[-1][1] <= value:
+                candidates.pop()
+        else:
+            while candidates and candidates[-1][1] >= value:
+                candidates.pop()
+        candidates.append((timestamp, value))
+
+    def recalculate(self, data: Union[CandleBuffer, CandleStore]):
+        """
+        Rebuilds deque from scratch.
+        :param data: Run-time data with newest periods first.
+        """
+        window = data[:self.length]
+        self.candidates.clear()
+        for timestamp, value in zip(window.get_timestamps().tolist()[::-1],
+                                    window.get_column(self.parameter).tolist()[::-1]):
+            self.push(timestamp, value)
+        self.latestTimestamp = data[0].get_timestamp()
+
+    def get_new_periods(self, data: Union[CandleBuffer, CandleStore]) -> Union[int, None]:
+        """
+        Returns amount of periods added to data since the last sync, or None if deque has to be rebuilt.
+        :param data: Run-time data with newest periods first.
+        """
+        if self.latestTimestamp is None:
+            return None
+
+        for index in range(min(self.length, len(data))):
+            if data[index].get_timestamp() == self.latestTimestamp:
+                return index
+        return None
+
+    def sync(self, data: Union[CandleBuffer, CandleStore]):
+        """
+        Brings deque up to date with run-time data.
+        :param data: Run-time data with newest periods first.
+        """
+        if len(data) == 0:
+            raise ValueError("Cannot calculate rolling extremum of empty data.")
+
+        newPeriods = self.get_new_periods(data)
+        if newPeriods is None or self.length == 0:
+            self.recalculate(data)
+            return
+
+        for index in range(newPeriods - 1, -1, -1):  # Push new periods oldest first.
+            self.push(data[index].get_timestamp(), get_data_from_parameter(data[index], self.parameter))
+
+        oldestTimestamp = data[min(self.length, len(data)) - 1].get_timestamp()
+        while self.candidates[0][0] < oldestTimestamp:
+            self.candidates.popleft()
+        self.latestTimestamp = data[0].get_timestamp()
+
+    def get_value(self, currentValue: float = None) -> Union[float, None]:
+        """
+        Returns extremum of window. If a current value is provided, it's treated as the newest period.
+        :param currentValue: Value of period in progress.
+        :return: Minimum or maximum value, or None if there are no values.
+        """
+        values = [value for value in (currentValue, self.candidates[0][1] if self.candidates else None)
+                  if value is not None]
+        if not values:
+            return None
+        return max(values) if self.findMax else min(values)
+
+
+def get_rsi_averages(values: List[float], prices: int) -> Tuple[float, float]:
+    """
+    Returns Wilder-smoothed averages of ups and downs of values provided, starting from averages of 0 at the oldest
+    value. This is the same smoothing Data.get_rsi has always used.
+    :param values: Values in ascending order (oldest first).
+    :param prices: RSI period.
+    :return: Tuple of average up and average down.
+    """
+    averageUp = averageDown = 0
+    alpha = 1 / prices
+    for index in range(1, len(values)):
+        averageUp, averageDown = get_next_rsi_averages(averageUp, averageDown, values[index - 1], values[index], alpha)
+    return averageUp, averageDown
+
+
+def get_next_rsi_averages(averageUp: float, averageDown: float, previousValue: float, value: float,
+                          alpha: float) -> Tuple[float, float]:
+    """
+    Carries smoothed RSI averages forward by one period.
+    :param averageUp: Average up as of previous period.
+    :param averageDown: Average down as of previous period.
+    :param previousValue: Value of previous period.
+    :param value: Value of new period.
+    :param alpha: Smoothing factor (1 / RSI period).
+    :return: Tuple of new average up and average down.
+    """
+    if value > previousValue:
+        up, down = value - previousValue, 0
+    else:
+        up, down = 0, previousValue - value
+    return up * alpha + averageUp * (1 - alpha), down * alpha + averageDown * (1 - alpha)
+
+
+def get_rsi_from_averages(averageUp: float, averageDown: float) -> float:
+    """
+    Returns relative strength index from average up and average down. Without any downs, RSI is 100.
+    """
+    if averageDown == 0:
+        return 100
+    rs = averageUp / averageDown
+    return 100 - 100 / (1 + rs)
+
+
+class RollingRSI:
+    def __init__(self, prices: int, parameter: str, warmUp: int = RSI_WARM_UP, historyLength: int = RSI_HISTORY):
+        """
+        Smoothed RSI averages carried forward one closed period at a time. Averages are first calculated over
+        warmUp + prices periods like Data.get_rsi always did, and then updated in O(1) as periods close.
+        :param prices: RSI period.
+        :param parameter: Parameter RSI is calculated with (e.g. close).
+        :param warmUp: Periods used to warm up smoothing on top of RSI period.
+        :param historyLength: Amount of past closed period states kept for shifted RSI values.
+        """
+        self.prices = prices
+        self.parameter = parameter
+        self.alpha = 1 / prices
+        self.windowLength = warmUp + prices
+        self.states = deque(maxlen=historyLength)  # (timestamp, value, average up, average down) newest first.
+
+    def recalculate(self, data: Union[CandleBuffer, CandleStore]):
+        """
+        Recalculates averages from scratch over the newest window of closed periods.
+        :param data: Run-time data with newest periods first.
+        """
+        window = data[:self.windowLength]
+        values = window.get_column(self.parameter).tolist()[::-1]
+        averageUp, averageDown = get_rsi_averages(values, self.prices)
+        self.states.clear()
+        self.states.appendleft((window[0].get_timestamp(), values[-1], averageUp, averageDown))
+
+    def get_new_periods(self, data: Union[CandleBuffer, CandleStore]) -> Union[int, None]:
+        """
+        Returns amount of periods added to data since the last sync, or None if averages have to be recalculated.
+        :param data: Run-time data with newest periods first.
+        """
+        if not self.states:
+            return None
+
+        latestTimestamp = self.states[0][0]
+        for index in range(min(self.windowLength, len(data))):
+            if data[index].get_timestamp() == latestTimestamp:
+                return index
+        return None
+
+    def sync(self, data: Union[CandleBuffer, CandleStore]):
+        """
+        Carries averages forward to the newest closed period of run-time data.
+        :param data: Run-time data with newest periods first.
+        """
+        if len(data) == 0:
+            raise ValueError("Cannot calculate RSI of empty data.")
+
+        newPeriods = self.get_new_periods(data)
+        if newPeriods is None:
+            self.recalculate(data)
+            return
+
+        parameter = self.parameter
+        for index in range(newPeriods - 1, -1, -1):
+            _, previousValue, averageUp, averageDown = self.states[0]
+            value = get_data_from_parameter(data[index], parameter)
+            averageUp, averageDown = get_next_rsi_averages(averageUp, averageDown, previousValue, value, self.alpha)
+            self.states.appendleft((data[index].get_timestamp(), value, averageUp, averageDown))
+
+    def get_rsi(self, periodsAgo: int = 0, currentValue: float = None) -> Union[float, None]:
+        """
+        Returns RSI as of a closed period, or what the RSI would be if the period in progress closed at current value.
+        What-if values never change the committed averages.
+        :param periodsAgo: Index of closed period in run-time data. Ignored if current value is provided.
+        :param currentValue: Value of period in progress.
+        :return: RSI or None if closed period is older than the states kept.
+        """
+        if currentValue is not None:
+            _, previousValue, averageUp, averageDown = self.states[0]
+            return get_rsi_from_averages(*get_next_rsi_averages(averageUp, averageDown, previousValue, currentValue,
+                                                                self.alpha))
+
+        if periodsAgo >= len(self.states):
+            return None
+        return get_rsi_from_averages(*self.states[periodsAgo][2:])
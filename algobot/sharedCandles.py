@@ -0,0 +1,147 @@
+"""
+Candle datasets shared between processes. Arrays of a candle store are copied once into a shared memory block, and
+worker processes attach to the block by name and read the arrays in place, so memory doesn't grow with every process.
+"""
+
+from multiprocessing import shared_memory
+from typing import List, Mapping, Tuple
+
+import numpy as np
+
+from candles import CandleStore
+from helpers import convert_all_dates_to_datetime, load_from_csv
+
+
+class SharedCandleDataset:
+    def __init__(self, name: str, length: int, fields: Tuple[str, ...], timezoneAware: bool = True,
+                 memory: shared_memory.SharedMemory = None):
+        """
+        Candle data in a shared memory block. The block holds int64 timestamps followed by a float64 array for every
+        field. Use from_store (or the other constructors) to create a dataset and pickle it to send it to other
+        processes; unpickling attaches to the same block by name without copying data.
+        :param name: Name of shared memory block.
+        :param length: Amount of periods in dataset.
+        :param fields: Fields stored after timestamps.
+        :param timezoneAware: Boolean that determines whether dates returned from rows have a UTC timezone or not.
+        :param memory: Shared memory block if already opened. If none, block is attached to by name.
+        """
+        self.name = name
+        self.length = length
+        self.fields = tuple(fields)
+        self.timezoneAware = timezoneAware
+        self.owner = memory is not None  # Only the process that created the block unlinks it.
+        self.memory = memory if memory is not None else shared_memory.SharedMemory(name=name)
+        self.store = None
+
+    @staticmethod
+    def get_size(length: int, fields: Tuple[str, ...]) -> int:
+        """
+        Returns amount of bytes needed for dataset with length and fields provided.
+        """
+        return max(1, 8 * length * (len(fields) + 1))
+
+    @classmethod
+    def from_store(cls, store: CandleStore):
+        """
+        Creates a dataset with a copy of the periods of candle store provided in their current order.
+        :param store: Candle store to share.
+        :return: Shared candle dataset that owns its block.
+        """
+        columns = store.get_columns()
+        fields = tuple(columns)
+        length = len(store)
+        memory = shared_memory.SharedMemory(create=True, size=cls.get_size(length, fields))
+        dataset = cls(memory.name, length, fields, store.timezoneAware, memory=memory)
+
+        timestamps, arrays = dataset.get_arrays()
+        timestamps[:] = store.get_timestamps()
+        for field in fields:
+            arrays[field][:] = columns[field]
+        return dataset
+
+    @classmethod
+    def from_dicts(cls, data: List[Mapping]):
+        """
+        Creates a dataset from a list of dictionaries like the ones helpers.load_from_csv returns. Dates can be
+        strings or datetime objects.
+        :param data: List of period dictionaries.
+        :return: Shared candle dataset that owns its block.
+        """
+        convert_all_dates_to_datetime(data)
+        return cls.from_store(CandleStore.from_dicts(data))
+
+    @classmethod
+    def from_csv(cls, path: str, descending: bool = False):
+        """
+        Creates a dataset from a CSV file in the format Data.create_csv_file writes.
+        :param path: Path to CSV file.
+        :param descending: Boolean whether periods are stored from newest to oldest or not.
+        :return: Shared candle dataset that owns its block.
+        """
+        return cls.from_dicts(load_from_csv(path, descending=descending))
+
+    @classmethod
+    def from_data(cls, data, descending: bool = False):
+        """
+        Creates a dataset from periods loaded in a Data object.
+        :param data: Data object.
+        :param descending: Boolean whether periods are stored from newest to oldest or not.
+        :return: Shared candle dataset that owns its block.
+        """
+        store = data.data.to_store()  # Run-time data is ordered from newest to oldest.
+        return cls.from_store(store if descending else store[::-1])
+
+    def get_arrays(self) -> Tuple[np.ndarray, dict]:
+        """
+        Returns timestamps array and dictionary of field arrays backed by the shared memory block.
+        """
+        buffer = self.memory.buf
+        timestamps = np.ndarray(self.length, dtype=np.int64, buffer=buffer)
+        arrays = {field: np.ndarray(self.length, dtype=np.float64, buffer=buffer, offset=8 * self.length * index)
+                  for index, field in enumerate(self.fields, start=1)}
+        return timestamps, arrays
+
+    def get_store(self) -> CandleStore:
+        """
+        Returns a read-only candle store that reads the shared memory block in place.
+        """
+        if self.store is None:
+            timestamps, arrays = self.get_arrays()
+            timestamps.flags.writeable = False
+            for values in arrays.values():
+                values.flags.writeable = False
+            self.store = CandleStore.from_arrays(timestamps, arrays, self.timezoneAware)
+        return self.store
+
+    def close(self):
+        """
+        Detaches from shared memory block. Stores taken from the dataset must not be used afterwards.
+        """
+        self.store = None
+        try:
+            self.memory.close()
+        except BufferError:
+            pass  # Arrays are still referenced elsewhere; the block is unmapped once they're released.
+
+    def unlink(self):
+        """
+        Destroys shared memory block. Processes still attached keep their mapping until they close it.
+        """
+        self.memory.unlink()
+
+    def __reduce__(self):
+        return SharedCandleDataset, (self.name, self.length, self.fields, self.timezoneAware)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        if self.owner:
+            self.unlink()
+
+    def __repr__(self) -> str:
+        return f'SharedCandleDataset(name={self.name!r}, length={self.length})'
@@ -1,6 +1,7 @@
 from typing import List
 
 from strategies.strategy import Strategy
+from candles import CandleStore
 from data import Data
 from enums import BEARISH, BULLISH
 from option import Option
@@ -40,10 +41,17 @@ class MovingAverageStrategy(Strategy):
                 ('Final', int)
                 ]
 
+    def get_indicators(self) -> List[tuple]:
+        indicators = []
+        for option in self.tradingOptions:
+            indicators.append((option.movingAverage, option.parameter, option.initialBound))
+            indicators.append((option.movingAverage, option.parameter, option.finalBound))
+        return indicators
+
     def get_params(self) -> List[Option]:
         return self.tradingOptions
 
-    def get_trend(self, data: List[dict] or Data = None, log_data=False) -> int:
+    def get_trend(self, data: List[dict] or CandleStore or Data = None, log_data=False) -> int:
         parent = self.parent
         trends = []  # Current option trends. They all have to be the same to register a trend.
 
@@ -63,7 +71,7 @@ class MovingAverageStrategy(Strategy):
             movingAverage, parameter, initialBound, finalBound = option.get_all_params()
             initialName, finalName = option.get_pretty_option()
 
-            if type(data) == list:
+            if isinstance(data, (list, CandleStore)):
                 avg1 = parent.get_moving_average(data, option.movingAverage, option.initialBound, option.parameter)
                 avg2 = parent.get_moving_average(data, option.movingAverage, option.finalBound, option.parameter)
             else:
@@ -4,6 +4,7 @@ Please make sure that they have some default values for the GUI to initialize th
 """
 
 from typing import List, Union
+from candles import CandleStore
 from data import Data
 
 
@@ -23,7 +24,7 @@ class Strategy:
         self.strategyDict = {}
         self.lowerIntervalDict = {}
 
-    def get_trend(self, data: Union[List[dict], Data] = None, log_data: bool = False) -> int:
+    def get_trend(self, data: Union[List[dict], CandleStore, Data] = None, log_data: bool = False) -> int:
         """
         Implement your strategy here. Based on the strategy's algorithm, this should return a trend.
         A trend can be either bullish, bearish, or neither.
@@ -31,6 +32,13 @@ class Strategy:
         """
         raise NotImplementedError("Implement a strategy to get trend.")
 
+    def get_indicators(self) -> List[tuple]:
+        """
+        Returns indicators strategy reads from its parent as tuples of moving average, parameter, and prices.
+        Backtesters precompute them once per run instead of at every period.
+        """
+        return []
+
     def get_params(self) -> list:
         raise NotImplementedError("Implement a function to return parameters.")
 
@@ -44,8 +52,8 @@ class Strategy:
         """
         self.strategyDict = {}
 
-    def get_appropriate_dictionary(self, data: Union[list, Data]) -> dict:
-        if type(data) == list:
+    def get_appropriate_dictionary(self, data: Union[list, CandleStore, Data]) -> dict:
+        if isinstance(data, (list, CandleStore)):
             return self.strategyDict
         elif type(data) == Data:
             if data == self.parent.dataView:
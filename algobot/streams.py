@@ -0,0 +1,193 @@
+"""
+Streaming kline feeds. A stream source pushes Binance kline messages into a KlineFeed, and Data reads the latest
+period from it instead of polling the REST API. A replay server can stand in for Binance's websocket for testing.
+"""
+
+import threading
+import time
+
+from typing import List, Tuple, Union
+
+
+def kline_message_to_kline(message: dict) -> list:
+    """
+    Converts kline payload of a Binance websocket message to the list format returned by the REST API.
+    :param message: Websocket message with kline data in its k key.
+    :return: Kline list.
+    """
+    kline = message['k']
+    return [kline['t'], kline['o'], kline['h'], kline['l'], kline['c'], kline['v'], kline['T'], kline['q'],
+            kline['n'], kline['V'], kline['Q'], '0']
+
+
+def kline_to_kline_message(kline: list, symbol: str, interval: str, closed: bool) -> dict:
+    """
+    Converts kline list returned by the REST API to the message format Binance's kline websocket pushes.
+    :param kline: Kline list.
+    :param symbol: Symbol of kline.
+    :param interval: Interval of kline.
+    :param closed: Boolean whether kline's period is closed or not.
+    :return: Websocket message.
+    """
+    return {'e': 'kline', 'E': int(time.time() * 1000), 's': symbol,
+            'k': {'t': kline[0], 'T': kline[6], 's': symbol, 'i': interval, 'o': kline[1], 'c': kline[4],
+                  'h': kline[2], 'l': kline[3], 'v': kline[5], 'n': kline[8], 'x': closed, 'q': kline[7],
+                  'V': kline[9], 'Q': kline[10]}}
+
+
+class KlineFeed:
+    def __init__(self):
+        """
+        Thread-safe buffer of kline updates pushed by a stream. Stream threads call process_message and the trading
+        thread consumes updates with pop_updates.
+        """
+        self.condition = threading.Condition()
+        self.closedKlines = []  # Klines of closed periods that weren't consumed yet.
+        self.currentKline = None  # Latest kline of the period that's still open.
+        self.version = 0  # Incremented with every message, so waiting threads know when new data arrives.
+        self.error = None  # Last error message pushed by the stream.
+
+    def process_message(self, message: dict):
+        """
+        Handles a Binance kline websocket message.
+        :param message: Websocket message.
+        """
+        with self.condition:
+            if message.get('e') == 'error':
+                self.error = message.get('m', 'Unknown stream error.')
+            elif message.get('e') == 'kline':
+                kline = kline_message_to_kline(message)
+                if message['k']['x']:
+                    self.closedKlines.append(kline)
+                    if self.currentKline is not None and self.currentKline[0] <= kline[0]:
+                        self.currentKline = None
+                else:
+                    self.currentKline = kline
+            else:
+                return
+            self.version += 1
+            self.condition.notify_all()
+
+    def pop_updates(self) -> Tuple[List[list], Union[list, None]]:
+        """
+        Returns klines of periods closed since the last call and the latest kline of the open period.
+        :return: Tuple of closed klines and current kline (or None if no update for the open period arrived yet).
+        """
+        with self.condition:
+            closedKlines = self.closedKlines
+            self.closedKlines = []
+            return closedKlines, self.currentKline
+
+    def wait_for_update(self, version: int, timeout: float = None) -> int:
+        """
+        Blocks until a message newer than version provided arrives or timeout passes.
+        :param version: Last version seen by caller.
+        :param timeout: Maximum seconds to wait.
+        :return: Latest version.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+
+class BinanceKlineStream:
+    socketManager = None  # Twisted's reactor can only run once per process, so every stream shares one manager.
+    socketManagerLock = threading.Lock()
+
+    def __init__(self, feed: KlineFeed, client, symbol: str, interval: str):
+        """
+        Kline stream from Binance's websocket.
+        :param feed: Feed that receives kline messages.
+        :param client: Binance client.
+        :param symbol: Symbol to stream klines of.
+        :param interval: Interval to stream klines in.
+        """
+        self.feed = feed
+        self.client = client
+        self.symbol = symbol
+        self.interval = interval
+        self.connectionKey = None
+
+    def start(self):
+        """
+        Connects to Binance's kline websocket.
+        """
+        from binance.websockets import BinanceSocketManager
+
+        with BinanceKlineStream.socketManagerLock:
+            if BinanceKlineStream.socketManager is None:
+                BinanceKlineStream.socketManager = BinanceSocketManager(self.client)
+                BinanceKlineStream.socketManager.daemon = True
+            manager = BinanceKlineStream.socketManager
+            self.connectionKey = manager.start_kline_socket(self.symbol, self.feed.process_message,
+                                                            interval=self.interval)
+            if not manager.is_alive():
+                manager.start()
+
+    def stop(self):
+        """
+        Disconnects from Binance's kline websocket.
+        """
+        if self.connectionKey and BinanceKlineStream.socketManager is not None:
+            BinanceKlineStream.socketManager.stop_socket(self.connectionKey)
+            self.connectionKey = None
+
+
+class KlineReplayServer:
+    def __init__(self, feed: KlineFeed, klines: List[list], symbol: str = 'BTCUSDT', interval: str = '1m',
+                 updatesPerPeriod: int = 2, delay: float = 0.01):
+        """
+        Local stand-in for Binance's kline websocket. Replays klines provided (in ascending order) as open period
+        updates followed by a closed period message, just like Binance does.
+        :param feed: Feed that receives kline messages.
+        :param klines: Klines to replay in ascending order.
+        :param symbol: Symbol of klines.
+        :param interval: Interval of klines.
+        :param updatesPerPeriod: Amount of open period updates pushed before a period closes.
+        :param delay: Seconds between messages.
+        """
+        self.feed = feed
+        self.klines = klines
+        self.symbol = symbol
+        self.interval = interval
+        self.updatesPerPeriod = updatesPerPeriod
+        self.delay = delay
+        self.running = False
+        self.thread = None
+
+    def get_messages(self):
+        """
+        Yields messages to replay.
+        """
+        for kline in self.klines:
+            for _ in range(self.updatesPerPeriod):
+                yield kline_to_kline_message(kline, self.symbol, self.interval, closed=False)
+            yield kline_to_kline_message(kline, self.symbol, self.interval, closed=True)
+
+    def replay(self):
+        """
+        Pushes messages to feed until every kline is replayed or the server is stopped.
+        """
+        for message in self.get_messages():
+            if not self.running:
+                break
+            self.feed.process_message(message)
+            time.sleep(self.delay)
+        self.running = False
+
+    def start(self):
+        """
+        Starts replaying klines on a background thread.
+        """
+        self.running = True
+        self.thread = threading.Thread(target=self.replay, name='KlineReplayServer', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops replaying klines.
+        """
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
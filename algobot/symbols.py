@@ -0,0 +1,138 @@
+"""
+Process-wide registry of Binance symbols. Exchange information is cached on disk with a time to live, so symbol
+validation doesn't download the whole ticker list every time a Data object is created.
+"""
+
+import json
+import os
+import threading
+import time
+
+from typing import Set
+
+from clients import get_client
+from helpers import ROOT_DIR
+
+SYMBOL_CACHE_TTL = 24 * 60 * 60  # Seconds cached exchange information stays valid.
+
+
+class SymbolRegistry:
+    def __init__(self, cachePath: str = None, ttl: float = SYMBOL_CACHE_TTL, clientFactory=None):
+        """
+        Registry of symbols available on Binance.
+        :param cachePath: Path to JSON file exchange information is cached in. If none, it's stored in Databases.
+        :param ttl: Seconds cached exchange information stays valid.
+        :param clientFactory: Function that returns a Binance client. Only called when symbols have to be downloaded.
+            If none, the shared client is used.
+        """
+        if cachePath is None:
+            cachePath = os.path.join(ROOT_DIR, 'Databases', 'symbols.json')
+
+        self.cachePath = cachePath
+        self.ttl = ttl
+        self.clientFactory = clientFactory
+        self.symbols = None  # Set of symbols once loaded.
+        self.updated = 0  # Epoch time in seconds of when symbols were downloaded.
+        self.downloaded = False  # Boolean for whether symbols were downloaded in this process.
+        self.lock = threading.Lock()
+
+    def is_fresh(self) -> bool:
+        """
+        Returns whether symbols loaded are still within their time to live.
+        """
+        return self.symbols is not None and time.time() - self.updated < self.ttl
+
+    def load_cache(self) -> bool:
+        """
+        Loads symbols from cache file if it exists and is still within its time to live.
+        :return: Boolean whether symbols were loaded or not.
+        """
+        try:
+            with open(self.cachePath) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if time.time() - cache.get('updated', 0) >= self.ttl:
+            return False
+
+        self.symbols = set(cache['symbols'])
+        self.updated = cache['updated']
+        return True
+
+    def save_cache(self):
+        """
+        Writes symbols to cache file. The file is replaced atomically, so other processes never read half of it.
+        """
+        os.makedirs(os.path.dirname(self.cachePath), exist_ok=True)
+        tempPath = f'{self.cachePath}.{os.getpid()}.tmp'
+        with open(tempPath, 'w') as f:
+            json.dump({'updated': self.updated, 'symbols': sorted(self.symbols)}, f)
+        os.replace(tempPath, self.cachePath)
+
+    def download(self, client=None):
+        """
+        Downloads symbols from Binance exchange information and caches them. Symbols that aren't trading (e.g. halted
+        or delisted ones) are left out, since their klines can't be downloaded.
+        :param client: Binance client to use. If none, client factory is used.
+        """
+        if client is None:
+            client = get_client() if self.clientFactory is None else self.clientFactory()
+
+        exchangeInfo = client.get_exchange_info()
+        self.symbols = {symbol['symbol'] for symbol in exchangeInfo['symbols'] if symbol['status'] == 'TRADING'}
+        self.updated = time.time()
+        self.downloaded = True
+        try:
+            self.save_cache()
+        except OSError:
+            pass  # Symbols are still cached in memory.
+
+    def get_symbols(self, client=None) -> Set[str]:
+        """
+        Returns set of all symbols available on Binance. They're downloaded only if neither memory nor disk have them
+        within their time to live.
+        :param client: Binance client to use if symbols have to be downloaded.
+        :return: Set of symbols.
+        """
+        with self.lock:
+            if not self.is_fresh() and not self.load_cache():
+                self.download(client)
+            return self.symbols
+
+    def is_valid_symbol(self, symbol: str, client=None) -> bool:
+        """
+        Checks whether symbol provided is available on Binance. Symbols that aren't found are checked once more
+        against freshly downloaded exchange information in case they were listed after symbols were cached.
+        :param symbol: Symbol to be checked.
+        :param client: Binance client to use if symbols have to be downloaded.
+        :return: A boolean whether the symbol is valid or not.
+        """
+        if symbol in self.get_symbols(client):
+            return True
+
+        with self.lock:
+            if not self.downloaded:
+                self.download(client)
+            return symbol in self.symbols
+
+    def clear(self):
+        """
+        Clears symbols from memory and removes cache file.
+        """
+        with self.lock:
+            self.symbols = None
+            self.updated = 0
+            self.downloaded = False
+            if os.path.exists(self.cachePath):
+                os.remove(self.cachePath)
+
+
+symbolRegistry = SymbolRegistry()  # Shared by every Data object in this process.
+
+
+def get_symbol_registry() -> SymbolRegistry:
+    """
+    Returns registry of symbols shared by the whole process.
+    """
+    return symbolRegistry
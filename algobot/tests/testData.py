@@ -0,0 +1,37 @@
+"""
+Random walk candle data shared by tests.
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from candles import CandleStore, datetime_to_timestamp
+
+START_DATE = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+def get_test_data(count: int, seed: int = 0, minutes: int = 1, skipped: tuple = (),
+                  precision: int = None) -> CandleStore:
+    """
+    Returns random walk periods in ascending order starting at the start date. The same arguments always return the
+    same periods.
+    :param count: Amount of periods to return before skipped periods are left out.
+    :param seed: Seed of random generator.
+    :param minutes: Minutes between periods.
+    :param skipped: Indices of periods left out of data to make gaps.
+    :param precision: Decimal places prices are rounded to. If none, prices aren't rounded.
+    :return: Candle store of periods.
+    """
+    generator = np.random.default_rng(seed)
+    closes = 100 * np.cumprod(generator.uniform(0.99, 1.01, count))
+    if precision is not None:
+        closes = closes.round(precision)
+    opens = np.concatenate(([100], closes[:-1]))
+    timestamps = datetime_to_timestamp(START_DATE) + np.arange(count) * minutes * 60000
+    columns = {'open': opens, 'high': np.maximum(opens, closes), 'low': np.minimum(opens, closes), 'close': closes,
+               'volume': generator.uniform(1, 2, count)}
+
+    kept = np.ones(count, dtype=bool)
+    kept[list(skipped)] = False
+    return CandleStore.from_arrays(timestamps[kept], {field: values[kept] for field, values in columns.items()})
@@ -0,0 +1,106 @@
+import unittest
+
+from datetime import datetime, timedelta, timezone
+
+from activity import ActivityLog, ActivityThrottle
+from enums import STOP
+from strategies.movingAverage import MovingAverageStrategy
+from testData import get_test_data
+from traders.backtester import Backtester
+
+
+class Signal:
+    def emit(self, *args):
+        pass
+
+
+class Signals:
+    updateGraphLimits = Signal()
+    message = Signal()
+
+
+class ThrottledThread:
+    def __init__(self, backtester: Backtester, clock):
+        """
+        Stand-in for BacktestThread that records which activity samples would be signalled to the GUI.
+        """
+        self.backtester = backtester
+        self.running = True
+        self.signals = Signals()
+        self.activityThrottle = ActivityThrottle(maxRate=10, clock=clock)
+        self.emitted = []
+
+    def add_activity(self, period, index, length):
+        sampleIndex = self.backtester.add_activity(period, index, length)
+        if self.activityThrottle.is_due():
+            self.emitted.append(sampleIndex)
+
+
+class TestActivity(unittest.TestCase):
+    def test_activity_log(self):
+        """
+        Test that samples grow past their initial capacity and are formatted like GUI activity.
+        """
+        log = ActivityLog(capacity=2)
+        date = datetime(2021, 3, 1, 12, 30, tzinfo=timezone.utc)
+        for index in range(5):
+            self.assertEqual(log.add(date.timestamp() + index, 900 + index, 500, 1.23456, index, index * 20), index)
+
+        self.assertEqual(len(log), 5)
+        self.assertEqual(log.get_column('net').tolist(), [900, 901, 902, 903, 904])
+        self.assertEqual(log.get_sample(-1)['tradesMade'], 4)
+        with self.assertRaises(IndexError):
+            log.get_sample(5)
+
+        self.assertEqual(log.get_activity_dictionary(1, startingBalance=1000, precision=2), {
+            'net': 901,
+            'netString': '$901.0',
+            'balance': '$500.0',
+            'commissionsPaid': '$1.23',
+            'tradesMade': '1',
+            'profit': '$99.0',
+            'profitPercentage': '9.9%',
+            'currentPeriod': '03/01/2021, 12:30:01',
+            'utc': date.timestamp() + 1,
+            'percentage': 20,
+        })
+
+    def test_throttle(self):
+        """
+        Test that updates are sent at most at the maximum rate and that reports in between are skipped.
+        """
+        now = [0]
+        throttle = ActivityThrottle(maxRate=4, clock=lambda: now[0])
+        due = []
+        for step in range(20):
+            now[0] = step * 0.1
+            due.append(throttle.is_due())
+        self.assertEqual([step for step, isDue in enumerate(due) if isDue], [0, 3, 6, 9, 12, 15, 18])
+        self.assertTrue(all(ActivityThrottle(maxRate=None).is_due() for _ in range(3)))
+
+    def test_backtest_activity(self):
+        """
+        Test that backtests sample activity every percent and only signal updates when they're due.
+        """
+        for strategies in ([], [(MovingAverageStrategy, ['SMA', 'close', 5, 20], 'Moving Average')]):
+            for vectorized in (False, True):
+                backtester = Backtester(startingBalance=1000, data=get_test_data(5000, seed=4), lossStrategy=STOP,
+                                        lossPercentage=2, takeProfitType=None, takeProfitPercentage=0,
+                                        strategies=strategies)
+                thread = ThrottledThread(backtester, clock=lambda: 0)
+                backtester.start_backtest(thread=thread, vectorized=vectorized)
+
+                samples = len(backtester.pastActivity)
+                self.assertGreaterEqual(samples, 99)
+                self.assertEqual(thread.emitted, [0])  # The clock never moves, so only the first update is due.
+                self.assertEqual(backtester.pastActivity.get_column('percentage').tolist(),
+                                 sorted(backtester.pastActivity.get_column('percentage').tolist()))
+
+                activity = backtester.get_activity_dictionary(samples - 1)
+                self.assertLessEqual(int(activity['tradesMade']), len(backtester.trades))
+                self.assertEqual(datetime.strptime(activity['currentPeriod'], '%m/%d/%Y, %H:%M:%S'),
+                                 datetime(2021, 1, 1) + timedelta(seconds=activity['utc'] - 1609459200))
+
+
+if __name__ == '__main__':
+    unittest.main()
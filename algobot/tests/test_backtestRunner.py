@@ -0,0 +1,156 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from contextlib import closing
+from datetime import date
+
+from backtestRunner import load_config_file, load_dataset, main, parse_config, run_configs
+from candles import datetime_to_timestamp
+from enums import STOP, TRAILING
+from optimizer import run_settings
+from testData import get_test_data
+
+ALGOBOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestBacktestRunner(unittest.TestCase):
+    config = {
+        'name': 'sma',
+        'lossType': 'trailing',
+        'lossPercentage': 2,
+        'takeProfitType': 'stop',
+        'takeProfitPercentage': 3,
+        'movingAverage': [['SMA', 'close', 10, 40]],
+        'startDate': '2021-01-01',
+        'endDate': '2021-01-02',
+    }
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.data = get_test_data(2880, seed=3, precision=4).to_dicts()
+        self.csvPath = os.path.join(self.directory.name, 'data.csv')
+        with open(self.csvPath, 'w') as f:
+            f.write('Date_UTC, Open, High, Low, Close, Volume\n')
+            for period in self.data:
+                f.write(f"{period['date_utc'].strftime('%m/%d/%Y %H:%M')}, {period['open']}, {period['high']}, "
+                        f"{period['low']}, {period['close']}, {period['volume']}\n")
+
+        self.databasePath = os.path.join(self.directory.name, 'data.db')
+        with closing(sqlite3.connect(self.databasePath)) as connection:
+            with connection:
+                connection.execute('''CREATE TABLE data_1m(date_utc INTEGER PRIMARY KEY, open_price REAL,
+                high_price REAL, low_price REAL, close_price REAL, volume REAL, quote_asset_volume REAL,
+                number_of_trades REAL, taker_buy_base_asset REAL, taker_buy_quote_asset REAL)''')
+                connection.executemany('INSERT INTO data_1m VALUES (?, ?, ?, ?, ?, ?, 0, 0, 0, 0)', [
+                    (datetime_to_timestamp(period['date_utc']), period['open'], period['high'], period['low'],
+                     period['close'], period['volume']) for period in self.data])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_config(self, fileName: str, configs) -> str:
+        """
+        Writes configurations to a JSON file in the test directory and returns its path.
+        """
+        path = os.path.join(self.directory.name, fileName)
+        with open(path, 'w') as f:
+            json.dump(configs, f)
+        return path
+
+    def test_parse_config(self):
+        """
+        Test that configurations are turned into optimizer settings and backtester options.
+        """
+        settings, options = parse_config(self.config)
+        self.assertEqual((settings['lossType'], settings['takeProfitType']), (TRAILING, STOP))
+        self.assertEqual(settings['movingAverage'], [['SMA', 'close', 10, 40]])
+        self.assertEqual((options['startDate'], options['endDate']), (date(2021, 1, 1), date(2021, 1, 2)))
+        self.assertEqual(options['startingBalance'], 1000)
+
+        with self.assertRaises(ValueError):
+            parse_config({**self.config, 'lossStrategy': 'trailing'})
+        with self.assertRaises(ValueError):
+            parse_config({**self.config, 'lossType': 'limit'})
+
+    def test_datasets(self):
+        """
+        Test that CSV files and databases load the same candles in ascending order.
+        """
+        csvData = load_dataset(self.csvPath)
+        databaseData = load_dataset(self.databasePath)
+        self.assertEqual(len(csvData), len(self.data))
+        self.assertEqual(csvData.get_timestamps().tolist(), databaseData.get_timestamps().tolist())
+        self.assertEqual(csvData.get_column('close').tolist(), databaseData.get_column('close').tolist())
+        with self.assertRaises(ValueError):
+            load_dataset(self.databasePath, interval='1h')
+
+    def test_old_database_schema(self):
+        """
+        Test that databases with the old text schema fail with an error that says they have to be migrated.
+        """
+        oldDatabasePath = os.path.join(self.directory.name, 'old.db')
+        with closing(sqlite3.connect(oldDatabasePath)) as connection:
+            with connection:
+                connection.execute('''CREATE TABLE data_1m(date_utc TEXT PRIMARY KEY, open_price TEXT,
+                high_price TEXT, low_price TEXT, close_price TEXT, volume TEXT, quote_asset_volume TEXT,
+                number_of_trades TEXT, taker_buy_base_asset TEXT, taker_buy_quote_asset TEXT)''')
+                connection.execute("INSERT INTO data_1m VALUES ('2021-01-01 00:00:00', 1, 1, 1, 1, 1, 0, 0, 0, 0)")
+
+        with self.assertRaisesRegex(ValueError, 'old text schema'):
+            load_dataset(oldDatabasePath)
+
+    def test_run_configs(self):
+        """
+        Test that configurations run in parallel give the same results as backtests run directly, in order, and that
+        invalid configurations only fail themselves.
+        """
+        path = self.write_config('configs.json', [
+            {**self.config, 'data': 'data.csv'},
+            {**self.config, 'name': 'ema', 'movingAverage': [['EMA', 'high', 5, 20]], 'strategyInterval': '15m'},
+            {**self.config, 'name': 'invalid', 'lossType': 'limit'},
+        ])
+        configs = load_config_file(path)
+        self.assertEqual(configs[0]['data'], self.csvPath)
+
+        results = run_configs(configs, processes=2, data=self.databasePath)
+        self.assertEqual([result['name'] for result in results], ['sma', 'ema', 'invalid'])
+        self.assertIn('Invalid loss type', results[2]['error'])
+        for config, result in zip(configs[:2], results):
+            settings, options = parse_config(config)
+            expected = run_settings(load_dataset(self.csvPath), settings, **options)
+            self.assertEqual(result, {'name': config['name'], 'config': path, 'data': self.databasePath, **expected})
+        self.assertEqual(results[:2], run_configs(configs[:2], processes=1, data=self.databasePath))
+
+    def test_main(self):
+        """
+        Test that the command line entry point writes results and fails if any configuration does.
+        """
+        configPath = self.write_config('config.json', {**self.config, 'data': 'data.db'})
+        outputPath = os.path.join(self.directory.name, 'results.json')
+        self.assertEqual(main([configPath, '--processes', '1', '--output', outputPath]), 0)
+        with open(outputPath) as f:
+            results = json.load(f)
+        self.assertEqual(len(results), 1)
+        self.assertIsNone(results[0]['error'])
+        self.assertEqual(results[0]['settings']['lossType'], TRAILING)
+
+        missingPath = self.write_config('missing.json', {**self.config, 'data': 'missing.csv'})
+        self.assertEqual(main([configPath, missingPath, '--format', 'csv', '--output', outputPath]), 1)
+        with open(outputPath) as f:
+            self.assertEqual(len(f.readlines()), 3)
+
+    def test_no_gui_imports(self):
+        """
+        Test that the runner doesn't import PyQt5.
+        """
+        code = 'import sys, backtestRunner; sys.exit(any(module.startswith("PyQt5") for module in sys.modules))'
+        self.assertEqual(subprocess.run([sys.executable, '-c', code], cwd=ALGOBOT_DIR).returncode, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
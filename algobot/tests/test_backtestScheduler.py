@@ -0,0 +1,109 @@
+import unittest
+
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+from backtestScheduler import CANCELED, FAILED, FINISHED, PROGRESS, RUNNING, BacktestScheduler
+from enums import STOP, TRAILING
+from optimizer import run_settings
+from testData import get_test_data
+
+
+class TestBacktestScheduler(unittest.TestCase):
+    settingsList = [
+        {'lossType': TRAILING, 'lossPercentage': 2, 'movingAverage': [['SMA', 'close', 10, 40]]},
+        {'lossType': STOP, 'lossPercentage': 1, 'movingAverage': [['EMA', 'high', 5, 20]], 'strategyInterval': '5m'},
+        {'lossType': None, 'movingAverage': [['WMA', 'low', 3, 12]], 'marginEnabled': False},
+        {'movingAverage': [['XMA', 'close', 10, 40]]},
+    ]
+
+    def test_results(self):
+        """
+        Test that jobs stream progress and end with the same results as backtests run directly.
+        """
+        data = get_test_data(3000, seed=9)
+        events = []
+        with BacktestScheduler(processes=2, callback=lambda job, event, value: events.append((job.id, event))) \
+                as scheduler:
+            jobs = [scheduler.submit(settings, data, symbol='TEST') for settings in self.settingsList]
+            self.assertTrue(scheduler.wait(timeout=60))
+
+        self.assertEqual([job.status for job in jobs], [FINISHED, FINISHED, FINISHED, FAILED])
+        for job in jobs[:3]:
+            self.assertEqual(job.result, run_settings(data, job.settings, symbol='TEST'))
+            self.assertEqual(job.progress, 100)
+            jobEvents = [event for jobId, event in events if jobId == job.id]
+            self.assertEqual((jobEvents[0], jobEvents[-1]), (RUNNING, FINISHED))
+            self.assertIn(PROGRESS, jobEvents)
+
+        rows = scheduler.get_results()
+        self.assertEqual([row['rank'] for row in rows], [1, 2, 3, 4])
+        self.assertEqual(rows[0]['net'], max(job.result['net'] for job in jobs[:3]))
+        self.assertEqual(rows[-1]['id'], 3)
+        table = scheduler.get_results_table().splitlines()
+        self.assertEqual(len(table), 5)
+        self.assertIn('TEST', table[1])
+        with self.assertRaises(RuntimeError):
+            scheduler.submit(self.settingsList[0], data)
+
+    def test_cancel(self):
+        """
+        Test that queued and running jobs can be canceled on their own without stopping other jobs on either engine.
+        """
+        data = get_test_data(200000, seed=9)
+        for vectorized in (False, True):
+            with self.subTest(vectorized=vectorized):
+                def cancel_when_started(job, event, value):
+                    if job.id == 0 and event == RUNNING:
+                        scheduler.cancel(job.id)
+
+                scheduler = BacktestScheduler(processes=1, vectorized=vectorized, callback=cancel_when_started)
+                with scheduler:
+                    jobs = [scheduler.submit(self.settingsList[0], data) for _ in range(2)]
+                    jobs.append(scheduler.submit(self.settingsList[2], data[:3000]))
+                    self.assertTrue(scheduler.cancel(jobs[1].id))
+                    self.assertEqual(jobs[1].status, CANCELED)
+                    self.assertTrue(scheduler.wait(timeout=60))
+
+                self.assertEqual([job.status for job in jobs], [CANCELED, CANCELED, FINISHED])
+                self.assertIn('canceled', jobs[0].result['error'])
+                self.assertLess(jobs[0].progress, 100)
+                self.assertIsNone(jobs[1].result)
+                self.assertFalse(scheduler.cancel(jobs[2].id))
+
+    def test_callback_errors(self):
+        """
+        Test that a callback raising an exception fails the job it was called with and doesn't stop the scheduler.
+        """
+        data = get_test_data(3000, seed=9)
+
+        def fail_first_job(job, event, value):
+            if job.id == 0:
+                raise ValueError("Callback error.")
+
+        with BacktestScheduler(processes=1, callback=fail_first_job) as scheduler:
+            jobs = [scheduler.submit(self.settingsList[0], data) for _ in range(2)]
+            self.assertTrue(scheduler.wait(timeout=60))
+
+        self.assertEqual([job.status for job in jobs], [FAILED, FINISHED])
+        self.assertEqual(jobs[0].result['error'], 'Callback raised ValueError: Callback error.')
+
+    def test_broken_pool(self):
+        """
+        Test that jobs fail instead of hanging when they can't be submitted to the process pool.
+        """
+        data = get_test_data(3000, seed=9)
+        with mock.patch('backtestScheduler.ProcessPoolExecutor') as executor:
+            executor.return_value.submit.side_effect = BrokenProcessPool("A process terminated abruptly.")
+            with BacktestScheduler(processes=2) as scheduler:
+                jobs = [scheduler.submit(settings, data) for settings in self.settingsList]
+                self.assertTrue(scheduler.wait(timeout=10))
+                with self.assertRaises(RuntimeError):
+                    scheduler.submit(self.settingsList[0], data)
+
+        self.assertEqual({job.status for job in jobs}, {FAILED})
+        self.assertIn('BrokenProcessPool', jobs[-1].result['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
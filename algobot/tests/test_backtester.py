@@ -4,6 +4,7 @@ import pytest
 
 from traders.backtester import Backtester
 from enums import TRAILING, STOP
+from strategies.movingAverage import MovingAverageStrategy
 from datetime import datetime
 from helpers import convert_all_dates_to_datetime
 
@@ -324,6 +325,79 @@ class TestBacktester(unittest.TestCase):
     def test_trailing_take_profit(self):
         pass
 
+    def test_precomputed_indicators(self):
+        """
+        Test that precomputed indicators match moving averages calculated from data seen so far.
+        """
+        backtester = Backtester(
+            startingBalance=1000,
+            data=test_data[:500],
+            lossStrategy=STOP,
+            takeProfitType=None,
+            lossPercentage=5,
+            takeProfitPercentage=5,
+            strategies=[(MovingAverageStrategy, ['SMA', 'close', 5, 20, 'WMA', 'high/low', 3, 9, 'EMA', 'open', 4, 12],
+                         'Moving Average')],
+            strategyInterval='1m',
+        )
+        backtester.precompute_indicators()
+        self.assertEqual(len(backtester.indicatorSeries), 6)
+
+        for index in (19, 100, 499):
+            seenData = backtester.data[:index + 1]
+            for average, parameter, prices in backtester.strategies['movingAverage'].get_indicators():
+                backtester.indicatorIndex = index
+                precomputed = backtester.get_moving_average(seenData, average, prices, parameter)
+                backtester.indicatorIndex = None
+                backtester.ema_dict = {}
+                calculated = backtester.get_moving_average(seenData, average, prices, parameter)
+                self.assertAlmostEqual(precomputed, calculated)
+
+    def test_vectorized_backtest(self):
+        """
+        Test that vectorized backtests make the same trades as regular backtests and fall back when unsupported.
+        """
+        configurations = [
+            (['SMA', 'close', 10, 30, 'WMA', 'high/low', 5, 20], TRAILING, STOP, True, 0, '1m'),
+            (['EMA', 'close', 12, 26], STOP, TRAILING, True, 0, '1m'),
+            (['SMA', 'open/close', 3, 7], TRAILING, None, False, 2, '1m'),
+            (['WMA', 'low', 2, 50], None, STOP, True, 0, '1m'),
+            (['SMA', 'close', 3, 7], STOP, None, False, 0, '15m'),
+            (['EMA', 'high', 5, 12, 'WMA', 'low', 2, 4], TRAILING, STOP, True, 1, '30m'),
+        ]
+
+        for options, lossStrategy, takeProfitType, marginEnabled, stopLossCounter, strategyInterval in configurations:
+            results = []
+            for vectorized in (False, True):
+                backtester = Backtester(
+                    startingBalance=1000,
+                    data=test_data,
+                    lossStrategy=lossStrategy,
+                    takeProfitType=takeProfitType,
+                    lossPercentage=1,
+                    takeProfitPercentage=2,
+                    strategies=[(MovingAverageStrategy, options, 'Moving Average')],
+                    strategyInterval=strategyInterval,
+                    marginEnabled=marginEnabled,
+                )
+                backtester.set_stop_loss_counter(stopLossCounter)
+                self.assertTrue(backtester.supports_vectorized_backtest())
+                backtester.start_backtest(vectorized=vectorized)
+                results.append((backtester.trades, backtester.get_net(), backtester.commissionsPaid))
+            self.assertEqual(results[0], results[1])
+
+        backtester = Backtester(
+            startingBalance=1000,
+            data=test_data,
+            lossStrategy=STOP,
+            takeProfitType=None,
+            lossPercentage=1,
+            takeProfitPercentage=2,
+            strategies=[(MovingAverageStrategy, ['EMA', 'close', 2, 3], 'Moving Average')],
+            strategyInterval='15m',
+        )
+        self.assertFalse(backtester.supports_vectorized_backtest())
+
 
 if __name__ == '__main__':
     unittest.main()
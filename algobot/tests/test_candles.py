@@ -0,0 +1,193 @@
+import unittest
+
+from datetime import date, datetime, timedelta, timezone
+from candles import CandleBuffer, CandleStore, CandleRow, TimestampIndex, date_to_timestamp, datetime_to_timestamp, \
+    timestamp_to_datetime
+
+
+def get_test_dicts(count: int = 5, aware: bool = True) -> list:
+    """
+    Returns a list of dictionaries that mimic downloaded data.
+    :param count: Amount of periods to return.
+    :param aware: Boolean that determines whether dates have a UTC timezone or not.
+    :return: List of dictionaries.
+    """
+    data = []
+    for index in range(count):
+        data.append({
+            'date_utc': datetime(2021, 1, 1, index, tzinfo=timezone.utc if aware else None),
+            'open': 1.0 + index,
+            'high': 2.0 + index,
+            'low': 0.5 + index,
+            'close': 1.5 + index,
+            'volume': 10.0 * index,
+        })
+    return data
+
+
+class TestCandleStore(unittest.TestCase):
+    def test_timestamp_conversion(self):
+        """
+        Tests conversion of datetime objects to millisecond timestamps and back.
+        """
+        awareDate = datetime(2021, 3, 4, 5, 6, 7, tzinfo=timezone.utc)
+        naiveDate = datetime(2021, 3, 4, 5, 6, 7)
+        self.assertEqual(datetime_to_timestamp(awareDate), 1614834367000)
+        self.assertEqual(datetime_to_timestamp(naiveDate), 1614834367000)
+        self.assertEqual(timestamp_to_datetime(1614834367000), awareDate)
+        self.assertEqual(timestamp_to_datetime(1614834367000, timezoneAware=False), naiveDate)
+
+    def test_from_dicts(self):
+        """
+        Tests creation of a candle store from a list of dictionaries.
+        """
+        data = get_test_dicts(aware=False)
+        store = CandleStore.from_dicts(data)
+
+        self.assertEqual(len(store), len(data))
+        self.assertIsInstance(store[0], CandleRow)
+        self.assertEqual(store[2]['date_utc'], data[2]['date_utc'])
+        self.assertEqual(store[-1]['close'], data[-1]['close'])
+        self.assertEqual(store.get_column('high/low').tolist(), [(d['high'] + d['low']) / 2 for d in data])
+        self.assertTrue(all(value != value for value in store.get_column('number_of_trades')))  # NaN values.
+
+    def test_from_klines(self):
+        """
+        Tests creation of a candle store from Binance klines.
+        """
+        klines = [[1609459200000 + x * 60000, '1', '2', '0.5', '1.5', '10', '11', '12', '13', '14', '15'] for x in
+                  range(3)]
+        store = CandleStore.from_klines(klines)
+
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store[1]['date_utc'], datetime(2021, 1, 1, 0, 1, tzinfo=timezone.utc))
+        self.assertEqual(store[1]['high'], 2.0)
+        self.assertEqual(store.get_timestamps().tolist(), [kline[0] for kline in klines])
+
+    def test_list_operations(self):
+        """
+        Tests list operations of candle store.
+        """
+        data = get_test_dicts()
+        store = CandleStore.from_dicts(data)
+
+        sliced = store[1:3]
+        self.assertEqual(len(sliced), 2)
+        self.assertEqual(sliced[0]['open'], data[1]['open'])
+
+        sliced.append(data[0])
+        self.assertEqual(len(sliced), 3)
+        self.assertEqual(store[3]['open'], data[3]['open'])  # Appending to a slice must not modify original.
+        self.assertEqual(sliced.pop()['open'], data[0]['open'])
+
+        row = store[0]
+        store.reverse()
+        self.assertEqual(store[0]['open'], data[-1]['open'])
+        self.assertEqual(row['open'], data[0]['open'])  # Rows taken earlier are left untouched.
+
+        combined = [data[0]] + store
+        self.assertEqual(len(combined), len(data) + 1)
+        self.assertEqual(combined[0]['date_utc'], data[0]['date_utc'])
+        self.assertEqual([row['date_utc'] for row in store[::-1]], [d['date_utc'] for d in data])
+
+
+class TestCandleBuffer(unittest.TestCase):
+    def test_ring_buffer(self):
+        """
+        Tests adding newer and older periods to a bounded candle buffer and eviction of its oldest periods.
+        """
+        data = get_test_dicts(count=8)[::-1]  # Newest periods at the front.
+        evicted = []
+        buffer = CandleBuffer(maxLength=4, onEvict=evicted.append)
+
+        buffer.extend_newer(CandleStore.from_dicts(data[5:]))
+        self.assertEqual(len(buffer), 3)
+        for row in data[1:5][::-1]:
+            buffer.append(row)
+
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(buffer.extend_older(CandleStore.from_dicts(data[-1:])), 0)  # Full buffers drop older data.
+        self.assertEqual(buffer[0]['date_utc'], data[1]['date_utc'])
+        self.assertEqual(buffer[-1]['date_utc'], data[4]['date_utc'])
+        self.assertEqual([row['date_utc'] for row in buffer], [d['date_utc'] for d in data[1:5]])
+        self.assertEqual([row['date_utc'] for store in evicted for row in store], [d['date_utc'] for d in data[:4:-1]])
+
+        oldestRow = buffer[-1]
+        buffer.extend_newer(CandleStore.from_dicts(data[:1]))
+        self.assertEqual(oldestRow['date_utc'], data[4]['date_utc'])  # Rows don't change when their slot is reused.
+        self.assertEqual(buffer.get_column('open').tolist(), [d['open'] for d in data[:4]])
+        self.assertEqual(len(buffer[1:3]), 2)
+        self.assertEqual(len([data[0]] + buffer), 5)
+
+    def test_unbounded_buffer(self):
+        """
+        Tests growth and truncation of an unbounded candle buffer.
+        """
+        data = get_test_dicts(count=20)[::-1]
+        evicted = []
+        buffer = CandleBuffer(onEvict=evicted.append)
+        buffer.extend_older(CandleStore.from_dicts(data[12:]))
+        buffer.extend_newer(CandleStore.from_dicts(data[:12]))
+
+        self.assertEqual(len(buffer), 20)
+        self.assertEqual(buffer.get_timestamps().tolist(), CandleStore.from_dicts(data).get_timestamps().tolist())
+        buffer.truncate(10)
+        self.assertEqual(len(buffer), 10)
+        self.assertEqual(len(evicted[0]), 10)
+        self.assertEqual(evicted[0][0]['date_utc'], data[10]['date_utc'])
+
+
+class TestTimestampIndex(unittest.TestCase):
+    periods = [{'date_utc': datetime(2021, 1, 1, tzinfo=timezone.utc) + timedelta(hours=7 * index), 'open': 1,
+                'high': 1, 'low': 1, 'close': 1, 'volume': 1} for index in range(20)]
+
+    def get_reference_index(self, data, day: date, first: bool) -> int:
+        """
+        Returns index of first or last period of day by scanning data.
+        """
+        indexes = [index for index, period in enumerate(data) if period['date_utc'].date() == day]
+        if not indexes:
+            return -1
+        dates = [data[index]['date_utc'] for index in indexes]
+        return indexes[dates.index(min(dates) if first else max(dates))]
+
+    def test_find_date(self):
+        """
+        Tests that first and last periods of dates are found in ascending stores and descending stores and buffers.
+        """
+        store = CandleStore.from_dicts(self.periods)
+        buffer = CandleBuffer()
+        buffer.extend_newer(store[::-1])
+        for data in (store, store[::-1], buffer):
+            index = TimestampIndex(data)
+            for day in range(31, 40):
+                targetDate = date(2020, 12, 1) + timedelta(days=day)
+                for first in (True, False):
+                    self.assertEqual(index.find_date(targetDate, first),
+                                     self.get_reference_index(data, targetDate, first))
+
+            self.assertEqual(index.find_timestamp(store[3].get_timestamp()), 3 if data is store else 16)
+            self.assertEqual(index.find_timestamp(store[3].get_timestamp() + 1), -1)
+
+        self.assertEqual(TimestampIndex(store[:0]).find_date(date(2021, 1, 1)), -1)
+        self.assertEqual(TimestampIndex(store[:1]).find_date(datetime(2021, 1, 1, 5)), 0)
+
+    def test_get_slice(self):
+        """
+        Tests that slices hold periods from start timestamp up to end timestamp in order of data.
+        """
+        store = CandleStore.from_dicts(self.periods)
+        startTimestamp = date_to_timestamp(date(2021, 1, 3))
+        endTimestamp = date_to_timestamp(date(2021, 1, 5))
+        for data in (store, store[::-1]):
+            index = TimestampIndex(data)
+            expected = [period['date_utc'] for period in data
+                        if startTimestamp <= period.get_timestamp() < endTimestamp]
+            self.assertEqual([period['date_utc'] for period in data[index.get_slice(startTimestamp, endTimestamp)]],
+                             expected)
+            self.assertEqual(len(data[index.get_slice(startTimestamp)]), 13)
+            self.assertEqual(len(data[index.get_slice(endTimestamp=startTimestamp)]), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import threading
+import unittest
+
+from unittest import mock
+
+from binance.client import Client
+
+import clients
+
+
+class TestClients(unittest.TestCase):
+    def setUp(self):
+        self.ping = mock.patch.object(Client, 'ping')  # Clients ping Binance when they're created.
+        self.ping.start()
+
+    def tearDown(self):
+        clients.clear_clients()
+        self.ping.stop()
+
+    def test_clients_are_reused(self):
+        """
+        Tests that a thread gets the same client for the same credentials and tld and a new one otherwise.
+        """
+        client = clients.get_client('key', 'secret')
+        self.assertIsInstance(client, clients.PooledClient)
+        self.assertIs(clients.get_client('key', 'secret'), client)
+        self.assertIs(clients.get_client('key', 'secret', tld='com'), client)
+        self.assertIsNot(clients.get_client('key', 'secret', tld='us'), client)
+        self.assertIsNot(clients.get_client('otherKey', 'secret'), client)
+        self.assertIsNot(clients.get_client(), client)
+
+        clients.clear_clients()
+        self.assertIsNot(clients.get_client('key', 'secret'), client)
+
+    def test_clients_per_thread(self):
+        """
+        Tests that threads get their own clients, so responses stored on clients are never shared between threads.
+        """
+        client = clients.get_client()
+        threadClients = []
+
+        def get_clients():
+            threadClients.append((clients.get_client(), clients.get_client()))
+
+        threads = [threading.Thread(target=get_clients) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(first is second for first, second in threadClients))
+        self.assertEqual(len({id(client)} | {id(first) for first, _ in threadClients}), 4)
+
+    def test_adapter_is_mounted(self):
+        """
+        Tests that every client uses the shared pooled adapter for Binance requests.
+        """
+        for client in (clients.get_client(), clients.get_client('key', 'secret', tld='us')):
+            self.assertIs(client.session.get_adapter('https://api.binance.com/api/v3/klines'), clients.adapter)
+        self.assertTrue(clients.adapter._pool_block)
+        self.assertEqual(clients.adapter._pool_maxsize, clients.POOL_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,238 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from candles import CandleStore, datetime_to_timestamp
+from data import Data
+
+FIRST_DATE = datetime(2021, 1, 1, tzinfo=timezone.utc)
+FIRST_TIMESTAMP = datetime_to_timestamp(FIRST_DATE)
+INTERVAL_MILLISECONDS = 60000  # 1m interval.
+
+
+def get_kline(timestamp: int, price: float = None) -> list:
+    """
+    Returns kline in the format Binance returns with prices derived from its timestamp unless a price is provided.
+    """
+    if price is None:
+        price = 100 + timestamp // INTERVAL_MILLISECONDS % 100
+    return [timestamp, str(price), str(price + 1), str(price - 1), str(price + 0.5), '1.0',
+            timestamp + INTERVAL_MILLISECONDS - 1, '2.0', 3, '4.0', '5.0', '0']
+
+
+def get_klines(start: int, count: int, price: float = None) -> list:
+    """
+    Returns count klines of 1 minute in ascending order from the period start periods after the first timestamp.
+    """
+    return [get_kline(FIRST_TIMESTAMP + (start + index) * INTERVAL_MILLISECONDS, price) for index in range(count)]
+
+
+def get_row(kline: list) -> tuple:
+    """
+    Returns database row of kline provided.
+    """
+    return (kline[0], *[float(value) for value in kline[1:10]])
+
+
+class FakeKlineClient:
+    def __init__(self, lastTimestamp: int):
+        """
+        Local stand-in for Binance's kline endpoint with klines from the first timestamp up to lastTimestamp.
+        """
+        self.lastTimestamp = lastTimestamp
+        self.startTimes = []
+
+    def get_klines(self, symbol: str, interval: str, limit: int, startTime: int, endTime: int) -> list:
+        self.startTimes.append(startTime)
+        start = startTime + -(startTime - FIRST_TIMESTAMP) % INTERVAL_MILLISECONDS
+        end = min(endTime, self.lastTimestamp)
+        return [get_kline(timestamp) for timestamp in range(start, end + 1, INTERVAL_MILLISECONDS)][:limit]
+
+
+class TestDatabase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.databaseFile = os.path.join(self.directory.name, 'TEST.db')
+        self.dataObjects = []
+
+    def tearDown(self):
+        for dataObject in self.dataObjects:
+            dataObject.flush_evicted_data()
+            if dataObject.flushExecutor is not None:
+                dataObject.flushExecutor.shutdown()
+        self.directory.cleanup()
+
+    def get_data(self, **kwargs) -> Data:
+        """
+        Returns 1m Data object without network access that stores its periods in the temporary database.
+        """
+        with mock.patch('data.get_client'), mock.patch.object(Data, 'is_valid_symbol', return_value=True), \
+                mock.patch.object(Data, 'get_database_file', return_value=self.databaseFile):
+            dataObject = Data(interval='1m', symbol='TEST', loadData=False, **kwargs)
+        self.dataObjects.append(dataObject)
+        return dataObject
+
+    def get_table_rows(self, table: str = 'data_1m') -> list:
+        """
+        Returns every row of table provided in ascending order.
+        """
+        with closing(sqlite3.connect(self.databaseFile)) as connection:
+            return connection.execute(f'SELECT * FROM {table} ORDER BY date_utc').fetchall()
+
+    def test_migrate_table(self):
+        """
+        Tests that tables with the old text schema are migrated to epoch millisecond dates and real prices.
+        """
+        klines = get_klines(0, 50)
+        with closing(sqlite3.connect(self.databaseFile)) as connection:
+            connection.execute('''
+                CREATE TABLE data_1m(
+                date_utc TEXT PRIMARY KEY,
+                open_price TEXT NOT NULL,
+                high_price TEXT NOT NULL,
+                low_price TEXT NOT NULL,
+                close_price TEXT NOT NULL,
+                volume TEXT NOT NULL,
+                quote_asset_volume TEXT NOT NULL,
+                number_of_trades TEXT NOT NULL,
+                taker_buy_base_asset TEXT NOT NULL,
+                taker_buy_quote_asset TEXT NOT NULL
+                );''')
+            for kline in klines:
+                date = FIRST_DATE + timedelta(milliseconds=kline[0] - FIRST_TIMESTAMP)
+                connection.execute('INSERT INTO data_1m VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                   (date.strftime('%Y-%m-%d %H:%M:%S'), *[float(value) for value in kline[1:10]]))
+            connection.execute("INSERT INTO data_1m VALUES ('invalid', 1, 1, 1, 1, 1, 1, 1, 1, 1)")
+            connection.commit()
+
+        self.get_data()
+
+        self.assertEqual(self.get_table_rows(), [get_row(kline) for kline in klines])
+        with closing(sqlite3.connect(self.databaseFile)) as connection:
+            columns = connection.execute('PRAGMA table_info(data_1m)').fetchall()
+            tables = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        self.assertEqual([column[2] for column in columns], ['INTEGER'] + ['REAL'] * 9)
+        self.assertNotIn('data_1m_old', tables)
+
+    def test_dump_to_table(self):
+        """
+        Tests that dumping periods that already exist doesn't duplicate them or overwrite their stored values.
+        """
+        dataObject = self.get_data()
+        klines = get_klines(0, 30)
+        self.assertTrue(dataObject.dump_to_table(CandleStore.from_klines(klines)))
+
+        duplicates = get_klines(20, 20, price=1)  # 10 periods that already exist with different prices.
+        self.assertTrue(dataObject.dump_to_table(CandleStore.from_klines(duplicates)))
+        self.assertTrue(dataObject.dump_to_table(CandleStore.from_klines(klines[:5])))
+
+        self.assertEqual(self.get_table_rows(), [get_row(kline) for kline in klines + duplicates[10:]])
+
+    def test_lookback_window(self):
+        """
+        Tests that only the lookback window is loaded and that older periods are paged in once they're needed.
+        """
+        klines = get_klines(0, 3000)
+        self.get_data().dump_to_table(CandleStore.from_klines(klines))
+        self.assertFalse(self.get_data().olderDataAvailable)  # Unbounded data loads every period at once.
+
+        dataObject = self.get_data(lookbackPeriods=100)
+        self.assertTrue(dataObject.olderDataAvailable)
+        dataObject.get_data_from_database()
+        self.assertEqual(dataObject.data.get_timestamps().tolist(), [kline[0] for kline in klines[:-101:-1]])
+
+        dataObject.ensure_data_length(500)
+        self.assertEqual(dataObject.data.get_timestamps().tolist(), [kline[0] for kline in klines[:-501:-1]])
+        self.assertEqual(dataObject.data[-1].get_timestamp(), klines[2500][0])
+        self.assertTrue(dataObject.olderDataAvailable)
+
+        dataObject.ensure_data_length(2500)
+        self.assertEqual(len(dataObject.data), 2500)
+        self.assertEqual(dataObject.data.maxLength, 5000)  # Grown, so periods paged in aren't evicted right away.
+
+        dataObject.ensure_data_length(4000)
+        self.assertEqual(dataObject.data.get_timestamps().tolist(), [kline[0] for kline in klines[::-1]])
+        self.assertFalse(dataObject.olderDataAvailable)
+        self.assertEqual(dataObject.load_older_data(100), 0)
+
+    def test_evicted_data_is_dumped(self):
+        """
+        Tests that periods evicted from bounded run-time data are dumped to the database in the background.
+        """
+        committed = get_klines(0, 100)
+        self.get_data().dump_to_table(CandleStore.from_klines(committed))
+        dataObject = self.get_data(lookbackPeriods=50)
+        dataObject.get_data_from_database()
+
+        klines = get_klines(100, 2300)
+        for kline in klines[:1950]:
+            dataObject.insert_data([kline])
+        self.assertEqual(self.get_table_rows(), [get_row(kline) for kline in committed])  # Nothing evicted yet.
+        dataObject.insert_data(klines[1950:])
+        dataObject.flush_evicted_data()
+
+        self.assertEqual(len(dataObject.data), 2000)
+        self.assertEqual(dataObject.data[-1].get_timestamp(), klines[300][0])
+        self.assertEqual(self.get_table_rows(), [get_row(kline) for kline in committed + klines[:300]])
+
+    def test_backfill_is_not_dumped_again(self):
+        """
+        Tests that periods a download committed aren't dumped again when inserting them evicts them from run-time data.
+        """
+        self.get_data().dump_to_table(CandleStore.from_klines(get_klines(0, 100)))
+        dataObject = self.get_data(lookbackPeriods=50)
+        dataObject.get_data_from_database()
+
+        klines = get_klines(100, 5000)
+        for page in range(0, len(klines), 500):
+            dataObject.dump_page_to_table(klines[page:page + 500])
+        with mock.patch.object(dataObject, 'dump_to_table') as dump_to_table:
+            dataObject.insert_data(klines)
+            dataObject.flush_evicted_data()
+        dump_to_table.assert_not_called()
+        self.assertEqual(dataObject.data.get_timestamps().tolist(), [kline[0] for kline in klines[:-2001:-1]])
+        self.assertTrue(dataObject.olderDataAvailable)
+
+    def test_resume_download(self):
+        """
+        Tests that a canceled download keeps the pages it committed and that the next download resumes after them.
+        """
+        dataObject = self.get_data()
+        dataObject.binanceClient._get_earliest_valid_timestamp.return_value = FIRST_TIMESTAMP
+        klines = get_klines(0, 1000)
+        client = FakeKlineClient(klines[-1][0])
+        progress = mock.Mock()
+
+        def cancel_after_pages(*args):
+            if progress.emit.call_count == 3:
+                dataObject.downloadLoop = False
+
+        progress.emit.side_effect = cancel_after_pages
+        with mock.patch('data.PooledClient', return_value=client):
+            canceledData = dataObject.custom_get_new_data(limit=100, progress_callback=progress, maxWorkers=1,
+                                                          weightPerMinute=10 ** 9)
+        self.assertIsInstance(canceledData, CandleStore)
+        self.assertEqual(len(canceledData), 0)
+        self.assertEqual(progress.emit.call_args[0][0], -1)
+        self.assertEqual(dataObject.get_download_checkpoint(), klines[299][0])
+        self.assertEqual(self.get_table_rows(), [get_row(kline) for kline in klines[:300]])
+
+        resumedObject = self.get_data()
+        self.assertEqual(resumedObject.get_latest_timestamp(), klines[299][0] + 1)
+        client.startTimes.clear()
+        with mock.patch('data.PooledClient', return_value=client):
+            newData = resumedObject.custom_get_new_data(limit=1000, progress_callback=mock.Mock(),
+                                                        weightPerMinute=10 ** 9)
+        self.assertEqual(min(client.startTimes), klines[299][0] + 1)
+        self.assertIsNone(resumedObject.get_download_checkpoint())
+        self.assertEqual(self.get_table_rows(), [get_row(kline) for kline in klines])
+        self.assertEqual(newData.get_timestamps().tolist(), [kline[0] for kline in klines[:299:-1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import threading
+import time
+import unittest
+
+from downloader import KlineDownloader, TokenBucket, get_klines_request_weight
+
+INTERVAL_MILLISECONDS = 60000  # 1m interval.
+
+
+class FakeKlineServer:
+    def __init__(self, firstTimestamp: int, lastTimestamp: int, delay: float = 0.01):
+        """
+        Local stand-in for Binance's kline endpoint with the same paging semantics as Client.get_klines.
+        :param firstTimestamp: Open time of first kline available.
+        :param lastTimestamp: Open time of last kline available.
+        :param delay: Seconds every request takes.
+        """
+        self.firstTimestamp = firstTimestamp
+        self.lastTimestamp = lastTimestamp
+        self.delay = delay
+        self.requests = 0
+        self.active = 0
+        self.maxActive = 0
+        self.lock = threading.Lock()
+
+    def get_kline(self, timestamp: int) -> list:
+        price = str(timestamp // INTERVAL_MILLISECONDS % 100)
+        return [timestamp, price, price, price, price, '1.0', timestamp + INTERVAL_MILLISECONDS - 1, '1.0', 1,
+                '1.0', '1.0', '0']
+
+    def get_klines(self, symbol: str, interval: str, limit: int, startTime: int, endTime: int) -> list:
+        with self.lock:
+            self.requests += 1
+            self.active += 1
+            self.maxActive = max(self.maxActive, self.active)
+
+        time.sleep(self.delay)
+        start = max(startTime, self.firstTimestamp)
+        start += -(start - self.firstTimestamp) % INTERVAL_MILLISECONDS
+        end = min(endTime, self.lastTimestamp)
+        klines = [self.get_kline(timestamp) for timestamp in range(start, end + 1, INTERVAL_MILLISECONDS)][:limit]
+
+        with self.lock:
+            self.active -= 1
+        return klines
+
+
+class FakeKlineClient:
+    def __init__(self, server: FakeKlineServer):
+        """
+        Client that keeps the last response on itself like python-binance's Client does, so it returns the wrong page
+        if another thread requests a page while it waits for its own.
+        :param server: Server to request klines from.
+        """
+        self.server = server
+        self.response = None
+
+    def get_klines(self, **kwargs) -> list:
+        self.response = self.server.get_klines(**kwargs)
+        time.sleep(self.server.delay)
+        return self.response
+
+
+class TestDownloader(unittest.TestCase):
+    def test_download(self):
+        """
+        Tests that concurrently downloaded pages are stitched together in order.
+        """
+        firstTimestamp = 1609459200000
+        lastTimestamp = firstTimestamp + 2345 * INTERVAL_MILLISECONDS
+        server = FakeKlineServer(firstTimestamp, lastTimestamp)
+        downloader = KlineDownloader(lambda: server, symbol='BTCUSDT', interval='1m', limit=100, maxWorkers=4,
+                                     weightPerMinute=10 ** 6)
+        progress = []
+        pages = []
+
+        klines = downloader.download(firstTimestamp, lastTimestamp, pageCallback=pages.append,
+                                     progressCallback=lambda page, total: progress.append((page, total)))
+
+        self.assertEqual([kline[0] for kline in klines],
+                         list(range(firstTimestamp, lastTimestamp + 1, INTERVAL_MILLISECONDS)))
+        self.assertEqual(server.requests, 24)
+        self.assertGreater(server.maxActive, 1)
+        self.assertEqual(progress[-1], (24, 24))
+        self.assertEqual([kline for page in pages for kline in page], klines)
+
+    def test_worker_clients(self):
+        """
+        Tests that every worker gets its own client, so pages are the ones requested even with stateful clients.
+        """
+        firstTimestamp = 1609459200000
+        server = FakeKlineServer(firstTimestamp, firstTimestamp + 1999 * INTERVAL_MILLISECONDS)
+        clients = []
+
+        def create_client():
+            clients.append(FakeKlineClient(server))
+            return clients[-1]
+
+        downloader = KlineDownloader(create_client, symbol='BTCUSDT', interval='1m', limit=50, maxWorkers=4,
+                                     weightPerMinute=10 ** 6)
+        pages = []
+        downloader.download(firstTimestamp, server.lastTimestamp, pageCallback=pages.append)
+
+        expectedPages = [server.get_klines('BTCUSDT', '1m', 50, start, end) for start, end in
+                         downloader.get_chunks(firstTimestamp, server.lastTimestamp)]
+        self.assertEqual(len(pages), 40)
+        self.assertEqual(pages, expectedPages)
+        self.assertEqual(len(clients), 4)
+
+    def test_cancel(self):
+        """
+        Tests that a stopped download stops requesting pages.
+        """
+        firstTimestamp = 1609459200000
+        server = FakeKlineServer(firstTimestamp, firstTimestamp + 10000 * INTERVAL_MILLISECONDS)
+        downloader = KlineDownloader(lambda: server, symbol='BTCUSDT', interval='1m', limit=100, maxWorkers=2,
+                                     weightPerMinute=10 ** 6)
+        pages = []
+        downloader.download(firstTimestamp, server.lastTimestamp, isRunning=lambda: len(pages) < 3,
+                            progressCallback=lambda page, total: pages.append(page))
+
+        self.assertEqual(pages, [1, 2, 3])
+        self.assertLess(server.requests, 10)
+
+    def test_token_bucket(self):
+        """
+        Tests that token bucket waits for tokens to refill once it's empty.
+        """
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds: float):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(capacity=10, refillRate=2, clock=lambda: now[0], sleep=sleep)
+        for _ in range(5):
+            bucket.acquire(get_klines_request_weight(100))
+
+        self.assertEqual(sleeps, [])
+        bucket.acquire(4)
+        self.assertEqual(sleeps, [2.0])
+        self.assertRaises(ValueError, TokenBucket, capacity=0, refillRate=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,238 @@
+import unittest
+
+from typing import Tuple
+from algorithms import get_ema, get_rsi, get_sma, get_wma
+from candles import CandleStore
+from helpers import get_data_from_parameter, get_ups_and_downs
+from indicators import get_ema_series, get_rsi_series, get_sma_series, get_values, get_wma_series
+from testData import get_test_data
+
+PARAMETERS = ('close', 'high', 'high/low', 'open/close')
+
+
+def get_reference_wma(values: list, prices: int) -> float:
+    """
+    Weighted moving average of values in ascending order calculated one value at a time.
+    """
+    return sum(weight * value for weight, value in enumerate(values[-prices:], start=1)) / (prices * (prices + 1) / 2)
+
+
+def get_reference_ema(values: list, prices: int, smaPrices: int) -> float:
+    """
+    Exponential moving average of values in ascending order calculated one value at a time.
+    """
+    multiplier = 2 / (prices + 1)
+    ema = sum(values[:smaPrices]) / smaPrices
+    for value in values[smaPrices:]:
+        ema = value * multiplier + ema * (1 - multiplier)
+    return ema
+
+
+def get_reference_rsi(data: list, prices: int, parameter: str) -> float:
+    """
+    Relative strength index of data in ascending order calculated like the backtester does.
+    """
+    ups, downs = get_ups_and_downs([{parameter: get_data_from_parameter(period, parameter)} for period in data],
+                                   parameter)
+    averageUp = averageDown = 0
+    for up, down in zip(ups[1:], downs[1:]):
+        averageUp = up / prices + averageUp * (1 - 1 / prices)
+        averageDown = down / prices + averageDown * (1 - 1 / prices)
+    return 100 if averageDown == 0 else 100 - 100 / (1 + averageUp / averageDown)
+
+
+def get_baseline_wma(data: list, prices: int, parameter: str, desc: bool = True) -> float:
+    """
+    Scalar weighted moving average from algorithms before indicators were vectorized.
+    """
+    if desc:
+        total = get_data_from_parameter(data=data[0], parameter=parameter) * prices
+        data = data[1:]
+
+        index = 0
+        for x in range(prices - 1, 0, -1):
+            total += x * get_data_from_parameter(data=data[index], parameter=parameter)
+            index += 1
+    else:
+        total = get_data_from_parameter(data=data[-1], parameter=parameter) * prices
+        data = data[:-1]
+
+        for index, data in enumerate(data, start=1):
+            total += index * get_data_from_parameter(data, parameter)
+
+    divisor = prices * (prices + 1) / 2
+    wma = total / divisor
+    return wma
+
+
+def get_baseline_sma(data: list, prices: int, parameter: str) -> float:
+    """
+    Scalar simple moving average from algorithms before indicators were vectorized.
+    """
+    return sum([get_data_from_parameter(data=period, parameter=parameter) for period in data]) / prices
+
+
+def get_baseline_ema(data: list, prices: int, parameter: str, sma_prices: int, memo: dict = None,
+                     desc: bool = True) -> Tuple[float, dict]:
+    """
+    Scalar exponential moving average from algorithms before indicators were vectorized.
+    """
+    multiplier = 2 / (prices + 1)
+
+    if memo and prices in memo and parameter in memo[prices]:
+        index = 0 if desc else -1
+        current_price = get_data_from_parameter(data[index], parameter)
+        if memo[prices][parameter][-1][1] == data[index]['date_utc']:
+            previous_ema = memo[prices][parameter][-2][0]
+            ema = current_price * multiplier + previous_ema * (1 - multiplier)
+            memo[prices][parameter][-1][0] = ema
+        elif memo[prices][parameter][-1][1] < data[index]['date_utc']:
+            previous_ema = memo[prices][parameter][-1][0]
+            ema = current_price * multiplier + previous_ema * (1 - multiplier)
+            memo[prices][parameter].append([ema, data[index]['date_utc']])
+        else:
+            raise ValueError("Something went wrong in the calculation of the EMA.")
+    else:
+        if desc:
+            sma_data = data[len(data) - sma_prices:]
+        else:
+            sma_data = data[:sma_prices]
+
+        ema = get_baseline_sma(sma_data, sma_prices, parameter)
+        if desc:
+            values = [[ema, data[len(data) - sma_prices]['date_utc']]]
+            data = data[:len(data) - sma_prices][::-1]  # Reverse the data to start from back to front.
+        else:
+            values = [[ema, data[sma_prices - 1]['date_utc']]]
+            data = data[sma_prices:]
+
+        for period in data:
+            current_price = get_data_from_parameter(period, parameter=parameter)
+            ema = current_price * multiplier + ema * (1 - multiplier)
+            values.append([ema, period['date_utc']])
+
+        if not memo:
+            memo = {prices: {parameter: values}}
+        elif memo and prices not in memo:
+            memo[prices] = {parameter: values}
+        else:
+            memo[prices][parameter] = values
+
+    return ema, memo
+
+
+class TestIndicators(unittest.TestCase):
+    periods = get_test_data(300, seed=3).to_dicts()
+
+    def test_get_values(self):
+        """
+        Tests that values are the same for lists of dictionaries and candle stores in both orders.
+        """
+        store = CandleStore.from_dicts(self.periods)
+        for parameter in PARAMETERS:
+            expected = [get_data_from_parameter(period, parameter) for period in self.periods]
+            self.assertEqual(get_values(self.periods, parameter).tolist(), expected)
+            self.assertEqual(get_values(store, parameter).tolist(), expected)
+            self.assertEqual(get_values(self.periods[::-1], parameter, desc=True).tolist(), expected)
+
+    def test_moving_average_series(self):
+        """
+        Tests that SMA, WMA, and EMA series match values calculated one period at a time.
+        """
+        for parameter in PARAMETERS:
+            values = get_values(self.periods, parameter)
+            valueList = values.tolist()
+            for prices in (1, 2, 15, 50):
+                smas = get_sma_series(values, prices)
+                wmas = get_wma_series(values, prices)
+                emas = get_ema_series(values, prices, 5)
+                self.assertTrue(all(value != value for value in smas[:prices - 1]))  # Not enough data is NaN.
+                for index in range(prices - 1, len(values), 7):
+                    window = valueList[index - prices + 1:index + 1]
+                    self.assertAlmostEqual(smas[index], sum(window) / prices)
+                    self.assertAlmostEqual(wmas[index], get_reference_wma(window, prices))
+                for index in range(4, len(values), 7):
+                    self.assertAlmostEqual(emas[index], get_reference_ema(valueList[:index + 1], prices, 5))
+
+    def test_rsi_series(self):
+        """
+        Tests that RSI series matches RSI calculated one period at a time.
+        """
+        for parameter in PARAMETERS:
+            rsis = get_rsi_series(get_values(self.periods, parameter), 14)
+            for index in range(1, len(self.periods), 11):
+                self.assertAlmostEqual(rsis[index], get_reference_rsi(self.periods[:index + 1], 14, parameter))
+
+        flatPeriods = [{'close': 5}] * 3 + [{'close': 6}]
+        self.assertEqual(get_rsi_series(get_values(flatPeriods, 'close'), 14)[-1], 100)
+
+    def test_scalar_wrappers(self):
+        """
+        Tests that scalar functions in algorithms match values calculated one period at a time in either order.
+        """
+        periods = self.periods[:60]
+        descendingPeriods = periods[::-1]
+        for parameter in PARAMETERS:
+            values = [get_data_from_parameter(period, parameter) for period in periods]
+            self.assertAlmostEqual(get_sma(periods[-20:], 20, parameter), sum(values[-20:]) / 20)
+            self.assertAlmostEqual(get_wma(periods[-20:], 20, parameter, desc=False),
+                                   get_reference_wma(values, 20))
+            self.assertAlmostEqual(get_wma(descendingPeriods, 20, parameter), get_reference_wma(values, 20))
+            self.assertAlmostEqual(get_rsi(periods, 14, parameter, desc=False),
+                                   get_reference_rsi(periods, 14, parameter))
+            self.assertAlmostEqual(get_rsi(descendingPeriods, 14, parameter),
+                                   get_reference_rsi(periods, 14, parameter))
+
+            ema, memo = get_ema(descendingPeriods, 10, parameter, 5)
+            self.assertAlmostEqual(ema, get_reference_ema(values, 10, 5))
+            self.assertEqual(len(memo[10][parameter]), len(periods) - 4)
+            self.assertEqual(memo[10][parameter][0][1], periods[4]['date_utc'])
+
+            ema, memo = get_ema(periods, 10, parameter, 5, desc=False)
+            self.assertAlmostEqual(ema, get_reference_ema(values, 10, 5))
+            ema, memo = get_ema(self.periods[:61], 10, parameter, 5, memo, desc=False)
+            self.assertAlmostEqual(ema, get_reference_ema(values + [get_data_from_parameter(self.periods[60],
+                                                                                             parameter)], 10, 5))
+
+    def test_baseline_parity(self):
+        """
+        Tests that scalar functions in algorithms match the scalar functions they replaced, including data with fewer
+        or more periods than prices.
+        """
+        for parameter in PARAMETERS:
+            for length in (1, 5, 19, 20, 21, 60):
+                periods = self.periods[:length]
+                descendingPeriods = periods[::-1]
+                for prices in (1, 5, 20):
+                    self.assertAlmostEqual(get_sma(periods, prices, parameter),
+                                           get_baseline_sma(periods, prices, parameter))
+                    self.assertAlmostEqual(get_sma(CandleStore.from_dicts(periods), prices, parameter),
+                                           get_baseline_sma(periods, prices, parameter))
+                    self.assertAlmostEqual(get_wma(periods, prices, parameter, desc=False),
+                                           get_baseline_wma(periods, prices, parameter, desc=False))
+                    if length >= prices:
+                        self.assertAlmostEqual(get_wma(descendingPeriods, prices, parameter),
+                                               get_baseline_wma(descendingPeriods, prices, parameter))
+                    else:
+                        with self.assertRaises(IndexError):
+                            get_baseline_wma(descendingPeriods, prices, parameter)
+                        with self.assertRaises(ValueError):  # Short data fails loudly instead of becoming NaN.
+                            get_wma(descendingPeriods, prices, parameter)
+
+                if length >= 5:
+                    ema, memo = get_ema(descendingPeriods, 10, parameter, 5)
+                    baselineEma, baselineMemo = get_baseline_ema(descendingPeriods, 10, parameter, 5)
+                    self.assertAlmostEqual(ema, baselineEma)
+                    self.assertEqual(len(memo[10][parameter]), len(baselineMemo[10][parameter]))
+
+                    ema, memo = get_ema(self.periods[:length + 1], 10, parameter, 5, memo, desc=False)
+                    baselineEma, _ = get_baseline_ema(self.periods[:length + 1], 10, parameter, 5, baselineMemo,
+                                                      desc=False)
+                    self.assertAlmostEqual(ema, baselineEma)
+
+            with self.assertRaises(ValueError):
+                get_wma([], 5, parameter, desc=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
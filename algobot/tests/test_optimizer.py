@@ -0,0 +1,74 @@
+import unittest
+
+from enums import STOP, TRAILING
+from optimizer import Optimizer, format_results_table, get_all_settings, get_backtester, get_choices
+from testData import get_test_data
+
+
+class TestOptimizer(unittest.TestCase):
+    combos = {
+        'lossType': (TRAILING, STOP),
+        'lossPercentage': [1, 2, 0.5],
+        'movingAverage': [[('SMA', 'WMA'), 'close', [5, 10, 5], 30]],
+    }
+
+    def test_get_choices(self):
+        """
+        Test that tuples, ranges, and single values are expanded into choices.
+        """
+        self.assertEqual(get_choices((1, 5)), [1, 5])
+        self.assertEqual(get_choices([5, 20, 5]), [5, 10, 15, 20])
+        self.assertEqual(get_choices([0.5, 1.5, 0.5]), [0.5, 1.0, 1.5])
+        self.assertEqual(get_choices('SMA'), ['SMA'])
+        with self.assertRaises(ValueError):
+            get_choices([1, 5, 0])
+
+    def test_get_all_settings(self):
+        """
+        Test that every permutation of settings and moving average options is generated.
+        """
+        settingsList = get_all_settings(self.combos)
+        self.assertEqual(len(settingsList), 2 * 3 * 2 * 2)
+        self.assertIn({'lossType': STOP, 'lossPercentage': 1.5, 'takeProfitType': None, 'takeProfitPercentage': 0,
+                       'stopLossCounter': 0, 'marginEnabled': True, 'strategyInterval': None,
+                       'movingAverage': [['WMA', 'close', 10, 30]]}, settingsList)
+
+    def test_run(self):
+        """
+        Test that parallel and in-process runs return the same ranked results as separate backtests.
+        """
+        data = get_test_data(600, seed=13)
+        settingsList = get_all_settings(self.combos)
+        results = Optimizer(data, processes=1).run(settingsList)
+        parallelResults = Optimizer(data, processes=2).run(settingsList)
+
+        self.assertEqual([result['rank'] for result in results], list(range(1, len(settingsList) + 1)))
+        self.assertEqual(sorted((result['net'] for result in results), reverse=True),
+                         [result['net'] for result in results])
+        self.assertEqual(results, parallelResults)
+
+        for result in results[:3]:
+            backtester = get_backtester(data, result['settings'])
+            backtester.start_backtest()
+            self.assertEqual(result['net'], backtester.get_net())
+            self.assertEqual(result['trades'], len(backtester.trades))
+            self.assertEqual(result['commissions'], backtester.commissionsPaid)
+            self.assertIsNone(result['error'])
+
+        self.assertEqual(len(format_results_table(results, limit=5).splitlines()), 6)
+
+    def test_errors_and_cancel(self):
+        """
+        Test that invalid settings are reported in results and that optimization can be canceled.
+        """
+        data = get_test_data(600, seed=13)
+        results = Optimizer(data, processes=1).run([{'lossType': 5, 'lossPercentage': 1,
+                                                     'movingAverage': [['SMA', 'close', 5, 30]]}])
+        self.assertIsNotNone(results[0]['error'])
+
+        with self.assertRaises(RuntimeError):
+            Optimizer(data, processes=1).run(get_all_settings(self.combos), isRunning=lambda: False)
+
+
+if __name__ == '__main__':
+    unittest.main()
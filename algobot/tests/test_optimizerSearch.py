@@ -0,0 +1,99 @@
+import random
+import unittest
+
+from datetime import date
+from enums import STOP, TRAILING
+from optimizer import DEFAULT_SETTINGS, Optimizer, get_all_settings, get_backtester, rank_results
+from optimizerSearch import SearchSpace, SuccessiveHalvingSearch, get_search_strategy, get_shorter_range
+from testData import get_test_data
+
+
+class ObjectiveOptimizer:
+    """
+    Stand-in for an optimizer whose nets come from a function of settings, so searches can be checked quickly.
+    """
+    processes = 1
+    dataset = None
+
+    def run(self, settingsList, callback=None, isRunning=None):
+        results = []
+        for settings in settingsList:
+            settings = {**DEFAULT_SETTINGS, **settings}
+            _, _, shortPrices, longPrices = settings['movingAverage'][0]
+            net = 1000 - (shortPrices - 35) ** 2 - (longPrices - 120) ** 2 / 4 - (settings['lossPercentage'] - 3) ** 2
+            results.append({'settings': settings, 'net': net, 'error': None})
+            if callback is not None:
+                callback(results[-1], len(results), len(settingsList))
+        return rank_results(results)
+
+
+class TestOptimizerSearch(unittest.TestCase):
+    combos = {
+        'lossType': (TRAILING, STOP),
+        'lossPercentage': [1, 5, 1],
+        'movingAverage': [[('SMA', 'WMA'), 'close', [5, 60, 5], [20, 200, 20]]],
+    }
+
+    def test_search_space(self):
+        """
+        Test that points of search space are the permutations get_all_settings returns.
+        """
+        space = SearchSpace(self.combos)
+        settingsList = get_all_settings(self.combos)
+        self.assertEqual(len(space), len(settingsList))
+        self.assertEqual(sorted(repr({**DEFAULT_SETTINGS, **space.get_settings(space.get_point(number))})
+                                for number in range(len(space))), sorted(repr(settings) for settings in settingsList))
+
+        points = space.sample(50, random.Random(1))
+        self.assertEqual(len(set(points)), 50)
+        self.assertEqual(points, space.sample(50, random.Random(1)))
+        self.assertEqual(len(space.sample(len(space) + 5, random.Random(1))), len(space))
+
+    def test_shorter_range(self):
+        """
+        Test that shorter ranges end at the last period of a date and cover at least the fraction asked for.
+        """
+        data = get_test_data(960, seed=11, minutes=15)
+        endDate, fraction = get_shorter_range(data, None, None, 1 / 3)
+        self.assertEqual(endDate, date(2021, 1, 4))
+        self.assertAlmostEqual(fraction, 383 / 959)
+        self.assertEqual(get_shorter_range(data, date(2021, 1, 2), date(2021, 1, 10), 0.5)[0], date(2021, 1, 6))
+        self.assertEqual(get_shorter_range(data, date(2021, 1, 9), None, 0.5), (None, 1))
+
+    def test_budget(self):
+        """
+        Test that searches stay within budget, don't repeat settings, and return full-length results.
+        """
+        data = get_test_data(960, seed=11, minutes=15)
+        optimizer = Optimizer(data, processes=1)
+        for name in ('random', 'halving', 'tpe'):
+            search = get_search_strategy(name, self.combos, budget=12, seed=3)
+            results = search.run(optimizer)
+            self.assertLessEqual(search.cost, 12.5)
+            self.assertEqual(search.completed, search.get_evaluation_count())
+            self.assertEqual(len({repr(result['settings']) for result in results}), len(results))
+            self.assertEqual([result['rank'] for result in results], list(range(1, len(results) + 1)))
+
+            backtester = get_backtester(data, results[0]['settings'])
+            backtester.start_backtest()
+            self.assertEqual(results[0]['net'], backtester.get_net())
+
+        self.assertEqual(SuccessiveHalvingSearch(self.combos, budget=12).get_rung_counts(), [36, 12, 4])
+        with self.assertRaises(ValueError):
+            get_search_strategy('exhaustive', self.combos)
+
+    def test_tpe(self):
+        """
+        Test that TPE search finds better settings than random search with the same budget.
+        """
+        netsFound = {'random': [], 'tpe': []}
+        for seed in range(5):
+            for name in netsFound:
+                results = get_search_strategy(name, self.combos, budget=60, seed=seed).run(ObjectiveOptimizer())
+                netsFound[name].append(results[0]['net'])
+        self.assertGreater(sum(netsFound['tpe']), sum(netsFound['random']))
+        self.assertGreaterEqual(min(netsFound['tpe']), 990)
+
+
+if __name__ == '__main__':
+    unittest.main()
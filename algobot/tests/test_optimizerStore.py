@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+
+from contextlib import closing
+from enums import STOP, TRAILING
+from optimizer import Optimizer, get_all_settings
+from optimizerStore import OptimizerResultStore, get_dataset_fingerprint, get_settings_key, get_sweep_key
+from testData import get_test_data
+
+
+class TestOptimizerResultStore(unittest.TestCase):
+    combos = {
+        'lossType': (TRAILING, STOP),
+        'lossPercentage': [1, 2, 1],
+        'movingAverage': [[('SMA', 'WMA'), 'close', [5, 10, 5], 30]],
+    }
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = OptimizerResultStore(os.path.join(self.directory.name, 'optimizer.db'))
+        self.data = get_test_data(400, seed=7)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_keys(self):
+        """
+        Test that keys don't depend on how equal values are written but do depend on data, options, and settings.
+        """
+        fingerprint = get_dataset_fingerprint(self.data)
+        self.assertEqual(fingerprint, get_dataset_fingerprint(self.data.copy()))
+        self.assertNotEqual(fingerprint, get_dataset_fingerprint(self.data[1:]))
+
+        sweepKey = get_sweep_key(fingerprint, {'startingBalance': 1000, 'symbol': 'BTCUSDT', 'vectorized': True})
+        self.assertEqual(sweepKey, get_sweep_key(fingerprint, {'startingBalance': 1000.0}))
+        self.assertNotEqual(sweepKey, get_sweep_key(fingerprint, {'startingBalance': 500}))
+
+        settings = {'lossType': STOP, 'lossPercentage': 1, 'movingAverage': [('SMA', 'close', 5, 30)]}
+        self.assertEqual(get_settings_key(sweepKey, settings),
+                         get_settings_key(sweepKey, {'movingAverage': [['SMA', 'close', 5.0, 30]],
+                                                     'lossPercentage': 1.0, 'lossType': STOP}))
+        self.assertNotEqual(get_settings_key(sweepKey, settings),
+                            get_settings_key(sweepKey, {**settings, 'lossType': TRAILING}))
+
+    def test_resume(self):
+        """
+        Test that stored results are reused and that widened or interrupted sweeps only run new settings.
+        """
+        settingsList = get_all_settings(self.combos)
+        calls = []
+        optimizer = Optimizer(self.data, processes=1, store=self.store)
+        with self.assertRaises(RuntimeError):
+            optimizer.run(settingsList, callback=lambda *args: calls.append(args), isRunning=lambda: len(calls) < 3)
+        self.assertEqual(self.store.get_count(optimizer.get_sweep_key()), 3)
+
+        results = optimizer.run(settingsList)
+        self.assertEqual(self.store.get_count(), len(settingsList))
+        self.assertEqual(results, Optimizer(self.data, processes=1).run(settingsList))
+
+        widenedList = get_all_settings({**self.combos, 'lossPercentage': [0.5, 2, 0.5]})
+        ran = []
+        optimizer.run(widenedList, callback=lambda result, completed, total: ran.append(completed))
+        self.assertEqual(ran, list(range(1, len(widenedList) + 1)))
+        self.assertEqual(self.store.get_count(), len(widenedList))
+
+        topResults = optimizer.get_top_results(3)
+        self.assertEqual([result['rank'] for result in topResults], [1, 2, 3])
+        self.assertEqual(topResults[0]['net'], max(result['net'] for result in results))
+        self.assertEqual(topResults[0]['settings']['movingAverage'][0][1], 'close')
+
+        self.assertEqual(Optimizer(self.data[1:], store=self.store).get_top_results(), [])
+        self.store.delete_sweep(optimizer.get_sweep_key())
+        self.assertEqual(self.store.get_count(), 0)
+
+    def test_failed_results(self):
+        """
+        Test that failed results aren't stored and that failed results stored before are run again.
+        """
+        settingsList = get_all_settings({'movingAverage': [[('SMA', 'XMA'), 'close', 5, 30]]})
+        optimizer = Optimizer(self.data, processes=1, store=self.store)
+        results = optimizer.run(settingsList)
+        self.assertEqual(len([result for result in results if result['error'] is not None]), 1)
+        self.assertEqual(self.store.get_count(), 1)
+
+        sweepKey = optimizer.get_sweep_key()
+        failedKey = get_settings_key(sweepKey, next(result['settings'] for result in results if result['error']))
+        with closing(self.store.get_connection()) as connection:
+            with connection:  # Failed results stored before they were left out.
+                connection.execute('INSERT INTO optimizer_results (key, sweep, settings, error, created_at) '
+                                   "VALUES (?, ?, '{}', 'Error', 0)", (failedKey, sweepKey))
+        ran = []
+        self.assertEqual(optimizer.run(settingsList, callback=lambda result, *args: ran.append(result)), results)
+        self.assertEqual([result['settings']['movingAverage'][0][0] for result in ran], ['SMA', 'XMA'])
+        self.assertEqual(self.store.get_count(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
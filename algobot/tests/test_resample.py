@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+from resample import get_boundaries, get_candle_counts, get_resampled_sma_series, get_resampled_wma_series, resample
+from testData import get_test_data
+
+
+class TestResample(unittest.TestCase):
+    def test_boundaries(self):
+        """
+        Test that candles are completed every interval and that gaps in data shift later boundaries.
+        """
+        timestamps = get_test_data(200, seed=5).get_timestamps()
+        self.assertEqual(get_boundaries(timestamps, 10, 60, 15 * 60000).tolist(), [25, 40, 55])
+
+        timestamps = get_test_data(200, seed=5, skipped=(30, 31)).get_timestamps()
+        self.assertEqual(get_boundaries(timestamps, 10, 60, 15 * 60000).tolist(), [25, 38, 53])
+        self.assertEqual(get_candle_counts(np.array([2, 4]), 6).tolist(), [0, 0, 0, 1, 1, 2])
+
+    def test_resample(self):
+        """
+        Test that resampled candles aggregate the periods before their boundaries.
+        """
+        data = get_test_data(200, seed=5)
+        boundaries = get_boundaries(data.get_timestamps(), 0, len(data) - 1, 5 * 60000)
+        candles = resample(data, boundaries, 5)
+        self.assertEqual(len(candles), len(boundaries))
+        for candle, boundary in zip(candles.to_dicts(), boundaries):
+            periods = data[boundary - 5:boundary].to_dicts()
+            self.assertEqual(candle['date_utc'], periods[0]['date_utc'])
+            self.assertEqual(candle['open'], periods[0]['open'])
+            self.assertEqual(candle['high'], max(period['high'] for period in periods))
+            self.assertEqual(candle['low'], min(period['low'] for period in periods))
+            self.assertEqual(candle['close'], periods[-1]['close'])
+            self.assertAlmostEqual(candle['volume'], sum(period['volume'] for period in periods))
+
+    def test_moving_averages(self):
+        """
+        Test that moving averages are calculated over completed candles followed by the current period.
+        """
+        data = get_test_data(200, seed=5)
+        boundaries = get_boundaries(data.get_timestamps(), 0, len(data) - 1, 5 * 60000)
+        candleValues = resample(data, boundaries, 5).get_column('close')
+        counts = get_candle_counts(boundaries, len(data))
+        values = data.get_column('close')
+        smas = get_resampled_sma_series(candleValues, counts, values, 4)
+        wmas = get_resampled_wma_series(candleValues, counts, values, 4)
+
+        for index in range(len(data)):
+            window = list(candleValues[:counts[index]][-3:]) + [values[index]]
+            if counts[index] < 3:
+                self.assertTrue(np.isnan(smas[index]) and np.isnan(wmas[index]))
+                continue
+            self.assertAlmostEqual(smas[index], sum(window) / 4)
+            self.assertAlmostEqual(wmas[index], sum(value * weight for weight, value in enumerate(window, 1)) / 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
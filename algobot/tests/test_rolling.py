@@ -0,0 +1,125 @@
+import unittest
+
+import numpy as np
+
+from algorithms import get_sma, get_wma
+from candles import CandleBuffer, CandleStore
+from helpers import get_ups_and_downs
+from indicators import get_rsi_series
+from rolling import RollingExtremum, RollingRSI, RollingWindow
+from testData import get_test_data
+
+
+class TestRollingWindow(unittest.TestCase):
+    def test_moving_averages(self):
+        """
+        Tests that rolling moving averages match moving averages calculated from scratch as periods close.
+        """
+        periods = get_test_data(300, seed=7)
+        data = CandleBuffer(maxLength=100)
+        data.extend_newer(periods[:50][::-1])
+        windows = {(prices, shift, parameter): RollingWindow(prices - 1 if shift == 0 else prices, parameter,
+                                                             0 if shift == 0 else shift - 1)
+                   for prices in (1, 5, 20) for shift in (0, 1, 3) for parameter in ('close', 'high/low')}
+
+        minute = 50
+        for step in range(150):
+            closedPeriods = 3 if step % 7 == 0 else 1  # Close a few periods at once every now and then.
+            data.extend_newer(periods[minute:minute + closedPeriods][::-1])
+            minute += closedPeriods
+            current = periods[minute]
+
+            total = [current] + data[:30]
+            for (prices, shift, parameter), window in windows.items():
+                window.sync(data)
+                currentValue = (current['high'] + current['low']) / 2 if parameter == 'high/low' else \
+                    current[parameter]
+                currentValue = currentValue if shift == 0 else None
+                expected = total[shift:prices + shift]
+                self.assertAlmostEqual(window.get_sma(prices, currentValue), get_sma(expected, prices, parameter))
+                self.assertAlmostEqual(window.get_wma(prices, currentValue), get_wma(expected, prices, parameter))
+
+
+class TestRollingExtremum(unittest.TestCase):
+    def test_extremes(self):
+        """
+        Tests that rolling lowest and highest values match values found by scanning periods as periods close.
+        """
+        periods = get_test_data(300, seed=5)
+        data = CandleBuffer(maxLength=100)
+        data.extend_newer(periods[:10][::-1])
+        extremes = {(prices, findMax): RollingExtremum(prices - 1, 'high' if findMax else 'low', findMax)
+                    for prices in (1, 2, 14, 40) for findMax in (True, False)}
+
+        minute = 10
+        for step in range(150):
+            closedPeriods = 4 if step % 9 == 0 else 1
+            data.extend_newer(periods[minute:minute + closedPeriods][::-1])
+            minute += closedPeriods
+            current = periods[minute]
+
+            total = [current] + data[:40]
+            for (prices, findMax), extremum in extremes.items():
+                extremum.sync(data)
+                if findMax:
+                    expected = max(period['high'] for period in total[:prices])
+                    self.assertEqual(extremum.get_value(current['high']), expected)
+                else:
+                    expected = min(period['low'] for period in total[:prices])
+                    self.assertEqual(extremum.get_value(current['low']), expected)
+
+
+def get_rsi_from_scratch(data: list, prices: int, parameter: str) -> float:
+    """
+    Calculates RSI the way Data.get_rsi did before RSI states were kept.
+    :param data: Periods with newest periods first.
+    :param prices: RSI period.
+    :param parameter: Parameter to calculate RSI with.
+    :return: RSI.
+    """
+    ups, downs = get_ups_and_downs(data[:500 + prices][::-1], parameter)
+    averageUp, averageDown = ups[0], downs[0]
+    for index in range(1, len(ups)):
+        averageUp = ups[index] / prices + averageUp * (1 - 1 / prices)
+        averageDown = downs[index] / prices + averageDown * (1 - 1 / prices)
+    return 100 - 100 / (1 + averageUp / averageDown)
+
+
+class TestRollingRSI(unittest.TestCase):
+    def test_rsi(self):
+        """
+        Tests that RSI carried forward matches RSI calculated from scratch, and that what-if values for the current
+        period don't change the committed state.
+        """
+        periods = get_test_data(700, seed=11)[::-1]
+        data = CandleBuffer()
+        data.extend_newer(periods[50:])
+        rsi = RollingRSI(14, 'close', historyLength=5)
+
+        for index in range(49, 0, -1):
+            data.append(periods[index])
+            rsi.sync(data)
+            current = periods[index - 1]
+            self.assertAlmostEqual(rsi.get_rsi(currentValue=current['close']),
+                                   get_rsi_from_scratch([current] + data[:600], 14, 'close'))
+            self.assertAlmostEqual(rsi.get_rsi(periodsAgo=0), get_rsi_from_scratch(data[:600], 14, 'close'))
+
+        self.assertAlmostEqual(rsi.get_rsi(periodsAgo=3), get_rsi_from_scratch(data[3:603], 14, 'close'))
+        self.assertIsNone(rsi.get_rsi(periodsAgo=5))
+
+    def test_rsi_without_downs(self):
+        """
+        Tests that RSI of steadily rising prices is 100 like RSI series of backtests instead of dividing by zero.
+        """
+        timestamps = get_test_data(600).get_timestamps()
+        data = CandleBuffer()
+        data.extend_newer(CandleStore.from_arrays(timestamps, {'close': np.arange(100.0, 700.0)})[::-1])
+        rsi = RollingRSI(14, 'close')
+        rsi.sync(data)
+        self.assertEqual(rsi.get_rsi(periodsAgo=0), 100)
+        self.assertEqual(rsi.get_rsi(currentValue=700), 100)
+        self.assertEqual(get_rsi_series(data.get_column('close')[::-1], 14)[-1], 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
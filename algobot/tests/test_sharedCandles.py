@@ -0,0 +1,82 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from candles import CandleStore
+from sharedCandles import SharedCandleDataset
+
+
+def get_test_dicts(count: int = 50) -> list:
+    """
+    Returns a list of period dictionaries in ascending order.
+    :param count: Amount of periods to return.
+    :return: List of dictionaries.
+    """
+    startDate = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    return [{'date_utc': startDate + timedelta(minutes=x), 'open': 1 + x, 'high': 2 + x, 'low': 0.5 + x,
+             'close': 1.5 + x, 'volume': 10 + x} for x in range(count)]
+
+
+def get_close_total(dataset: SharedCandleDataset) -> float:
+    """
+    Returns total of close prices of a dataset. Used to test datasets in other processes.
+    """
+    return float(dataset.get_store().get_column('close').sum())
+
+
+class TestSharedCandleDataset(unittest.TestCase):
+    def test_from_store(self):
+        """
+        Tests that datasets hold the same periods as the store they're created from and return read-only stores.
+        """
+        store = CandleStore.from_dicts(get_test_dicts())
+        with SharedCandleDataset.from_store(store) as dataset:
+            sharedStore = dataset.get_store()
+            self.assertEqual(len(dataset), 50)
+            self.assertEqual(sharedStore.get_timestamps().tolist(), store.get_timestamps().tolist())
+            for field in ('date_utc', 'open', 'high', 'low', 'close', 'volume'):
+                self.assertEqual(sharedStore[10][field], store[10][field])
+            self.assertTrue(sharedStore.is_read_only())
+            self.assertIs(CandleStore.from_dicts(sharedStore), sharedStore)  # Read-only stores aren't copied.
+
+            with self.assertRaises(ValueError):
+                sharedStore.get_column('close')[0] = 5
+
+            copiedStore = sharedStore[:5]
+            copiedStore.append(get_test_dicts(6)[-1])
+            self.assertEqual(len(copiedStore), 6)
+            self.assertEqual(sharedStore[5]['close'], 6.5)
+
+    def test_attach_by_name(self):
+        """
+        Tests that pickled datasets attach to the same block in other processes.
+        """
+        with SharedCandleDataset.from_dicts(get_test_dicts()) as dataset:
+            self.assertLess(len(pickle.dumps(dataset)), 1000)
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                totals = list(executor.map(get_close_total, [dataset, dataset]))
+            self.assertEqual(totals, [get_close_total(dataset)] * 2)
+
+    def test_from_csv(self):
+        """
+        Tests that datasets are created from CSV files in ascending order.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data.csv')
+            with open(path, 'w') as f:
+                f.write('Date_UTC, Open, High, Low, Close, Volume\n')
+                for period in get_test_dicts(5)[::-1]:
+                    f.write(f"{period['date_utc'].strftime('%m/%d/%Y %H:%M')}, {period['open']}, {period['high']}, "
+                            f"{period['low']}, {period['close']}, {period['volume']}\n")
+
+            with SharedCandleDataset.from_csv(path) as dataset:
+                store = dataset.get_store()
+                self.assertEqual(store.get_column('open').tolist(), [1, 2, 3, 4, 5])
+                self.assertLess(store[0]['date_utc'], store[-1]['date_utc'])
+
+
+if __name__ == '__main__':
+    unittest.main()
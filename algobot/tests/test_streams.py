@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+from data import Data
+from streams import KlineFeed, KlineReplayServer, kline_message_to_kline, kline_to_kline_message
+
+
+def get_test_klines(count: int = 3) -> list:
+    """
+    Returns a list of klines that mimic klines from Binance.
+    :param count: Amount of klines to return.
+    :return: List of klines in ascending order.
+    """
+    return [[1609459200000 + x * 60000, str(1 + x), str(2 + x), '0.5', str(1.5 + x), '10', 1609459259999 + x * 60000,
+             '11', 12, '13', '14', '0'] for x in range(count)]
+
+
+class TestStreams(unittest.TestCase):
+    def test_kline_message_conversion(self):
+        """
+        Tests conversion between REST klines and websocket kline messages.
+        """
+        kline = get_test_klines(1)[0]
+        message = kline_to_kline_message(kline, 'BTCUSDT', '1m', closed=True)
+        self.assertTrue(message['k']['x'])
+        self.assertEqual(kline_message_to_kline(message), kline)
+
+    def test_feed(self):
+        """
+        Tests that the feed keeps closed periods in order and the latest update of the open period.
+        """
+        feed = KlineFeed()
+        klines = get_test_klines()
+        feed.process_message(kline_to_kline_message(klines[0], 'BTCUSDT', '1m', closed=True))
+        feed.process_message(kline_to_kline_message(klines[1], 'BTCUSDT', '1m', closed=True))
+        feed.process_message(kline_to_kline_message(klines[2], 'BTCUSDT', '1m', closed=False))
+        feed.process_message({'e': 'error', 'm': 'Test error.'})
+
+        self.assertEqual(feed.wait_for_update(0, timeout=0), 4)
+        self.assertEqual(feed.pop_updates(), (klines[:2], klines[2]))
+        self.assertEqual(feed.pop_updates(), ([], klines[2]))
+        self.assertEqual(feed.error, 'Test error.')
+
+    def test_replay_server(self):
+        """
+        Tests that replay server pushes every kline to feed and wakes up waiting threads.
+        """
+        feed = KlineFeed()
+        klines = get_test_klines(5)
+        server = KlineReplayServer(feed, klines, updatesPerPeriod=2, delay=0)
+        server.start()
+        self.assertGreater(feed.wait_for_update(0, timeout=5), 0)
+        server.thread.join(timeout=5)
+
+        closedKlines, currentKline = feed.pop_updates()
+        self.assertEqual(closedKlines, klines)
+        self.assertIsNone(currentKline)
+        self.assertEqual(feed.version, 15)
+        server.stop()
+
+
+class TestDataStream(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        databaseFile = os.path.join(self.directory.name, 'TEST.db')
+        with mock.patch('data.get_client'), mock.patch.object(Data, 'is_valid_symbol', return_value=True), \
+                mock.patch.object(Data, 'get_database_file', return_value=databaseFile):
+            self.data = Data(interval='1m', symbol='TEST', loadData=False)
+        self.klines = get_test_klines(10)
+        self.data.insert_data(self.klines[:3])
+
+    def tearDown(self):
+        self.data.stop_stream()
+        self.directory.cleanup()
+
+    def test_stream_updates_data(self):
+        """
+        Tests that Data inserts closed periods and takes current values from a replayed stream without REST calls.
+        """
+        self.data.start_stream(lambda feed: KlineReplayServer(feed, self.klines[3:6], updatesPerPeriod=2, delay=0))
+        self.assertTrue(self.data.wait_for_update(timeout=5))
+        self.data.stream.thread.join(timeout=5)
+        self.data.feed.process_message(kline_to_kline_message(self.klines[6], 'TEST', '1m', closed=False))
+
+        self.assertEqual(self.data.get_current_data(), self.data.get_kline_dictionary(self.klines[6]))
+        self.assertEqual(self.data.data.get_timestamps().tolist(), [kline[0] for kline in self.klines[5::-1]])
+        self.data.binanceClient.get_klines.assert_not_called()
+
+    def test_missed_periods(self):
+        """
+        Tests that stream updates are rejected when periods were missed, so the REST API fills the gap instead.
+        """
+        self.data.start_stream(lambda feed: KlineReplayServer(feed, self.klines[4:6], updatesPerPeriod=2, delay=0))
+        self.data.stream.thread.join(timeout=5)
+        self.data.feed.process_message(kline_to_kline_message(self.klines[6], 'TEST', '1m', closed=False))
+
+        self.assertFalse(self.data.apply_stream_updates())
+        self.assertEqual(len(self.data.data), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
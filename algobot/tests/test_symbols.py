@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from symbols import SymbolRegistry
+
+
+class FakeExchangeClient:
+    def __init__(self, symbols: list, haltedSymbols: list = ()):
+        self.symbols = symbols
+        self.haltedSymbols = haltedSymbols
+        self.calls = 0
+
+    def get_exchange_info(self) -> dict:
+        self.calls += 1
+        return {'symbols': [{'symbol': symbol, 'status': 'TRADING'} for symbol in self.symbols] +
+                           [{'symbol': symbol, 'status': 'BREAK'} for symbol in self.haltedSymbols]}
+
+
+class TestSymbolRegistry(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cachePath = os.path.join(self.directory.name, 'symbols.json')
+        self.client = FakeExchangeClient(['BTCUSDT', 'YFIUSDT'], haltedSymbols=['OLDUSDT'])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_validation_is_cached(self):
+        """
+        Tests that symbols are downloaded once and then served from memory and disk.
+        """
+        registry = SymbolRegistry(cachePath=self.cachePath, clientFactory=lambda: self.client)
+        self.assertTrue(registry.is_valid_symbol('BTCUSDT'))
+        self.assertTrue(registry.is_valid_symbol('YFIUSDT'))
+        self.assertEqual(self.client.calls, 1)
+
+        otherRegistry = SymbolRegistry(cachePath=self.cachePath, clientFactory=lambda: self.client)
+        self.assertEqual(otherRegistry.get_symbols(), {'BTCUSDT', 'YFIUSDT'})
+        self.assertEqual(self.client.calls, 1)
+
+    def test_invalid_symbol_refreshes_once(self):
+        """
+        Tests that unknown symbols trigger a single refresh of cached symbols.
+        """
+        registry = SymbolRegistry(cachePath=self.cachePath, clientFactory=lambda: self.client)
+        registry.get_symbols()
+        self.client.symbols.append('NEWUSDT')
+
+        cachedRegistry = SymbolRegistry(cachePath=self.cachePath, clientFactory=lambda: self.client)
+        self.assertTrue(cachedRegistry.is_valid_symbol('NEWUSDT'))
+        self.assertFalse(cachedRegistry.is_valid_symbol('BAD'))
+        self.assertEqual(self.client.calls, 2)
+
+    def test_symbols_not_trading(self):
+        """
+        Tests that halted or delisted symbols aren't valid.
+        """
+        registry = SymbolRegistry(cachePath=self.cachePath, clientFactory=lambda: self.client)
+        self.assertEqual(registry.get_symbols(), {'BTCUSDT', 'YFIUSDT'})
+        self.assertFalse(registry.is_valid_symbol('OLDUSDT'))
+
+    def test_expired_cache(self):
+        """
+        Tests that cache files past their time to live are ignored.
+        """
+        with open(self.cachePath, 'w') as f:
+            json.dump({'updated': time.time() - 100, 'symbols': ['OLDUSDT']}, f)
+
+        registry = SymbolRegistry(cachePath=self.cachePath, ttl=10, clientFactory=lambda: self.client)
+        self.assertEqual(registry.get_symbols(), {'BTCUSDT', 'YFIUSDT'})
+        self.assertEqual(self.client.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
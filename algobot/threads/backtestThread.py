@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import Dict, Any
+from activity import DEFAULT_MAX_RATE, ActivityThrottle
 from traders.backtester import Backtester
 from enums import BACKTEST, TRAILING
 from PyQt5.QtCore import QObject, pyqtSignal, QRunnable, pyqtSlot
@@ -11,7 +12,7 @@ class BacktestSignals(QObject):
     """
     finished = pyqtSignal()
     message = pyqtSignal(str)
-    activity = pyqtSignal(dict)
+    activity = pyqtSignal(int)  # Index of newest sample in backtester's past activity.
     started = pyqtSignal(dict)
     error = pyqtSignal(int, str)
     restore = pyqtSignal()
@@ -19,12 +20,13 @@ class BacktestSignals(QObject):
 
 
 class BacktestThread(QRunnable):
-    def __init__(self, gui, logger):
+    def __init__(self, gui, logger, maxActivityRate: float = DEFAULT_MAX_RATE):
         super(BacktestThread, self).__init__()
         self.signals = BacktestSignals()
         self.gui = gui
         self.logger = logger
         self.running = True
+        self.activityThrottle = ActivityThrottle(maxActivityRate)  # At most maxActivityRate updates a second.
 
     def get_configuration_details_to_setup_backtest(self) -> Dict[str, Any]:
         """
@@ -77,37 +79,18 @@ class BacktestThread(QRunnable):
 
         return d
 
-    def get_activity_dictionary(self, period: Dict[str, datetime], index: int, length: int) -> dict:
+    def add_activity(self, period: Dict[str, datetime], index: int, length: int, force: bool = False):
         """
-        Returns activity dictionary based on current backtest period values.
+        Adds a sample of backtest values to past activity and signals GUI with its index if an update is due. Samples
+        added in between updates are shown with the next one.
         :param period: Current period used to update graphs and GUI with.
         :param index: Current index from period data. Used to calculate percentage of backtest conducted.
         :param length: Current length of backtest periods. Used with index to calculate percentage of backtest done.
-        :return: Dictionary containing period activity.
+        :param force: Boolean whether to signal GUI even if an update isn't due.
         """
-        backtester = self.gui.backtester
-        net = backtester.get_net()
-        profit = net - backtester.startingBalance
-        if profit < 0:
-            profitPercentage = round(100 - net / backtester.startingBalance * 100, 2)
-        else:
-            profitPercentage = round(net / backtester.startingBalance * 100 - 100, 2)
-
-        activity = {
-            'net': round(net, backtester.precision),
-            'netString': f'${round(net, backtester.precision)}',
-            'balance': f'${round(backtester.balance, backtester.precision)}',
-            'commissionsPaid': f'${round(backtester.commissionsPaid, backtester.precision)}',
-            'tradesMade': str(len(backtester.trades)),
-            'profit': f'${abs(round(profit, backtester.precision))}',
-            'profitPercentage': f'{profitPercentage}%',
-            'currentPeriod': period['date_utc'].strftime("%m/%d/%Y, %H:%M:%S"),
-            'utc': period['date_utc'].timestamp(),
-            'percentage': int(index / length * 100)
-        }
-
-        backtester.pastActivity.append(activity)
-        return activity
+        sampleIndex = self.gui.backtester.add_activity(period, index, length)
+        if self.activityThrottle.is_due() or force:
+            self.signals.activity.emit(sampleIndex)
 
     def setup_bot(self):
         """
@@ -143,9 +126,7 @@ class BacktestThread(QRunnable):
         """
         backtester = self.gui.backtester
         backtester.start_backtest(thread=self)
-        self.signals.activity.emit(self.get_activity_dictionary(period=backtester.data[backtester.endDateIndex],
-                                                                index=1,
-                                                                length=1))
+        self.add_activity(period=backtester.data[backtester.endDateIndex], index=1, length=1, force=True)
 
     @pyqtSlot()
     def run(self):
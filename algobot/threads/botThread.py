@@ -2,7 +2,7 @@ import traceback
 import helpers
 import time
 
-from data import Data
+from data import Data, LIVE_LOOKBACK_PERIODS
 from datetime import datetime, timedelta
 from enums import LIVE, SIMULATION, BEARISH, BULLISH
 from traders.realtrader import RealTrader
@@ -59,6 +59,8 @@ class BotThread(QRunnable):
         self.telegramChatID = gui.configuration.telegramChatID.text()
         self.caller = caller
         self.trader = None
+        self.streamData = True  # Stream klines instead of polling the REST API. Falls back to polling on failure.
+        self.streamTimeout = 5  # Maximum seconds trading loop waits for streamed data before running anyway.
 
         self.failed = False  # All these variables pertain to bot failures.
         self.failCount = 0
@@ -83,11 +85,13 @@ class BotThread(QRunnable):
             self.signals.activity.emit(caller, f'Retrieving {symbol} data for {intervalString.lower()} intervals...')
 
             if caller == LIVE:
-                gui.lowerIntervalData = Data(interval=lowerInterval, symbol=symbol, updateData=False)
+                gui.lowerIntervalData = Data(interval=lowerInterval, symbol=symbol, updateData=False,
+                                             lookbackPeriods=LIVE_LOOKBACK_PERIODS)
                 gui.lowerIntervalData.custom_get_new_data(progress_callback=self.signals.progress, removeFirst=True,
                                                           caller=LIVE)
             elif caller == SIMULATION:
-                gui.simulationLowerIntervalData = Data(interval=lowerInterval, symbol=symbol, updateData=False)
+                gui.simulationLowerIntervalData = Data(interval=lowerInterval, symbol=symbol, updateData=False,
+                                                       lookbackPeriods=LIVE_LOOKBACK_PERIODS)
                 gui.simulationLowerIntervalData.custom_get_new_data(progress_callback=self.signals.progress,
                                                                     removeFirst=True, caller=SIMULATION)
             else:
@@ -224,6 +228,7 @@ class BotThread(QRunnable):
         """
         self.create_trader(caller)
         self.set_parameters(caller)
+        self.start_stream(caller)
 
         if caller == LIVE:
             if self.gui.configuration.enableTelegramTrading.isChecked():
@@ -236,12 +241,31 @@ class BotThread(QRunnable):
         else:
             raise RuntimeError("Invalid type of caller specified.")
 
+    def start_stream(self, caller):
+        """
+        Starts streaming klines for caller's trader if streaming is enabled. If the stream can't be started, the bot
+        keeps on polling the REST API.
+        :param caller: Caller whose trader's data will be streamed.
+        """
+        if not self.streamData:
+            return
+
+        trader = self.gui.get_trader(caller)
+        try:
+            trader.dataView.start_stream()
+            self.signals.activity.emit(caller, "Streaming market data.")
+        except Exception as e:
+            self.logger.warning(f'Failed to start stream: {e}')
+            self.signals.activity.emit(caller, "Failed to start market data stream. Polling market data instead.")
+
     def update_data(self, caller):
         """
         Updates data if updated data exists for caller object.
         :param caller: Object type that will be updated.
         """
         trader = self.gui.get_trader(caller)
+        if trader.dataView.feed is not None:
+            trader.dataView.apply_stream_updates()  # Closed periods pushed by the stream don't need a REST call.
         if not trader.dataView.data_is_updated():
             trader.dataView.update_data()
 
@@ -391,6 +415,8 @@ class BotThread(QRunnable):
             runningLoop = self.gui.runningLive if caller == LIVE else self.gui.simulationRunningLive
             self.failCount = 0  # Reset fail count as bot fixed itself.
             trader.completedLoop = True  # Set completedLoop to True. Or else, there'll be an infinite loop in the GUI.
+            if runningLoop and trader.dataView.feed is not None:
+                trader.dataView.wait_for_update(timeout=self.streamTimeout)  # Sleep until the stream pushes data.
 
     def try_setting_up_bot(self) -> bool:
         """
@@ -481,6 +507,7 @@ class BotThread(QRunnable):
             self.run_loop(trader)
 
         if trader:
+            trader.dataView.stop_stream()
             trader.completedLoop = True  # If false, this will cause an infinite loop.
             if trader == self.gui.simulationTrader:
                 trader.get_simulation_result()
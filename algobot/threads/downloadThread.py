@@ -10,7 +10,7 @@ class DownloadSignals(QObject):
     """
     started = pyqtSignal()
     csv_finished = pyqtSignal(str)
-    finished = pyqtSignal(list)
+    finished = pyqtSignal(object)
     error = pyqtSignal(str)
     restore = pyqtSignal()
     progress = pyqtSignal(int, str, int)
@@ -2,22 +2,33 @@ import os
 import sys
 import time
 
-from typing import Dict, Union
+from typing import Any, Dict, List, Union
 from itertools import product
+
+import numpy as np
+
 from dateutil import parser
-from datetime import datetime, timedelta
+from datetime import datetime
 from helpers import get_ups_and_downs, get_label_string, set_up_strategies, get_interval_minutes, \
     convert_small_interval, convert_all_dates_to_datetime
 from enums import BEARISH, BULLISH, LONG, SHORT, TRAILING, STOP
 from strategies.strategy import Strategy
+from strategies.movingAverage import MovingAverageStrategy
 from algorithms import get_sma, get_wma, get_ema
+from activity import ActivityLog
+from candles import CandleStore, TimestampIndex, datetime_to_timestamp
+from indicators import get_ema_series, get_sma_series, get_wma_series
+from resample import get_boundaries, get_candle_counts, get_resampled_sma_series, get_resampled_wma_series, resample
 from typeHints import DATA_TYPE, DICT_TYPE
 
+EMA_SMA_PRICES = 5  # Initial SMA periods used to calculate first exponential moving average.
+TRENDS = {BULLISH: BULLISH, BEARISH: BEARISH, 0: None}  # Trend codes of vectorized backtests to trends.
+
 
 class Backtester:
     def __init__(self,
                  startingBalance: float,
-                 data: list,
+                 data: Union[list, CandleStore],
                  lossStrategy: int,
                  lossPercentage: float,
                  takeProfitType: int,
@@ -45,7 +56,7 @@ class Backtester:
         self.outputTrades: bool = outputTrades  # Boolean that'll determine whether trades are outputted to file or not.
 
         convert_all_dates_to_datetime(data)
-        self.data = data
+        self.data = CandleStore.from_dicts(data)
         self.check_data()
         self.interval = self.get_interval()
         self.intervalMinutes = get_interval_minutes(self.interval)
@@ -72,9 +83,9 @@ class Backtester:
         self.previousPosition = None
         self.currentPeriod = None
         self.minPeriod = 0
-        self.pastActivity = []  # We'll add previous data here when hovering through graph in GUI.
+        self.pastActivity = ActivityLog()  # Samples of backtest values shown when hovering through graph in GUI.
 
-        if len(strategyInterval.split()) == 1:
+        if strategyInterval is not None and len(strategyInterval.split()) == 1:
             strategyInterval = convert_small_interval(strategyInterval)
 
         self.strategyInterval = self.interval if strategyInterval is None else strategyInterval
@@ -86,6 +97,11 @@ class Backtester:
 
         self.ema_dict = {}
         self.rsi_dictionary = {}
+        self.indicatorSeries = {}  # Indicator series of data keyed by moving average, parameter, and prices.
+        self.indicatorIndex = None  # Index of data precomputed indicators are read at. If none, they're calculated.
+        self.strategyBoundaries = None  # Indices of periods that complete candles of the strategy interval.
+        self.strategyCandles = None  # Candles of the strategy interval completed during a backtest.
+        self.strategyCandleCounts = None  # Amount of candles of the strategy interval completed before every period.
         self.strategies: Dict[str, Strategy] = {}
         set_up_strategies(self, strategies)
 
@@ -123,23 +139,13 @@ class Backtester:
 
     def find_date_index(self, targetDate: datetime.date, starting: bool = True) -> int:
         """
-        Finds starting or ending index of date from targetDate if it exists in data loaded.
+        Finds starting or ending index of date from targetDate if it exists in data loaded. Data is sorted by
+        check_data, so the index is found with a binary search.
         :param starting: Boolean if true will find the first found index. If used for end index, set to False.
         :param targetDate: Object to compare date-time with.
         :return: Index from self.data if found, else -1.
         """
-        if type(targetDate) == datetime:
-            targetDate = targetDate.date()
-
-        if starting:
-            iterator = list(enumerate(self.data))
-        else:
-            iterator = reversed(list(enumerate(self.data)))
-
-        for index, data in iterator:
-            if data['date_utc'].date() == targetDate:
-                return index
-        return -1
+        return TimestampIndex(self.data).find_date(targetDate, first=starting)
 
     def get_start_index(self, startDate: datetime.date) -> int:
         """
@@ -289,10 +295,11 @@ class Backtester:
         """
         self.stopLossCounter = self.initialStopLossCounter
 
-    def start_backtest(self, thread=None):
+    def start_backtest(self, thread=None, vectorized: bool = False):
         """
         Main function to start a backtest.
         :param thread: Thread to pass to other functions to emit signals to.
+        :param vectorized: Boolean whether to use the vectorized engine if the configuration supports it.
         """
         testLength = self.endDateIndex - self.startDateIndex
         divisor = testLength // 100
@@ -305,6 +312,8 @@ class Backtester:
         self.startTime = time.time()
         if len(self.strategies) == 0:
             self.simulate_hold(testLength, divisor, thread)
+        elif vectorized and self.supports_vectorized_backtest():
+            self.vectorized_backtest(testLength, divisor, thread)
         else:
             self.strategy_backtest(testLength, divisor, thread)
         self.endTime = time.time()
@@ -341,7 +350,8 @@ class Backtester:
             if not self.inLongPosition:
                 self.buy_long("Entered long to simulate a hold.")
 
-            thread.signals.activity.emit(thread.get_activity_dictionary(self.currentPeriod, index, testLength))
+            if thread:
+                thread.add_activity(self.currentPeriod, index, testLength)
 
         self.exit_backtest()
 
@@ -352,9 +362,14 @@ class Backtester:
         :param testLength: Length of backtest.
         :param thread: Optional thread that called this function that'll be used for emitting signals.
         """
+        sameInterval = self.strategyIntervalMinutes == self.intervalMinutes
         seenData = self.data[:self.startDateIndex]
-        strategyData = seenData if self.strategyIntervalMinutes == self.intervalMinutes else []
-        nextInsertion = self.data[self.startDateIndex]['date_utc'] + timedelta(minutes=self.strategyIntervalMinutes)
+        self.precompute_indicators()
+        if not sameInterval:
+            strategyData = self.strategyCandles[:0].copy()  # Candles of strategy interval completed so far.
+            dataNeeded = not self.are_indicators_precomputed()
+            candleCount = 0
+            nextBoundary = self.get_next_boundary(candleCount)
         index = None
 
         for index in range(self.startDateIndex, self.endDateIndex + 1):
@@ -362,35 +377,317 @@ class Backtester:
                 raise RuntimeError("Backtest was canceled.")
 
             self.set_indexed_current_price_and_period(index)
-            seenData.append(self.currentPeriod)
+            if sameInterval:
+                seenData.append(self.currentPeriod)
 
             self.main_logic()
             if self.get_net() < 0.5:
-                thread.signals.updateGraphLimits.emit(index // divisor + 1)
-                thread.signals.message.emit("Backtester ran out of money. Try changing your strategy or date interval.")
+                if thread:
+                    thread.signals.updateGraphLimits.emit(index // divisor + 1)
+                    thread.signals.message.emit("Backtester ran out of money. Try changing your strategy or date "
+                                                "interval.")
                 break
 
-            if strategyData is seenData:
-                if len(strategyData) >= self.minPeriod:
+            if sameInterval:
+                if len(seenData) >= self.minPeriod:
+                    self.indicatorIndex = index
                     for strategy in self.strategies.values():
-                        strategy.get_trend(strategyData)
+                        strategy.get_trend(seenData)
             else:
-                if len(strategyData) + 1 >= self.minPeriod:
-                    strategyData.append(self.currentPeriod)
-                    for strategy in self.strategies.values():
-                        strategy.get_trend(strategyData)
-                    strategyData.pop()
-
-            if seenData is not strategyData and self.currentPeriod['date_utc'] >= nextInsertion:
-                nextInsertion = self.currentPeriod['date_utc'] + timedelta(minutes=self.strategyIntervalMinutes)
-                gapData = self.get_gap_data(seenData[-self.intervalGapMultiplier - 1: -1])
-                strategyData.append(gapData)
+                if candleCount + 1 >= self.minPeriod:
+                    self.indicatorIndex = index
+                    if dataNeeded:  # Strategies see completed candles followed by the current period.
+                        strategyData.append(self.currentPeriod)
+                        for strategy in self.strategies.values():
+                            strategy.get_trend(strategyData)
+                        strategyData.pop()
+                    else:
+                        for strategy in self.strategies.values():
+                            strategy.get_trend([self.currentPeriod])
+
+                if index == nextBoundary:
+                    self.check_gap_length(min(self.intervalGapMultiplier, index))
+                    strategyData.append(self.strategyCandles[candleCount])
+                    candleCount += 1
+                    nextBoundary = self.get_next_boundary(candleCount)
 
             if thread and index % divisor == 0:
-                thread.signals.activity.emit(thread.get_activity_dictionary(self.currentPeriod, index, testLength))
+                thread.add_activity(self.currentPeriod, index, testLength)
 
+        self.indicatorIndex = None
         self.exit_backtest(index)
 
+    def check_gap_length(self, length: int):
+        """
+        Checks that a candle of the strategy interval aggregates as many periods as the strategy interval has minutes.
+        :param length: Amount of periods aggregated in candle.
+        """
+        if length != self.strategyIntervalMinutes:
+            raise AssertionError(f"Expected {self.strategyIntervalMinutes} data length. Received {length} data.")
+
+    def resample_strategy_data(self):
+        """
+        Builds candles of the strategy interval strategies see during a backtest from the start date to the end date
+        at once. Candles are completed at the same periods and aggregate the same periods as gap data does.
+        """
+        timestamps = self.data.get_timestamps()
+        self.strategyBoundaries = get_boundaries(timestamps, self.startDateIndex, self.endDateIndex,
+                                                 self.strategyIntervalMinutes * 60 * 1000)
+        self.strategyCandles = resample(self.data, self.strategyBoundaries, self.intervalGapMultiplier)
+        self.strategyCandleCounts = get_candle_counts(self.strategyBoundaries, len(self.data))
+
+    def get_next_boundary(self, candleCount: int) -> Union[int, None]:
+        """
+        Returns index of period that completes the next candle of the strategy interval.
+        :param candleCount: Amount of candles completed so far.
+        :return: Index of period or None if no more candles are completed.
+        """
+        if candleCount < len(self.strategyBoundaries):
+            return int(self.strategyBoundaries[candleCount])
+        return None
+
+    def get_first_trend_index(self) -> int:
+        """
+        Returns index of the first period strategies calculate trends at.
+        """
+        if self.strategyIntervalMinutes == self.intervalMinutes:
+            return max(self.minPeriod - 1, self.startDateIndex)
+        firstIndex = int(np.searchsorted(self.strategyCandleCounts, self.minPeriod - 1))
+        return max(firstIndex, self.startDateIndex)
+
+    def are_indicators_precomputed(self) -> bool:
+        """
+        Returns whether every strategy is a moving average strategy with every indicator it reads precomputed, so
+        strategies don't need data to calculate trends.
+        """
+        return all(isinstance(strategy, MovingAverageStrategy) and
+                   all((average.lower(), parameter, prices) in self.indicatorSeries
+                       for average, parameter, prices in strategy.get_indicators())
+                   for strategy in self.strategies.values())
+
+    def precompute_indicators(self):
+        """
+        Calculates every indicator strategies read over the whole data once, so strategies read them by index instead
+        of recalculating them at every period. EMAs are only precomputed if their initial SMA is the same as the one
+        calculated on the fly would be. With a larger strategy interval, indicators are calculated over completed
+        candles of the strategy interval followed by the current period.
+        """
+        self.indicatorSeries = {}
+        self.indicatorIndex = None
+        sameInterval = self.strategyIntervalMinutes == self.intervalMinutes
+        if sameInterval:
+            firstLength = max(self.minPeriod, self.startDateIndex + 1)  # Length of data at the first trend calculation.
+        else:
+            self.resample_strategy_data()
+            firstIndex = self.get_first_trend_index()
+            firstLength = int(self.strategyCandleCounts[firstIndex]) + 1 if firstIndex < len(self.data) else 0
+
+        for strategy in self.strategies.values():
+            for average, parameter, prices in strategy.get_indicators():
+                key = (average.lower(), parameter, prices)
+                if key in self.indicatorSeries:
+                    continue
+
+                values = self.data.get_column(parameter)
+                if sameInterval:
+                    if key[0] == 'sma':
+                        self.indicatorSeries[key] = get_sma_series(values, prices)
+                    elif key[0] == 'wma':
+                        self.indicatorSeries[key] = get_wma_series(values, prices)
+                    elif key[0] == 'ema' and firstLength >= EMA_SMA_PRICES:
+                        self.indicatorSeries[key] = get_ema_series(values, prices, EMA_SMA_PRICES)
+                else:
+                    candleValues = self.strategyCandles.get_column(parameter)
+                    if key[0] == 'sma':
+                        self.indicatorSeries[key] = get_resampled_sma_series(candleValues, self.strategyCandleCounts,
+                                                                             values, prices)
+                    elif key[0] == 'wma':
+                        self.indicatorSeries[key] = get_resampled_wma_series(candleValues, self.strategyCandleCounts,
+                                                                             values, prices)
+                    elif key[0] == 'ema' and firstLength >= EMA_SMA_PRICES:
+                        self.indicatorSeries[key] = self.get_resampled_ema_series(candleValues, values, prices,
+                                                                                  firstIndex)
+
+    def get_resampled_ema_series(self, candleValues: np.ndarray, values: np.ndarray, prices: int,
+                                 firstIndex: int) -> np.ndarray:
+        """
+        Returns EMAs strategies calculate on the fly with a larger strategy interval. The first EMA is calculated
+        over completed candles and the current period, and from then on, like memoized EMAs, every period is smoothed
+        into the EMA of the period before it.
+        :param candleValues: Values of completed candles of the strategy interval.
+        :param values: Values of every period.
+        :param prices: Amount of prices in exponential moving average.
+        :param firstIndex: Index of the first period trends are calculated at.
+        :return: Array of EMAs as of every period.
+        """
+        candleCount = int(self.strategyCandleCounts[firstIndex])
+        firstValues = np.append(candleValues[:candleCount], values[firstIndex])
+        series = np.full(len(values), np.nan)
+        ema = float(get_ema_series(firstValues, prices, EMA_SMA_PRICES)[-1])
+        series[firstIndex] = ema
+
+        multiplier = 2 / (prices + 1)
+        emas = []
+        for value in values[firstIndex + 1:self.endDateIndex + 1].tolist():
+            ema = value * multiplier + ema * (1 - multiplier)
+            emas.append(ema)
+        series[firstIndex + 1:firstIndex + 1 + len(emas)] = emas
+        return series
+
+    def supports_vectorized_backtest(self) -> bool:
+        """
+        Returns whether the vectorized engine can run this configuration with the same results as the regular engine.
+        Only moving average strategies with regular stop losses are supported.
+        """
+        if list(self.strategies) != ['movingAverage'] or \
+                not isinstance(self.strategies['movingAverage'], MovingAverageStrategy):
+            return False
+        if self.lossStrategy not in (None, TRAILING, STOP):
+            return False
+
+        self.precompute_indicators()
+        if self.strategyIntervalMinutes != self.intervalMinutes:
+            gapLengths = np.minimum(self.intervalGapMultiplier, self.strategyBoundaries)
+            if np.any(gapLengths != self.strategyIntervalMinutes):  # Regular engine raises when it gets there.
+                return False
+        return self.are_indicators_precomputed()
+
+    def get_vectorized_trends(self) -> np.ndarray:
+        """
+        Returns trend codes strategies hold at the start of every period. A trend calculated at a period is acted upon
+        at the next one, and periods before the first trend calculation keep the trend strategies already hold.
+        :return: Array of trend codes with one more element than data.
+        """
+        combined = None
+        for option in self.strategies['movingAverage'].get_params():
+            average, parameter = option.movingAverage.lower(), option.parameter
+            initialAverages = self.indicatorSeries[(average, parameter, option.initialBound)]
+            finalAverages = self.indicatorSeries[(average, parameter, option.finalBound)]
+            trend = np.where(initialAverages > finalAverages, BULLISH,
+                             np.where(initialAverages < finalAverages, BEARISH, 0)).astype(np.int8)
+            combined = trend if combined is None else np.where(combined == trend, combined, 0).astype(np.int8)
+
+        initialTrend = self.get_trend()
+        firstTrendIndex = self.get_first_trend_index()
+        trends = np.empty(len(self.data) + 1, dtype=np.int8)
+        trends[1:] = combined
+        trends[:firstTrendIndex + 1] = 0 if initialTrend is None else initialTrend
+        return trends
+
+    def get_event_mask(self, prices: np.ndarray, trends: np.ndarray) -> np.ndarray:
+        """
+        Returns mask of periods at which main logic could change backtester state given the current position. Between
+        events, main logic only moves trailing prices, so those periods can be skipped.
+        :param prices: Opening prices of periods.
+        :param trends: Trend codes held at the start of periods.
+        :return: Boolean array of periods to process.
+        """
+        mask = self.coin * prices - self.coinOwed * prices + self.balance < 0.5  # Backtester ran out of money.
+        if self.inLongPosition:
+            if self.lossStrategy == TRAILING:
+                trailingPrices = np.maximum.accumulate(np.maximum(prices, self.longTrailingPrice))
+                mask |= prices < trailingPrices * (1 - self.lossPercentageDecimal)
+            elif self.lossStrategy == STOP:
+                mask |= prices < self.buyLongPrice * (1 - self.lossPercentageDecimal)
+            if self.takeProfitType is not None:
+                mask |= prices >= self.buyLongPrice * (1 + self.takeProfitPercentageDecimal)
+            mask |= trends == BEARISH
+        elif self.inShortPosition:
+            if self.lossStrategy == TRAILING:
+                trailingPrices = np.minimum.accumulate(np.minimum(prices, self.shortTrailingPrice))
+                mask |= prices > trailingPrices * (1 + self.lossPercentageDecimal)
+            elif self.lossStrategy == STOP:
+                mask |= prices > self.sellShortPrice * (1 + self.lossPercentageDecimal)
+            if self.takeProfitType is not None:
+                mask |= prices <= self.sellShortPrice * (1 - self.takeProfitPercentageDecimal)
+            mask |= trends == BULLISH
+        else:
+            if self.previousPosition != LONG or not self.stopLossExit:
+                mask |= trends == BULLISH
+            if self.marginEnabled and self.previousPosition != SHORT:
+                mask |= trends == BEARISH
+            if self.stopLossExit and self.previousStopLoss is not None:
+                if not self.marginEnabled:
+                    mask |= self.previousStopLoss < prices
+                if self.stopLossCounter > 0 and self.previousPosition == LONG:
+                    mask |= prices > self.previousStopLoss
+                elif self.stopLossCounter > 0 and self.previousPosition == SHORT:
+                    mask |= prices < self.previousStopLoss
+        return mask
+
+    def skip_to_next_event(self, index: int, prices: np.ndarray, trends: np.ndarray,
+                           divisor: int = None) -> Union[int, None]:
+        """
+        Finds next period from index provided that has to be processed and moves trailing prices over periods skipped.
+        :param index: Index to start searching from.
+        :param prices: Opening prices of all periods.
+        :param trends: Trend codes of all periods.
+        :param divisor: If provided, periods with an index divisible by it are processed to emit activity.
+        :return: Index of next period to process or None if there are none until the end date.
+        """
+        chunkSize = 64
+        while index <= self.endDateIndex:
+            end = min(index + chunkSize, self.endDateIndex + 1)
+            mask = self.get_event_mask(prices[index:end], trends[index:end])
+            if divisor is not None:
+                mask |= np.arange(index, end) % divisor == 0
+
+            events = np.flatnonzero(mask)
+            skipped = prices[index:end if len(events) == 0 else index + events[0]]
+            if len(skipped) > 0 and self.lossStrategy is not None:  # Stop losses move trailing prices every period.
+                if self.longTrailingPrice is not None:
+                    self.longTrailingPrice = max(self.longTrailingPrice, float(skipped.max()))
+                if self.shortTrailingPrice is not None:
+                    self.shortTrailingPrice = min(self.shortTrailingPrice, float(skipped.min()))
+
+            if len(events) > 0:
+                return index + int(events[0])
+            index = end
+            chunkSize = min(chunkSize * 4, 65536)
+        return None
+
+    def vectorized_backtest(self, testLength: int, divisor: int, thread=None):
+        """
+        Performs the same backtest as strategy_backtest with trends calculated from precomputed indicators at once.
+        Periods are searched for events with array operations, and main logic only runs at periods where a trade, a
+        smart stop loss change, or an activity update could happen.
+        :param divisor: Divisor where when remainder of test length and divisor is 0, a signal is emitted to GUI.
+        :param testLength: Length of backtest.
+        :param thread: Optional thread that called this function that'll be used for emitting signals.
+        """
+        prices = self.data.get_column('open')
+        trends = self.get_vectorized_trends()
+        strategy = self.strategies['movingAverage']
+        index = self.startDateIndex
+        exitIndex = self.endDateIndex
+
+        while True:
+            index = self.skip_to_next_event(index, prices, trends, divisor if thread else None)
+            if index is None:
+                strategy.trend = TRENDS[int(trends[self.endDateIndex + 1])]
+                break
+
+            if thread and not thread.running:
+                raise RuntimeError("Backtest was canceled.")
+
+            self.set_indexed_current_price_and_period(index)
+            strategy.trend = TRENDS[int(trends[index])]
+
+            self.main_logic()
+            if self.get_net() < 0.5:
+                if thread:
+                    thread.signals.updateGraphLimits.emit(index // divisor + 1)
+                    thread.signals.message.emit("Backtester ran out of money. Try changing your strategy or date "
+                                                "interval.")
+                exitIndex = index
+                break
+
+            if thread and index % divisor == 0:
+                thread.add_activity(self.currentPeriod, index, testLength)
+            index += 1
+
+        self.exit_backtest(exitIndex)
+
     @staticmethod
     def get_all_permutations(combos: dict):
         """
@@ -409,15 +706,52 @@ class Backtester:
 
         return [dict(zip(combos, v)) for v in product(*combos.values())]
 
-    def optimizer(self, combos: Dict, thread=None):
+    def get_optimizer_settings(self) -> Dict[str, Any]:
         """
-        This function will run a brute-force optimization test to figure out the best inputs.
+        Returns settings of this backtester in the format the optimizer takes.
         """
-        settings_list = self.get_all_permutations(combos)
+        options = []
+        if 'movingAverage' in self.strategies:
+            options = [list(option.get_all_params()) for option in self.strategies['movingAverage'].get_params()]
+
+        return {
+            'lossType': self.lossStrategy,
+            'lossPercentage': round(self.lossPercentageDecimal * 100, 10),
+            'takeProfitType': self.takeProfitType,
+            'takeProfitPercentage': round(self.takeProfitPercentageDecimal * 100, 10),
+            'stopLossCounter': self.initialStopLossCounter,
+            'marginEnabled': self.marginEnabled,
+            'strategyInterval': self.strategyInterval,
+            'movingAverage': options,
+        }
 
-        for settings in settings_list:
-            self.apply_settings(settings)
-            self.start_backtest(thread)
+    def optimizer(self, combos: Dict, thread=None, processes: int = None, store=None, search: str = None,
+                  budget: int = None, **searchOptions) -> List[Dict[str, Any]]:
+        """
+        Runs a backtest of every permutation of combos provided in its own backtester on a process pool. Settings
+        missing from combos are the ones of this backtester, and this backtester's state is left untouched.
+        :param combos: Dictionary of setting names to choices (see optimizer.get_all_settings).
+        :param thread: Thread that can cancel optimization by setting running to False.
+        :param processes: Amount of worker processes. If none, every CPU is used.
+        :param store: Optimizer result store to reuse and save results with. If none, results aren't persisted.
+        :param search: Name of search strategy that picks which permutations to run within budget (see
+            optimizerSearch.SEARCH_STRATEGIES). If none, every permutation is run.
+        :param budget: Amount of full-length backtests search strategy may run.
+        :param searchOptions: Options of search strategy, like its seed.
+        :return: Result dictionaries ranked by net.
+        """
+        from optimizer import Optimizer, get_all_settings
+        from optimizerSearch import get_search_strategy
+
+        combos = {**self.get_optimizer_settings(), **combos}
+        optimizer = Optimizer(self.data, startingBalance=self.startingBalance, symbol=self.symbol,
+                              startDate=self.data[self.startDateIndex]['date_utc'],
+                              endDate=self.data[self.endDateIndex]['date_utc'], precision=self.precision,
+                              processes=processes, store=store)
+        isRunning = (lambda: thread.running) if thread else None
+        if search is not None:
+            return get_search_strategy(search, combos, budget, **searchOptions).run(optimizer, isRunning=isRunning)
+        return optimizer.run(get_all_settings(combos), isRunning=isRunning)
 
     def apply_settings(self, settings: dict):
         self.takeProfitType = settings['takeProfitType']
@@ -495,6 +829,24 @@ class Backtester:
         else:
             return None
 
+    def add_activity(self, period: Dict[str, datetime], index: int, length: int) -> int:
+        """
+        Adds a sample of current backtest values to past activity.
+        :param period: Period sample is taken at.
+        :param index: Index of period. Used with length to calculate percentage of backtest conducted.
+        :param length: Length of backtest periods.
+        :return: Index of sample in past activity.
+        """
+        return self.pastActivity.add(utc=datetime_to_timestamp(period['date_utc']) / 1000, net=self.get_net(),
+                                     balance=self.balance, commissionsPaid=self.commissionsPaid,
+                                     tradesMade=len(self.trades), percentage=int(index / length * 100))
+
+    def get_activity_dictionary(self, sampleIndex: int) -> dict:
+        """
+        Returns sample of past activity at index provided with values formatted to show in the GUI.
+        """
+        return self.pastActivity.get_activity_dictionary(sampleIndex, self.startingBalance, self.precision)
+
     def get_net(self) -> float:
         """
         Returns net balance with current price of coin being traded. It factors in the current balance, the amount
@@ -562,6 +914,12 @@ class Backtester:
         :param parameter: Parameter to use to get moving average, i.e. - HIGH, LOW, CLOSE, OPEN
         :return: Moving average.
         """
+        if self.indicatorIndex is not None:
+            series = self.indicatorSeries.get((average.lower(), parameter, prices))
+            if series is not None:
+                movingAverage = float(series[self.indicatorIndex])
+                return round(movingAverage, self.precision) if round_value else movingAverage
+
         if average.lower() == 'sma':
             return self.get_sma(data, prices, parameter, round_value=round_value)
         elif average.lower() == 'ema':
@@ -581,7 +939,8 @@ class Backtester:
         wma = get_wma(data, prices, parameter, desc=False)
         return round(wma, self.precision) if round_value else wma
 
-    def get_ema(self, data: list, prices: int, parameter: str, sma_prices: int = 5, round_value: bool = True) -> float:
+    def get_ema(self, data: list, prices: int, parameter: str, sma_prices: int = EMA_SMA_PRICES,
+                round_value: bool = True) -> float:
         if sma_prices <= 0:
             raise ValueError("Initial amount of SMA values for initial EMA must be greater than 0.")
         elif sma_prices > len(data):
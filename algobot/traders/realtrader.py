@@ -3,7 +3,7 @@ import time
 
 from enums import *
 from traders.simulationtrader import SimulationTrader
-from binance.client import Client
+from clients import get_client
 from binance.enums import *
 
 
@@ -36,7 +36,7 @@ class RealTrader(SimulationTrader):
         super().__init__(interval=interval, symbol=symbol, logFile='live', loadData=loadData, updateData=updateData,
                          precision=precision)
 
-        self.binanceClient = Client(apiKey, apiSecret, tld=tld)
+        self.binanceClient = get_client(apiKey, apiSecret, tld=tld)
         self.transactionFeePercentage = 0.002  # Added 0.001 for volatility safety.
         self.isolated = isIsolated
 
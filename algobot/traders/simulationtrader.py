@@ -7,7 +7,7 @@ from typing import Dict
 from helpers import get_logger, convert_small_interval, set_up_strategies
 from enums import LONG, SHORT, BEARISH, BULLISH, TRAILING, STOP
 from strategies.strategy import Strategy
-from data import Data
+from data import Data, LIVE_LOOKBACK_PERIODS
 
 
 class SimulationTrader:
@@ -33,7 +33,8 @@ class SimulationTrader:
         """
         self.logger = get_logger(logFile=logFile, loggerName=logFile)  # Get logger.
         self.dataView: Data = Data(interval=interval, symbol=symbol, loadData=loadData,
-                                   updateData=updateData, logObject=self.logger, precision=precision)
+                                   updateData=updateData, logObject=self.logger, precision=precision,
+                                   lookbackPeriods=LIVE_LOOKBACK_PERIODS)
         self.binanceClient = self.dataView.binanceClient  # Retrieve Binance client.
         self.symbol = self.dataView.symbol  # Retrieve symbol from data-view object.
 